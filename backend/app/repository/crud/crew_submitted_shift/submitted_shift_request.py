@@ -1,30 +1,36 @@
 from datetime import datetime
+from sqlalchemy import insert
 from ...db.db_init import get_session_scope
 from ...db.models import SubmittedShift, EditShift
 
 def submitted_shift_request(shifts: list[dict]):
-    with get_session_scope() as session:
-        for shift in shifts:
-            day = datetime.strptime(shift["day"], "%Y-%m-%d").date()
-            start_time = datetime.strptime(shift["start_time"], "%H:%M:%S").time()
-            finish_time = datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+    if not shifts:
+        return {"submitted_shift_ids": [], "edit_shift_ids": []}
 
-            submitted_shift = SubmittedShift(
-                user_id=shift["user_id"],
-                company_id=shift["company_id"],
-                day=day,
-                start_time=start_time,
-                finish_time=finish_time
-            )
-            session.add(submitted_shift)
+    # 1回だけ変換した行を，提出シフトと編集中シフトの両方にそのまま挿入する
+    rows = [
+        {
+            "user_id": shift["user_id"],
+            "company_id": shift["company_id"],
+            "day": datetime.strptime(shift["day"], "%Y-%m-%d").date(),
+            "start_time": datetime.strptime(shift["start_time"], "%H:%M:%S").time(),
+            "finish_time": datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+        }
+        for shift in shifts
+    ]
 
-            edit_shift = EditShift(
-                user_id=shift["user_id"],
-                company_id=shift["company_id"],
-                day=day,
-                start_time=start_time,
-                finish_time=finish_time
-            )
-            session.add(edit_shift)
-            
+    with get_session_scope() as session:
+        submitted_shift_ids = session.connection().execute(
+            insert(SubmittedShift.__table__).returning(SubmittedShift.submitted_shift_id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+        edit_shift_ids = session.connection().execute(
+            insert(EditShift.__table__).returning(EditShift.edit_shift_id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
         session.commit()
+
+    return {
+        "submitted_shift_ids": submitted_shift_ids,
+        "edit_shift_ids": edit_shift_ids
+    }
\ No newline at end of file
@@ -1,5 +1,9 @@
 from .decision_shift_request import decision_shift_request
+from .decision_shift_pattern import decision_shift_pattern
+from .period_decision_shifts import period_decision_shifts
 
 decision_shift_repository = {
-    "decision_shift_request": decision_shift_request
+    "decision_shift_request": decision_shift_request,
+    "decision_shift_pattern": decision_shift_pattern,
+    "period_decision_shifts": period_decision_shifts
 }
\ No newline at end of file
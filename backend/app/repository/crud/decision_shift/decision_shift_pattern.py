@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+from ...db.db_init import get_session_scope
+from ...db.models import DecisionShift
+
+def decision_shift_pattern(company_id: int, first_day: str, lookback_days: int = 28) -> List[Dict]:
+    """Returns the company's decision shifts of the lookback_days days before first_day."""
+    first_day = datetime.strptime(first_day, '%Y-%m-%d').date()
+
+    with get_session_scope() as session:
+        decision_shifts = session.query(
+            DecisionShift.user_id,
+            DecisionShift.day,
+            DecisionShift.start_time,
+            DecisionShift.finish_time
+        ).filter(
+            DecisionShift.company_id == company_id,
+            DecisionShift.day >= first_day - timedelta(days=lookback_days),
+            DecisionShift.day < first_day
+        ).order_by(DecisionShift.day, DecisionShift.start_time).all()
+
+        return [
+            {
+                "user_id": d.user_id,
+                "day": d.day.isoformat(),
+                "start_time": d.start_time.strftime("%H:%M:%S"),
+                "finish_time": d.finish_time.strftime("%H:%M:%S")
+            }
+            for d in decision_shifts
+        ]
\ No newline at end of file
@@ -14,7 +14,7 @@ def decision_shift_request(company_id: int):
             )
             .join(User, User.user_id == DecisionShift.user_id)
             .outerjoin(UserProfile, UserProfile.user_id == User.user_id)
-            .filter(User.company_id == company_id)
+            .filter(DecisionShift.company_id == company_id, User.company_id == company_id)
             .order_by(DecisionShift.day, DecisionShift.start_time)
             .all()
         )
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Dict, List
+from ...db.db_init import get_session_scope
+from ...db.models import DecisionShift, UserProfile
+
+def period_decision_shifts(company_id: int, first_day: str, last_day: str) -> List[Dict]:
+    with get_session_scope() as session:
+        shift_results = (
+            session.query(
+                DecisionShift.user_id,
+                DecisionShift.day,
+                DecisionShift.start_time,
+                DecisionShift.finish_time,
+                UserProfile.name,
+                UserProfile.position
+            )
+            .outerjoin(UserProfile, UserProfile.user_id == DecisionShift.user_id)
+            .filter(
+                DecisionShift.company_id == company_id,
+                DecisionShift.day >= datetime.strptime(first_day, '%Y-%m-%d').date(),
+                DecisionShift.day <= datetime.strptime(last_day, '%Y-%m-%d').date()
+            )
+            .all()
+        )
+
+        return [
+            {
+                "user_id": r.user_id,
+                "name": r.name,
+                "position": r.position,
+                "day": r.day.isoformat(),
+                "start_time": r.start_time.strftime("%H:%M:%S"),
+                "finish_time": r.finish_time.strftime("%H:%M:%S")
+            }
+            for r in shift_results
+        ]
\ No newline at end of file
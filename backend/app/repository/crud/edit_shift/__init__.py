@@ -4,6 +4,8 @@ from .delete_shift_request import delete_shift_request
 from .update_shift_request import update_shift_request
 from .insert_shift_request import insert_shift_request
 from .gemini_delete_shift import gemini_delete_shift
+from .edit_shift_by_ids import edit_shift_by_ids
+from .period_edit_shifts import period_edit_shifts
 
 edit_shift_repository = {
     "complete_edit_shift_request": complete_edit_shift_request,
@@ -11,5 +13,7 @@ edit_shift_repository = {
     "delete_shift_request": delete_shift_request,
     "update_shift_request": update_shift_request,
     "insert_shift_request": insert_shift_request,
-    "gemini_delete_shift": gemini_delete_shift
+    "gemini_delete_shift": gemini_delete_shift,
+    "edit_shift_by_ids": edit_shift_by_ids,
+    "period_edit_shifts": period_edit_shifts
 }
\ No newline at end of file
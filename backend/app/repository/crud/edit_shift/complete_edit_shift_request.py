@@ -1,47 +1,82 @@
 from ...db.db_init import get_session_scope
 from ...db.models import EditShift, DecisionShift
 from datetime import date
-from sqlalchemy import and_, exists
+from sqlalchemy import and_, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+DECISION_SHIFT_KEY = ["user_id", "company_id", "day", "start_time", "finish_time"]
+
+def _insert(dialect_name):
+    # 同時に確定された場合も一意インデックスで弾かれた行は飛ばす（対応する方言のみ．それ以外はNone）
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    return None
 
 def complete_edit_shift_request(company_id: int):
     today = date.today()
-    inserted_count = 0
 
-    with get_session_scope() as session:
-        future_shifts = session.query(
-            EditShift.user_id,
-            EditShift.day,
-            EditShift.start_time,
-            EditShift.finish_time
-        ).filter(
+    # 未来の編集シフトのうちdecision_shiftに無いものを，1回のINSERT ... SELECTで確定する
+    future_shifts = select(
+        EditShift.user_id,
+        EditShift.company_id,
+        EditShift.day,
+        EditShift.start_time,
+        EditShift.finish_time
+    ).where(
+        EditShift.company_id == company_id,
+        EditShift.day > today,
+        ~exists().where(
             and_(
+                DecisionShift.user_id == EditShift.user_id,
+                DecisionShift.company_id == company_id,
+                DecisionShift.day == EditShift.day,
+                DecisionShift.start_time == EditShift.start_time,
+                DecisionShift.finish_time == EditShift.finish_time
+            )
+        )
+    ).distinct()
+
+    with get_session_scope() as session:
+        # 確定する期間（未来の編集シフト全体）の範囲．一部が確定済みでも期間全体を返す
+        first_day, last_day = session.execute(
+            select(func.min(EditShift.day), func.max(EditShift.day)).where(
                 EditShift.company_id == company_id,
                 EditShift.day > today
             )
-        ).all()
-
-        for shift in future_shifts:
-            exists_query = session.query(
-                exists().where(
-                    and_(
-                        DecisionShift.user_id == shift.user_id,
-                        DecisionShift.company_id == company_id,
-                        DecisionShift.day == shift.day,
-                        DecisionShift.start_time == shift.start_time,
-                        DecisionShift.finish_time == shift.finish_time
-                    )
-                )
-            ).scalar()
-
-            if not exists_query:
-                new_decision = DecisionShift(
-                    user_id=shift.user_id,
-                    company_id=company_id,
-                    day=shift.day,
-                    start_time=shift.start_time,
-                    finish_time=shift.finish_time
+        ).one()
+
+        dialect_insert = _insert(session.bind.dialect.name)
+        if dialect_insert is not None:
+            inserted_rows = session.execute(
+                dialect_insert(DecisionShift).from_select(DECISION_SHIFT_KEY, future_shifts).on_conflict_do_nothing().returning(
+                    DecisionShift.user_id,
+                    DecisionShift.day,
+                    DecisionShift.start_time,
+                    DecisionShift.finish_time
                 )
-                session.add(new_decision)
-                inserted_count += 1
-                
+            ).all()
+        else:
+            # RETURNINGもON CONFLICTも使えない方言（MySQLなど）は，確定する行を読んでからまとめて挿入する
+            inserted_rows = session.execute(future_shifts).all()
+            if inserted_rows:
+                session.execute(insert(DecisionShift), [dict(zip(DECISION_SHIFT_KEY, row)) for row in inserted_rows])
+
+        inserted = [
+            {
+                "user_id": r.user_id,
+                "day": r.day.isoformat(),
+                "start_time": r.start_time.strftime("%H:%M:%S"),
+                "finish_time": r.finish_time.strftime("%H:%M:%S")
+            }
+            for r in inserted_rows
+        ]
+
         session.commit()
+
+    return {
+        "decision_shift": inserted,
+        "first_day": first_day.isoformat() if first_day else None,
+        "last_day": last_day.isoformat() if last_day else None
+    }
\ No newline at end of file
@@ -1,7 +1,31 @@
 from ...db.db_init import get_session_scope
 from ...db.models import EditShift
+from sqlalchemy import delete, select
+
+def delete_shift_request(company_id: int, edit_shift_ids: list[int]):
+    edit_shift_ids = set(edit_shift_ids)
+    if not edit_shift_ids:
+        return 0
+
+    # 会社の確認も同じ文のWHEREで行い，他社のシフトは消さない
+    condition = (EditShift.edit_shift_id.in_(edit_shift_ids), EditShift.company_id == company_id)
 
-def delete_shift_request(edit_shift_ids: list[int]):
     with get_session_scope() as session:
-        session.query(EditShift).filter(EditShift.edit_shift_id.in_(edit_shift_ids)).delete(synchronize_session=False)
+        if session.bind.dialect.delete_returning:
+            deleted_ids = set(session.execute(
+                delete(EditShift).where(*condition).returning(EditShift.edit_shift_id),
+                execution_options={"synchronize_session": False}
+            ).scalars().all())
+        else:
+            # RETURNINGの無い方言は，消せるIDを先に読んでから削除する
+            deleted_ids = set(session.execute(select(EditShift.edit_shift_id).where(*condition)).scalars().all())
+            session.execute(delete(EditShift).where(*condition), execution_options={"synchronize_session": False})
+
+        if deleted_ids != edit_shift_ids:
+            # 他社のシフトや存在しないIDが含まれていれば，1件も削除せずにロールバックする
+            missing_ids = sorted(edit_shift_ids - deleted_ids)
+            raise ValueError(f"削除できないシフトが含まれています。(edit_shift_id: {missing_ids})")
+
         session.commit()
+
+    return len(deleted_ids)
\ No newline at end of file
@@ -0,0 +1,30 @@
+from typing import Dict, List
+from ...db.db_init import get_session_scope
+from ...db.models import EditShift
+
+def edit_shift_by_ids(company_id: int, edit_shift_ids: list[int]) -> List[Dict]:
+    if not edit_shift_ids:
+        return []
+
+    with get_session_scope() as session:
+        shift_results = session.query(
+            EditShift.edit_shift_id,
+            EditShift.user_id,
+            EditShift.day,
+            EditShift.start_time,
+            EditShift.finish_time
+        ).filter(
+            EditShift.company_id == company_id,
+            EditShift.edit_shift_id.in_(edit_shift_ids)
+        ).all()
+
+        return [
+            {
+                "edit_shift_id": r.edit_shift_id,
+                "user_id": r.user_id,
+                "day": r.day.isoformat(),
+                "start_time": r.start_time.strftime("%H:%M:%S"),
+                "finish_time": r.finish_time.strftime("%H:%M:%S")
+            }
+            for r in shift_results
+        ]
\ No newline at end of file
@@ -1,23 +1,34 @@
 from ...db.db_init import get_session_scope
 from ...db.models import EditShift
 from datetime import datetime
+from sqlalchemy import insert
 
 def insert_shift_request(new_shifts: list[dict]):
     today = datetime.today().date()
-    inserted_count = 0
 
-    with get_session_scope() as session:
-        for shift in new_shifts:
-            shift_day = datetime.strptime(shift["day"], "%Y-%m-%d").date()
-            if shift_day >= today:
-                shift_obj = EditShift(
-                    user_id=shift["user_id"],
-                    company_id=shift["company_id"],
-                    day=shift_day,
-                    start_time=datetime.strptime(shift["start_time"], "%H:%M:%S").time(),
-                    finish_time=datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
-                )
-                session.add(shift_obj)
-                inserted_count += 1
+    # 文字列の日付・時刻は1回だけ変換し，過去日のシフトは保存しない
+    rows = []
+    accepted_shifts = []
+    for shift in new_shifts:
+        shift_day = datetime.strptime(shift["day"], "%Y-%m-%d").date()
+        if shift_day >= today:
+            rows.append({
+                "user_id": shift["user_id"],
+                "company_id": shift["company_id"],
+                "day": shift_day,
+                "start_time": datetime.strptime(shift["start_time"], "%H:%M:%S").time(),
+                "finish_time": datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+            })
+            accepted_shifts.append(shift)
+    if not rows:
+        return []
 
+    with get_session_scope() as session:
+        # ORMオブジェクトを作らずにexecutemany（insertmanyvalues）で挿入し，採番されたIDを入力順に受け取る
+        edit_shift_ids = session.connection().execute(
+            insert(EditShift.__table__).returning(EditShift.edit_shift_id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
         session.commit()
+
+    return [dict(shift, edit_shift_id=edit_shift_id) for shift, edit_shift_id in zip(accepted_shifts, edit_shift_ids)]
\ No newline at end of file
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Dict, List
+from ...db.db_init import get_session_scope
+from ...db.models import EditShift, UserProfile
+
+def period_edit_shifts(company_id: int, first_day: str, last_day: str) -> List[Dict]:
+    with get_session_scope() as session:
+        shift_results = (
+            session.query(
+                EditShift.edit_shift_id,
+                EditShift.user_id,
+                EditShift.day,
+                EditShift.start_time,
+                EditShift.finish_time,
+                UserProfile.name,
+                UserProfile.position
+            )
+            .outerjoin(UserProfile, UserProfile.user_id == EditShift.user_id)
+            .filter(
+                EditShift.company_id == company_id,
+                EditShift.day >= datetime.strptime(first_day, '%Y-%m-%d').date(),
+                EditShift.day <= datetime.strptime(last_day, '%Y-%m-%d').date()
+            )
+            .all()
+        )
+
+        return [
+            {
+                "edit_shift_id": r.edit_shift_id,
+                "user_id": r.user_id,
+                "name": r.name,
+                "position": r.position,
+                "day": r.day.isoformat(),
+                "start_time": r.start_time.strftime("%H:%M:%S"),
+                "finish_time": r.finish_time.strftime("%H:%M:%S")
+            }
+            for r in shift_results
+        ]
\ No newline at end of file
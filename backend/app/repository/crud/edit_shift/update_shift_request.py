@@ -1,12 +1,67 @@
 from ...db.db_init import get_session_scope
 from ...db.models import EditShift
 from datetime import datetime
+from sqlalchemy import Integer, Time, bindparam, column, select, update, values
+
+def update_shift_request(company_id: int, shift_updates: list[dict]):
+    # 同じIDが複数あれば，順に更新した場合と同じく最後の時刻を使う
+    new_times = {
+        shift["edit_shift_id"]: (
+            datetime.strptime(shift["start_time"], "%H:%M:%S").time(),
+            datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+        )
+        for shift in shift_updates
+    }
+    if not new_times:
+        return 0
 
-def update_shift_request(shift_updates: list[dict]):
     with get_session_scope() as session:
-        for shift in shift_updates:
-            shift_obj = session.query(EditShift).filter(EditShift.edit_shift_id == shift["edit_shift_id"]).first()
-            if shift_obj:
-                shift_obj.start_time = datetime.strptime(shift["start_time"], "%H:%M:%S").time()
-                shift_obj.finish_time = datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+        if session.bind.dialect.name == "postgresql":
+            # UPDATE ... FROM (VALUES ...) の1文で更新し，会社の確認も同じ文のWHEREで行う
+            new_values = values(
+                column("edit_shift_id", Integer),
+                column("start_time", Time),
+                column("finish_time", Time),
+                name="new_values"
+            ).data([(edit_shift_id, start, finish) for edit_shift_id, (start, finish) in new_times.items()])
+            updated_ids = session.execute(
+                update(EditShift)
+                .where(
+                    EditShift.edit_shift_id == new_values.c.edit_shift_id,
+                    EditShift.company_id == company_id
+                )
+                .values(start_time=new_values.c.start_time, finish_time=new_values.c.finish_time)
+                .returning(EditShift.edit_shift_id)
+            ).scalars().all()
+            updated_count = len(updated_ids)
+        else:
+            # それ以外の方言はexecutemanyで，各行のWHEREに会社の確認を含める
+            result = session.connection().execute(
+                update(EditShift.__table__)
+                .where(
+                    EditShift.__table__.c.edit_shift_id == bindparam("b_edit_shift_id"),
+                    EditShift.__table__.c.company_id == company_id
+                )
+                .values(start_time=bindparam("b_start_time"), finish_time=bindparam("b_finish_time")),
+                [
+                    {"b_edit_shift_id": edit_shift_id, "b_start_time": start, "b_finish_time": finish}
+                    for edit_shift_id, (start, finish) in new_times.items()
+                ]
+            )
+            updated_count = result.rowcount
+            if updated_count != len(new_times):
+                updated_ids = session.execute(
+                    select(EditShift.edit_shift_id).where(
+                        EditShift.edit_shift_id.in_(list(new_times)),
+                        EditShift.company_id == company_id
+                    )
+                ).scalars().all()
+
+        if updated_count != len(new_times):
+            # 他社のシフトや存在しないIDが含まれていれば，1件も更新せずにロールバックする
+            missing_ids = sorted(set(new_times) - set(updated_ids))
+            raise ValueError(f"更新できないシフトが含まれています。(edit_shift_id: {missing_ids})")
+
         session.commit()
+
+    return updated_count
\ No newline at end of file
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Dict, List
 from ...db.db_init import get_session_scope
-from ...db.models import Company, CompanyRestDay, UserProfile, EditShift, DecisionShift, EvaluateDecisionShift
+from ...db.models import Company, CompanyRestDay, UserProfile, EditShift, SubmittedShift
+from ..shift_history import load_shift_history_summary
 
-def gemini_evaluate_shift(company_id: int, first_day: str, last_day: str) -> Dict:
+def gemini_evaluate_shift(company_id: int, first_day: str, last_day: str, include_submitted_shift: bool = False) -> Dict:
 
     with get_session_scope() as session:
         # 1. company info
@@ -47,6 +48,27 @@ def gemini_evaluate_shift(company_id: int, first_day: str, last_day: str) -> Dic
             }
             edit_shift_map.setdefault(shift.user_id, []).append(shift_data)
 
+        # 2.5 submitted shifts (by user), only for the local evaluator's preference check
+        submitted_shift_map = {}
+        if include_submitted_shift:
+            submitted_shifts = session.query(
+                SubmittedShift.user_id,
+                SubmittedShift.day,
+                SubmittedShift.start_time,
+                SubmittedShift.finish_time
+            ).filter(
+                SubmittedShift.company_id == company_id,
+                SubmittedShift.day >= datetime.strptime(first_day, '%Y-%m-%d').date(),
+                SubmittedShift.day <= datetime.strptime(last_day, '%Y-%m-%d').date()
+            ).all()
+
+            for shift in submitted_shifts:
+                submitted_shift_map.setdefault(shift.user_id, []).append({
+                    "day": shift.day.isoformat(),
+                    "start_time": shift.start_time.strftime("%H:%M:%S"),
+                    "finish_time": shift.finish_time.strftime("%H:%M:%S")
+                })
+
         # 3. user profile with embed edit_shift
         user_profiles = session.query(
             UserProfile.user_id,
@@ -70,45 +92,15 @@ def gemini_evaluate_shift(company_id: int, first_day: str, last_day: str) -> Dic
             for p in user_profiles
         ]
 
-        # 4. decision shift
-        decision_shifts = session.query(
-            DecisionShift.user_id,
-            DecisionShift.day,
-            DecisionShift.start_time,
-            DecisionShift.finish_time  # fix field name
-        ).filter(DecisionShift.company_id == company_id).all()
-
-        decision_shift_list = [
-            {
-                "user_id": d.user_id,
-                "day": d.day.isoformat(),
-                "start_time": d.start_time.strftime("%H:%M:%S"),
-                "finish_time": d.finish_time.strftime("%H:%M:%S")
-            }
-            for d in decision_shifts
-        ]
+        if include_submitted_shift:
+            for member in company_member:
+                member["submitted_shift"] = submitted_shift_map.get(member["user_id"], [])
 
-        # 5. evaluate_decision_shift
-        evaluate_decisions = session.query(
-            EvaluateDecisionShift.start_day,
-            EvaluateDecisionShift.finish_day,
-            EvaluateDecisionShift.evaluate
-        ).filter(EvaluateDecisionShift.company_id == company_id).all()
-
-        evaluate_decision_list = [
-            {
-                "start_day": e.start_day.isoformat(),
-                "finish_day": e.finish_day.isoformat(),
-                "evaluate": e.evaluate
-            }
-            for e in evaluate_decisions
-        ]
+        # 4. history: a fixed-size summary of the finalized periods instead of every past decision shift
+        history_summary = load_shift_history_summary(session, company_id)
 
         return {
             "company_info": company_info,
             "company_member": company_member,
-            "evaluate_decision_shift": {
-                "decision_shift": decision_shift_list,
-                "evaluate_decision_shift": evaluate_decision_list
-            }
+            "history_summary": history_summary
         }
@@ -0,0 +1,8 @@
+from .shift_history_feature import get_shift_history_period, update_shift_history_features, get_shift_history_summary, load_shift_history_summary, get_owner_score
+
+shift_history_repository = {
+    "get_shift_history_period": get_shift_history_period,
+    "update_shift_history_features": update_shift_history_features,
+    "get_shift_history_summary": get_shift_history_summary,
+    "get_owner_score": get_owner_score
+}
\ No newline at end of file
@@ -0,0 +1,249 @@
+import json
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from ...db.db_init import get_session_scope
+from ...db.models import DecisionShift, EvaluateDecisionShift, ShiftHistoryFeature, ShiftHistoryPeriod
+
+# この点数以上の期間を高評価，未満の期間を低評価として数える
+HIGH_SCORE = 80
+LOW_SCORE = 60
+# 評価プロンプトに渡す従業員数・過去評価数の上限（履歴が増えても要約の大きさは一定）
+MAX_SUMMARY_MEMBERS = 30
+MAX_RECENT_EVALUATIONS = 5
+# オーナーの評価文から読む点数（「85点」「85/100」，または数値だけの評価）
+OWNER_SCORE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:点|/\s*100)|^\s*(\d+(?:\.\d+)?)\s*$")
+# 期間から集計し直す列
+FEATURE_COUNTERS = ["periods", "shift_days", "scored_periods", "score_sum", "high_score_periods", "low_score_periods", "last_day"]
+
+
+def _to_date(value):
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def _bucket(value: float, edges: List[tuple]) -> str:
+    for upper, label in edges:
+        if value < upper:
+            return label
+    return edges[-1][1]
+
+
+def period_features(decision_shifts: List[Dict], company_member: List[Dict]) -> Dict[tuple, int]:
+    """
+    Returns {(feature_type, feature_key): shift_days} for one finalized period:
+    the company as a whole, every member who worked, and the period's staffing mix
+    (share of veteran shift-days and average staff per working day).
+    """
+    experience = {m["user_id"]: m.get("experience") for m in company_member}
+    worked_days = {(s["user_id"], str(s["day"])[:10]) for s in decision_shifts}
+    if not worked_days:
+        return {}
+
+    features = defaultdict(int)
+    features[("company", "all")] = len(worked_days)
+    for user_id, _ in worked_days:
+        features[("member", str(user_id))] += 1
+
+    veteran_share = sum(1 for user_id, _ in worked_days if experience.get(user_id) == "veteran") / len(worked_days)
+    daily_staff = len(worked_days) / len({day for _, day in worked_days})
+    veteran_label = _bucket(veteran_share, [(1 / 3, "low"), (2 / 3, "mid"), (float("inf"), "high")])
+    staff_label = _bucket(daily_staff, [(4, "1-3"), (7, "4-6"), (float("inf"), "7+")])
+    features[("staffing_mix", f"veteran_share:{veteran_label}")] = len(worked_days)
+    features[("staffing_mix", f"daily_staff:{staff_label}")] = len(worked_days)
+    return dict(features)
+
+
+def owner_evaluation_score(evaluate: Optional[str]) -> Optional[float]:
+    """Reads a 0-100 score from the owner's evaluation text (None if it has no score)."""
+    match = OWNER_SCORE_PATTERN.search(evaluate or "")
+    if match is None:
+        return None
+    score = float(match.group(1) or match.group(2))
+    return score if 0 <= score <= 100 else None
+
+
+def load_owner_score(session, company_id: int, first_day, last_day) -> Optional[float]:
+    """Returns the score of the owner's latest evaluation overlapping the period, if any."""
+    evaluations = session.query(EvaluateDecisionShift.evaluate).filter(
+        EvaluateDecisionShift.company_id == company_id,
+        EvaluateDecisionShift.start_day <= _to_date(last_day),
+        EvaluateDecisionShift.finish_day >= _to_date(first_day)
+    ).order_by(EvaluateDecisionShift.finish_day.desc(), EvaluateDecisionShift.evaluate_decision_shift_id.desc()).all()
+    for evaluation in evaluations:
+        score = owner_evaluation_score(evaluation.evaluate)
+        if score is not None:
+            return score
+    return None
+
+
+def new_feature_row(company_id: int, feature_type: str, feature_key: str) -> ShiftHistoryFeature:
+    return ShiftHistoryFeature(
+        company_id=company_id,
+        feature_type=feature_type,
+        feature_key=feature_key,
+        periods=0,
+        shift_days=0,
+        scored_periods=0,
+        score_sum=0,
+        high_score_periods=0,
+        low_score_periods=0
+    )
+
+
+def add_period(row: ShiftHistoryFeature, shift_days: int, last_day, score: Optional[float]):
+    """Adds one period's contribution to a feature row (score already rounded, or None)."""
+    row.periods += 1
+    row.shift_days += shift_days
+    row.last_day = last_day if row.last_day is None else max(row.last_day, last_day)
+    if score is not None:
+        row.scored_periods += 1
+        row.score_sum += score
+        row.high_score_periods += int(score >= HIGH_SCORE)
+        row.low_score_periods += int(score < LOW_SCORE)
+
+
+def encode_period_features(features: Dict[tuple, int]) -> str:
+    return json.dumps([[feature_type, feature_key, shift_days] for (feature_type, feature_key), shift_days in sorted(features.items())])
+
+
+def aggregate_features(company_id: int, periods) -> Dict[tuple, ShiftHistoryFeature]:
+    """Sums the recorded periods (rows with first_day, last_day, score, features) into fresh feature rows."""
+    rows = {}
+    for period in sorted(periods, key=lambda p: p.first_day):
+        for feature_type, feature_key, shift_days in json.loads(period.features):
+            row = rows.get((feature_type, feature_key))
+            if row is None:
+                row = rows[(feature_type, feature_key)] = new_feature_row(company_id, feature_type, feature_key)
+            add_period(row, shift_days, period.last_day, period.score)
+    return rows
+
+
+def get_shift_history_period(company_id: int, first_day, last_day) -> tuple:
+    """
+    Widens a finalized window to the recorded periods it overlaps, so that finalizing the same
+    days again replaces their period instead of adding another one. Returns (first_day, last_day)
+    as ISO strings.
+    """
+    first_day, last_day = _to_date(first_day), _to_date(last_day)
+    with get_session_scope() as session:
+        while True:
+            overlapping = session.query(ShiftHistoryPeriod.first_day, ShiftHistoryPeriod.last_day).filter(
+                ShiftHistoryPeriod.company_id == company_id,
+                ShiftHistoryPeriod.first_day <= last_day,
+                ShiftHistoryPeriod.last_day >= first_day
+            ).all()
+            widened = (
+                min([first_day] + [p.first_day for p in overlapping]),
+                max([last_day] + [p.last_day for p in overlapping])
+            )
+            if widened == (first_day, last_day):
+                return first_day.isoformat(), last_day.isoformat()
+            first_day, last_day = widened
+
+
+def update_shift_history_features(company_id: int, first_day, last_day, company_member: List[Dict], score: Optional[float]):
+    """
+    Records one finalized period and rebuilds the company's shift_history_feature rows from its periods.
+
+    The period's features come from every decision_shift row between first_day and last_day, and
+    the period replaces the recorded periods it overlaps (see get_shift_history_period).
+
+    Args:
+        company_id: The company.
+        first_day: The period's first day.
+        last_day: The period's last day.
+        company_member: The members with their experience.
+        score: The period's score (None if it could not be scored).
+    """
+    first_day, last_day = _to_date(first_day), _to_date(last_day)
+    score = round(score) if score is not None else None
+
+    with get_session_scope() as session:
+        decision_shifts = session.query(DecisionShift.user_id, DecisionShift.day).filter(
+            DecisionShift.company_id == company_id,
+            DecisionShift.day >= first_day,
+            DecisionShift.day <= last_day
+        ).all()
+        features = period_features([{"user_id": s.user_id, "day": s.day} for s in decision_shifts], company_member)
+
+        session.query(ShiftHistoryPeriod).filter(
+            ShiftHistoryPeriod.company_id == company_id,
+            ShiftHistoryPeriod.first_day <= last_day,
+            ShiftHistoryPeriod.last_day >= first_day
+        ).delete(synchronize_session=False)
+        if features:
+            session.add(ShiftHistoryPeriod(
+                company_id=company_id,
+                first_day=first_day,
+                last_day=last_day,
+                score=score,
+                features=encode_period_features(features)
+            ))
+        session.flush()
+
+        # 既存の行は値を入れ替え，どの期間にも出てこなくなった行だけ消す（一意制約があるので消してから入れ直さない）
+        periods = session.query(ShiftHistoryPeriod).filter(ShiftHistoryPeriod.company_id == company_id).all()
+        aggregated = aggregate_features(company_id, periods)
+        for row in session.query(ShiftHistoryFeature).filter(ShiftHistoryFeature.company_id == company_id).all():
+            fresh = aggregated.pop((row.feature_type, row.feature_key), None)
+            if fresh is None:
+                session.delete(row)
+                continue
+            for column in FEATURE_COUNTERS:
+                setattr(row, column, getattr(fresh, column))
+        session.add_all(aggregated.values())
+
+
+def _average(row) -> Optional[float]:
+    return round(row.score_sum / row.scored_periods, 1) if row.scored_periods else None
+
+
+def load_shift_history_summary(session, company_id: int) -> Dict:
+    """Builds the fixed-size history summary that the final evaluation prompt receives."""
+    rows = session.query(ShiftHistoryFeature).filter(ShiftHistoryFeature.company_id == company_id).all()
+    company = next((r for r in rows if r.feature_type == "company"), None)
+    members = sorted((r for r in rows if r.feature_type == "member"), key=lambda r: (-r.periods, -r.shift_days, r.feature_key))
+    staffing_mix = sorted((r for r in rows if r.feature_type == "staffing_mix"), key=lambda r: r.feature_key)
+
+    recent_evaluations = session.query(
+        EvaluateDecisionShift.start_day,
+        EvaluateDecisionShift.finish_day,
+        EvaluateDecisionShift.evaluate
+    ).filter(
+        EvaluateDecisionShift.company_id == company_id
+    ).order_by(EvaluateDecisionShift.finish_day.desc()).limit(MAX_RECENT_EVALUATIONS).all()
+
+    return {
+        "periods": company.periods if company else 0,
+        "average_score": _average(company) if company else None,
+        "members": [
+            {
+                "user_id": int(r.feature_key),
+                "periods": r.periods,
+                "shift_days": r.shift_days,
+                "high_score_periods": r.high_score_periods,
+                "low_score_periods": r.low_score_periods,
+                "average_score": _average(r)
+            }
+            for r in members[:MAX_SUMMARY_MEMBERS]
+        ],
+        "staffing_mix": [
+            {"feature": r.feature_key, "periods": r.periods, "average_score": _average(r)}
+            for r in staffing_mix
+        ],
+        "recent_evaluations": [
+            {"start_day": e.start_day.isoformat(), "finish_day": e.finish_day.isoformat(), "evaluate": e.evaluate}
+            for e in reversed(recent_evaluations)
+        ]
+    }
+
+
+def get_shift_history_summary(company_id: int) -> Dict:
+    with get_session_scope() as session:
+        return load_shift_history_summary(session, company_id)
+
+
+def get_owner_score(company_id: int, first_day, last_day) -> Optional[float]:
+    with get_session_scope() as session:
+        return load_owner_score(session, company_id, first_day, last_day)
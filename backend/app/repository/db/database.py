@@ -1,5 +1,6 @@
 from .db_init import get_db_connection
 from .models import Base
+from .migrations import stamp
 
 def drop_tables():
     try:
@@ -15,6 +16,8 @@ def create_tables():
     try:
         engine = get_db_connection()
         Base.metadata.create_all(engine)
+        # create_allは最新のスキーマを作るので，全マイグレーションを適用済みとして記録する
+        stamp(engine)
         print("All tables created successfully")
         return True
     except Exception as e:
@@ -1,6 +1,7 @@
 import os
 import sys
 from contextlib import contextmanager
+from contextvars import ContextVar
 from google.cloud.sql.connector import Connector
 import sqlalchemy
 from sqlalchemy.orm import sessionmaker
@@ -9,13 +10,18 @@ from sqlalchemy.orm import sessionmaker
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 from secret_manager.secret_key import get_cloudsql_secret
 
-connector = Connector()
+# Connectorは認証情報を読むので，最初の接続時まで作らない
+connector = None
 engine = None
 Session = None
+# unit_of_work()の中で，get_session_scope()が共有するセッション
+_unit_of_work_session = ContextVar("unit_of_work_session", default=None)
 
 def get_db_connection():
-    global engine
+    global engine, connector
     if engine is None:
+        if connector is None:
+            connector = Connector()
         PROJECT_ID = "jacksen-server"
         
         db_config_string = get_cloudsql_secret(PROJECT_ID, "cloud-sql-secret")
@@ -69,6 +75,13 @@ def get_db_session():
 
 @contextmanager
 def get_session_scope():
+    shared_session = _unit_of_work_session.get()
+    if shared_session is not None:
+        # unit_of_workの中では同じセッションを使い，コミット・ロールバックはunit_of_workに任せる
+        yield shared_session
+        shared_session.flush()
+        return
+
     init_session()
     session = Session()
     try:
@@ -81,6 +94,39 @@ def get_session_scope():
     finally:
         session.close()
 
+@contextmanager
+def unit_of_work():
+    """
+    ブロック内のget_session_scope()を1つのセッション・1つのトランザクションにまとめ，最後に1回だけコミットする。
+    途中で例外が起きればすべてロールバックされる。
+    """
+    shared_session = _unit_of_work_session.get()
+    if shared_session is not None:
+        # 入れ子のときは外側のトランザクションに参加する
+        yield shared_session
+        return
+
+    init_session()
+    connection = get_db_connection().connect()
+    transaction = connection.begin()
+    # リポジトリ関数内のsession.commit()はflushだけになり，トランザクションはここでコミットする
+    # autoflushを切り，flushはリポジトリ関数の区切りごとにまとめて行う
+    session = Session(bind=connection, join_transaction_mode="rollback_only", autoflush=False)
+    token = _unit_of_work_session.set(session)
+    try:
+        yield session
+        session.flush()
+        transaction.commit()
+    except Exception as e:
+        if transaction.is_active:
+            transaction.rollback()
+        print(f"Database operation failed, rolled back: {e}")
+        raise
+    finally:
+        _unit_of_work_session.reset(token)
+        session.close()
+        connection.close()
+
 def test_db_connection():
     engine = get_db_connection()
     if engine:
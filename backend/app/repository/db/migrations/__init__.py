@@ -0,0 +1,8 @@
+from .runner import migrations, LATEST_VERSION, current_version, upgrade, downgrade, stamp
+
+migration_services = {
+    "current_version": current_version,
+    "upgrade": upgrade,
+    "downgrade": downgrade,
+    "stamp": stamp
+}
\ No newline at end of file
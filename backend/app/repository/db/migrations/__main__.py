@@ -0,0 +1,32 @@
+"""
+Applies or reverts the schema migrations of the Cloud SQL database.
+
+Run from the repository root:
+    python -m backend.app.repository.db.migrations upgrade
+    python -m backend.app.repository.db.migrations downgrade --to 1
+    python -m backend.app.repository.db.migrations current
+"""
+import argparse
+
+from .runner import LATEST_VERSION, current_version, downgrade, stamp, upgrade
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["upgrade", "downgrade", "stamp", "current"])
+    parser.add_argument("--to", type=int, help=f"the target version (upgrade/stamp: {LATEST_VERSION}, downgrade: required)")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        upgrade(target=args.to)
+    elif args.command == "downgrade":
+        if args.to is None:
+            parser.error("downgrade requires --to")
+        downgrade(target=args.to)
+    elif args.command == "stamp":
+        stamp(version=args.to)
+    print(f"現在のスキーマのバージョン: {current_version()} (最新: {LATEST_VERSION})")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,13 @@
+from ..models import Base
+
+version = 1
+name = "baseline"
+
+
+def upgrade(connection):
+    # 既存のデータベースはそのまま基準版とし，まだ無いテーブルだけを作る
+    Base.metadata.create_all(connection, checkfirst=True)
+
+
+def downgrade(connection):
+    raise ValueError("基準版のスキーマは戻せません。")
\ No newline at end of file
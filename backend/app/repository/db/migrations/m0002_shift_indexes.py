@@ -0,0 +1,26 @@
+from sqlalchemy import text
+
+version = 2
+name = "shift_indexes"
+
+# シフト系テーブルは (company_id, day) の範囲で絞り込み，開始時刻順に並べて読むことが多い
+INDEXES = [
+    ("ix_submitted_shift_company_id_day_start_time", "submitted_shift", ["company_id", "day", "start_time"]),
+    ("ix_edit_shift_company_id_day_start_time", "edit_shift", ["company_id", "day", "start_time"]),
+    ("ix_decision_shift_company_id_day_start_time", "decision_shift", ["company_id", "day", "start_time"]),
+    ("ix_company_rest_day_company_id_rest_day", "company_rest_day", ["company_id", "rest_day"]),
+    ("ix_user_profile_company_id", "user_profile", ["company_id"]),
+    ("ix_user_profile_user_id", "user_profile", ["user_id"]),
+    ("ix_user_company_id", "user", ["company_id"]),
+    ("ix_evaluate_decision_shift_company_id_finish_day", "evaluate_decision_shift", ["company_id", "finish_day"]),
+]
+
+
+def upgrade(connection):
+    for index_name, table_name, columns in INDEXES:
+        connection.execute(text(f'CREATE INDEX IF NOT EXISTS {index_name} ON "{table_name}" ({", ".join(columns)})'))
+
+
+def downgrade(connection):
+    for index_name, _, _ in INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import text
+
+version = 3
+name = "decision_shift_unique"
+
+INDEX_NAME = "uq_decision_shift_user_company_day_time"
+COLUMNS = ["user_id", "company_id", "day", "start_time", "finish_time"]
+
+
+def upgrade(connection):
+    # 確定処理で重複して入った行を1件に寄せてから一意インデックスを張る
+    connection.execute(text(
+        "DELETE FROM decision_shift WHERE decision_shift_id NOT IN ("
+        f"SELECT MIN(decision_shift_id) FROM decision_shift GROUP BY {', '.join(COLUMNS)})"
+    ))
+    connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON decision_shift ({', '.join(COLUMNS)})"))
+
+
+def downgrade(connection):
+    connection.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
\ No newline at end of file
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import insert, select
+
+from ..models import DecisionShift, EvaluateDecisionShift, ShiftHistoryFeature, UserProfile
+from ...crud.shift_history.shift_history_feature import add_period, new_feature_row, owner_evaluation_score, period_features
+
+version = 4
+name = "shift_history_backfill"
+
+
+def _month(day):
+    first_day = day.replace(day=1)
+    return first_day, (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def _periods(decision_shifts, evaluations):
+    # オーナーの評価がある期間はその期間と点数で，それ以外の確定シフトは点数なしで月ごとにまとめる（evaluationsは新しい順）
+    periods = defaultdict(list)
+    for shift in decision_shifts:
+        evaluation = next((e for e in evaluations if e.start_day <= shift["day"] <= e.finish_day), None)
+        if evaluation is None:
+            periods[_month(shift["day"]) + (None,)].append(shift)
+        else:
+            periods[(evaluation.start_day, evaluation.finish_day, _owner_score(evaluations, evaluation))].append(shift)
+    return periods
+
+
+def _owner_score(evaluations, period):
+    # 同じ期間の評価のうち，点数を読める最新のもの
+    for evaluation in evaluations:
+        if (evaluation.start_day, evaluation.finish_day) == (period.start_day, period.finish_day):
+            score = owner_evaluation_score(evaluation.evaluate)
+            if score is not None:
+                return round(score)
+    return None
+
+
+def load_history_sources(connection):
+    """Returns the decision shifts, members and owner evaluations (newest first) of every company."""
+    decision_shifts = defaultdict(list)
+    for row in connection.execute(select(DecisionShift.company_id, DecisionShift.user_id, DecisionShift.day)):
+        decision_shifts[row.company_id].append({"user_id": row.user_id, "day": row.day})
+
+    company_member = defaultdict(list)
+    for row in connection.execute(select(UserProfile.company_id, UserProfile.user_id, UserProfile.experience)):
+        company_member[row.company_id].append({"user_id": row.user_id, "experience": row.experience})
+
+    evaluations = defaultdict(list)
+    for row in connection.execute(
+        select(EvaluateDecisionShift.company_id, EvaluateDecisionShift.start_day, EvaluateDecisionShift.finish_day, EvaluateDecisionShift.evaluate)
+        .where(EvaluateDecisionShift.start_day.is_not(None), EvaluateDecisionShift.finish_day.is_not(None))
+        .order_by(EvaluateDecisionShift.finish_day.desc(), EvaluateDecisionShift.evaluate_decision_shift_id.desc())
+    ):
+        evaluations[row.company_id].append(row)
+    return decision_shifts, company_member, evaluations
+
+
+def upgrade(connection):
+    # 特徴量テーブルができる前に確定したシフトを，既存のdecision_shiftから集計して入れる
+    # 確定時に更新済みの会社は二重に数えないよう対象外にする
+    ShiftHistoryFeature.__table__.create(connection, checkfirst=True)
+    recorded = set(connection.execute(select(ShiftHistoryFeature.company_id).distinct()).scalars())
+    decision_shifts, company_member, evaluations = load_history_sources(connection)
+
+    feature_rows = []
+    for company_id, shifts in decision_shifts.items():
+        if company_id in recorded:
+            continue
+        rows = {}
+        for (_, last_day, score), period_shifts in sorted(_periods(shifts, evaluations[company_id]).items(), key=lambda p: p[0][:2]):
+            for (feature_type, feature_key), shift_days in period_features(period_shifts, company_member[company_id]).items():
+                row = rows.get((feature_type, feature_key))
+                if row is None:
+                    row = rows[(feature_type, feature_key)] = new_feature_row(company_id, feature_type, feature_key)
+                add_period(row, shift_days, last_day, score)
+        feature_rows += rows.values()
+
+    if feature_rows:
+        columns = [c for c in ShiftHistoryFeature.__table__.columns if not c.primary_key]
+        connection.execute(insert(ShiftHistoryFeature), [{c.name: getattr(row, c.key) for c in columns} for row in feature_rows])
+
+
+def downgrade(connection):
+    # 集計した行は確定時に加算された分と区別できないので，そのまま残す
+    pass
\ No newline at end of file
@@ -0,0 +1,44 @@
+from sqlalchemy import delete, insert, select
+
+from ..models import ShiftHistoryFeature, ShiftHistoryPeriod
+from ...crud.shift_history.shift_history_feature import aggregate_features, encode_period_features, period_features
+from .m0004_shift_history_backfill import _periods, load_history_sources
+
+version = 5
+name = "shift_history_period"
+
+
+def upgrade(connection):
+    # 確定のたびに差分を加算していた特徴量は，同じ期間を確定し直すと二重に数えている
+    # 確定シフトを期間ごとにまとめて期間表に入れ，特徴量をその期間表から作り直す
+    ShiftHistoryPeriod.__table__.create(connection, checkfirst=True)
+    connection.execute(delete(ShiftHistoryPeriod))
+    decision_shifts, company_member, evaluations = load_history_sources(connection)
+
+    period_rows = []
+    for company_id, shifts in decision_shifts.items():
+        for (first_day, last_day, score), period_shifts in _periods(shifts, evaluations[company_id]).items():
+            period_rows.append({
+                "company_id": company_id,
+                "first_day": first_day,
+                "last_day": last_day,
+                "score": score,
+                "features": encode_period_features(period_features(period_shifts, company_member[company_id]))
+            })
+    if period_rows:
+        connection.execute(insert(ShiftHistoryPeriod), period_rows)
+
+    periods = connection.execute(select(ShiftHistoryPeriod)).all()
+    feature_rows = []
+    for company_id in decision_shifts:
+        feature_rows += aggregate_features(company_id, [p for p in periods if p.company_id == company_id]).values()
+
+    connection.execute(delete(ShiftHistoryFeature))
+    if feature_rows:
+        columns = [c for c in ShiftHistoryFeature.__table__.columns if not c.primary_key]
+        connection.execute(insert(ShiftHistoryFeature), [{c.name: getattr(row, c.key) for c in columns} for row in feature_rows])
+
+
+def downgrade(connection):
+    # 作り直した特徴量はそのまま残し，期間表だけを消す
+    ShiftHistoryPeriod.__table__.drop(connection, checkfirst=True)
\ No newline at end of file
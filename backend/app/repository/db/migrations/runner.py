@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from ..db_init import get_db_connection
+from ..models import SchemaVersion
+from . import m0001_baseline, m0002_shift_indexes, m0003_decision_shift_unique, m0004_shift_history_backfill, m0005_shift_history_period
+
+# 適用順に並べる（versionは1からの連番）
+migrations = [
+    m0001_baseline,
+    m0002_shift_indexes,
+    m0003_decision_shift_unique,
+    m0004_shift_history_backfill,
+    m0005_shift_history_period,
+]
+
+LATEST_VERSION = migrations[-1].version
+
+
+def current_version(engine=None) -> int:
+    engine = engine or get_db_connection()
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        return connection.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+
+def upgrade(engine=None, target: Optional[int] = None) -> List[int]:
+    """Applies the migrations after the current version up to target (the latest if None)."""
+    engine = engine or get_db_connection()
+    target = LATEST_VERSION if target is None else target
+    current = current_version(engine)
+
+    applied = []
+    for migration in migrations:
+        if current < migration.version <= target:
+            # 1つのマイグレーションとその版の記録を同じトランザクションで行う
+            with engine.begin() as connection:
+                migration.upgrade(connection)
+                connection.execute(insert(SchemaVersion).values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.now()
+                ))
+            print(f"マイグレーション{migration.version:04d}_{migration.name}を適用しました")
+            applied.append(migration.version)
+    return applied
+
+
+def downgrade(engine=None, target: int = 0) -> List[int]:
+    """Reverts the applied migrations above target, newest first."""
+    engine = engine or get_db_connection()
+    current = current_version(engine)
+
+    reverted = []
+    for migration in reversed(migrations):
+        if target < migration.version <= current:
+            with engine.begin() as connection:
+                migration.downgrade(connection)
+                connection.execute(delete(SchemaVersion).where(SchemaVersion.version == migration.version))
+            print(f"マイグレーション{migration.version:04d}_{migration.name}を戻しました")
+            reverted.append(migration.version)
+    return reverted
+
+
+def stamp(engine=None, version: Optional[int] = None):
+    """Records the migrations up to version as applied without running them (after create_all)."""
+    engine = engine or get_db_connection()
+    version = LATEST_VERSION if version is None else version
+    current = current_version(engine)
+    with engine.begin() as connection:
+        for migration in migrations:
+            if current < migration.version <= version:
+                connection.execute(insert(SchemaVersion).values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.now()
+                ))
\ No newline at end of file
@@ -5,6 +5,9 @@ from .company import Company
 from .decision_shift import DecisionShift
 from .edit_shift import EditShift
 from .evaluate_decision_shift import EvaluateDecisionShift
+from .schema_version import SchemaVersion
+from .shift_history_feature import ShiftHistoryFeature
+from .shift_history_period import ShiftHistoryPeriod
 from .submitted_shift import SubmittedShift
 from .user import User
 from .user_profile import UserProfile
@@ -17,6 +20,9 @@ tables = [
     EditShift,
     SubmittedShift,
     EvaluateDecisionShift,
+    ShiftHistoryFeature,
+    ShiftHistoryPeriod,
+    SchemaVersion,
     User,
     UserProfile,
 ]
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date
+from sqlalchemy import Column, Integer, ForeignKey, Date, Index
 from .base import Base
 
 class CompanyRestDay(Base):
     __tablename__ = "company_rest_day"
+    __table_args__ = (Index("ix_company_rest_day_company_id_rest_day", "company_id", "rest_day"),)
     company_rest_day_id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("company.company_id"))
     rest_day = Column(Date)
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, ForeignKey, Date, Time, Index
 from .base import Base
 
 class DecisionShift(Base):
     __tablename__ = "decision_shift"
+    __table_args__ = (
+        Index("ix_decision_shift_company_id_day_start_time", "company_id", "day", "start_time"),
+        Index("uq_decision_shift_user_company_day_time", "user_id", "company_id", "day", "start_time", "finish_time", unique=True),
+    )
     decision_shift_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("user.user_id"))
     company_id = Column(Integer, ForeignKey("company.company_id"))
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, ForeignKey, Date, Time, Index
 from .base import Base
 
 class EditShift(Base):
     __tablename__ = "edit_shift"
+    __table_args__ = (Index("ix_edit_shift_company_id_day_start_time", "company_id", "day", "start_time"),)
     edit_shift_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("user.user_id"))
     company_id = Column(Integer, ForeignKey("company.company_id"))
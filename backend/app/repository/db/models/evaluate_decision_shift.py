@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, CheckConstraint, Date, Text
+from sqlalchemy import Column, Integer, CheckConstraint, Date, Text, Index
 from .base import Base
 
 class EvaluateDecisionShift(Base):
     __tablename__ = "evaluate_decision_shift"
+    __table_args__ = (Index("ix_evaluate_decision_shift_company_id_finish_day", "company_id", "finish_day"),)
     evaluate_decision_shift_id = Column(Integer, primary_key=True)
     company_id = Column(Integer)
     start_day = Column(Date)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, Text, DateTime
+from .base import Base
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(Text)
+    applied_at = Column(DateTime)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, Text, Date, UniqueConstraint
+from .base import Base
+
+class ShiftHistoryFeature(Base):
+    __tablename__ = "shift_history_feature"
+    __table_args__ = (UniqueConstraint("company_id", "feature_type", "feature_key"),)
+    shift_history_feature_id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey("company.company_id"))
+    feature_type = Column(Text)  # company / member / staffing_mix
+    feature_key = Column(Text)
+    periods = Column(Integer, default=0)
+    shift_days = Column(Integer, default=0)
+    scored_periods = Column(Integer, default=0)
+    score_sum = Column(Integer, default=0)
+    high_score_periods = Column(Integer, default=0)
+    low_score_periods = Column(Integer, default=0)
+    last_day = Column(Date)
\ No newline at end of file
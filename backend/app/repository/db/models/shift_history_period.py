@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey, Text, Date, UniqueConstraint
+from .base import Base
+
+class ShiftHistoryPeriod(Base):
+    __tablename__ = "shift_history_period"
+    __table_args__ = (UniqueConstraint("company_id", "first_day", "last_day"),)
+    shift_history_period_id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey("company.company_id"))
+    first_day = Column(Date)
+    last_day = Column(Date)
+    score = Column(Integer)
+    features = Column(Text)  # [[feature_type, feature_key, shift_days], ...] のJSON
\ No newline at end of file
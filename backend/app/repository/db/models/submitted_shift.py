@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, ForeignKey, Date, Time, Index
 from .base import Base
 
 class SubmittedShift(Base):
     __tablename__ = "submitted_shift"
+    __table_args__ = (Index("ix_submitted_shift_company_id_day_start_time", "company_id", "day", "start_time"),)
     submitted_shift_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("user.user_id"))
     company_id = Column(Integer, ForeignKey("company.company_id"))
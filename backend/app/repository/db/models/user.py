@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, CheckConstraint, ForeignKey, Text
+from sqlalchemy import Column, Integer, CheckConstraint, ForeignKey, Text, Index
 from .base import Base
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_company_id", "company_id"),)
     user_id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("company.company_id"))
     email = Column(Text, unique=True)
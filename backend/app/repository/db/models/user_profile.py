@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, Date
+from sqlalchemy import Column, Integer, ForeignKey, Text, Date, Index
 from .base import Base
 from datetime import date
 
 class UserProfile(Base):
     __tablename__ = "user_profile"
+    __table_args__ = (
+        Index("ix_user_profile_company_id", "company_id"),
+        Index("ix_user_profile_user_id", "user_id"),
+    )
     user_profile_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("user.user_id"))
     company_id = Column(Integer, ForeignKey("company.company_id"))
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from .gemini_client import GEMINI_MODEL
+from .llm_cache import LLMResponseCache
+from .llm_metrics import estimate_tokens
+from .prompt_codec import decode_edit_shift, decode_shift_rules, encode_edit_shift, resolve_first_day
+from .shift_evaluator import FINAL_LABOR_COST_PENALTY, collect_member_shifts, evaluate_shift_schedule
+from .shift_solver import solve_shift_schedule
+
+
+def _load_rules(text: str) -> Dict:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return decode_shift_rules(text)
+
+
+def _load_schedule(text: str, shift_rules: Dict) -> List[Dict]:
+    try:
+        return json.loads(text).get("edit_shift", [])
+    except (json.JSONDecodeError, AttributeError):
+        company_id = shift_rules.get("company_info", {}).get("company_id")
+        return decode_edit_shift(text, resolve_first_day(shift_rules), company_id)
+
+
+def _dump_schedule(edit_shift: List[Dict], shift_rules: Dict, compact: bool) -> str:
+    if compact:
+        return encode_edit_shift(edit_shift, resolve_first_day(shift_rules))
+    return json.dumps({"edit_shift": edit_shift}, ensure_ascii=False)
+
+
+class FakeChatModel:
+    """
+    A deterministic, offline stand-in for the Gemini chat model (invoke / ainvoke).
+
+    Responses are looked up in replay_path first: a JSONL file of {"key", "content"} records as
+    written by RecordingChatModel, keyed like LLMResponseCache. Otherwise a valid response is
+    synthesized from the prompt: drafts come from the local solver, evaluations from the local
+    evaluator, and revisions echo the current draft. Every call sleeps latency_seconds.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, replay_path: Optional[str] = None, model: str = GEMINI_MODEL):
+        self.latency_seconds = latency_seconds
+        self.model = model
+        self.calls = 0
+        self.replayed = {}
+        if replay_path:
+            with open(replay_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.replayed[record["key"]] = record["content"]
+
+    def _respond(self, system_instruction: str, user_content: str) -> str:
+        replayed = self.replayed.get(LLMResponseCache.make_key(self.model, system_instruction, user_content))
+        if replayed is not None:
+            return replayed
+
+        compact = "コンパクト表形式のみで出力" in system_instruction
+        if system_instruction.startswith("You are an expert shift scheduler"):
+            shift_rules = _load_rules(user_content)
+            company_info = shift_rules.get("company_info", {})
+            schedule = solve_shift_schedule(shift_rules, company_info.get("first_day"), company_info.get("last_day"))
+            return _dump_schedule(schedule.model_dump()["edit_shift"], shift_rules, compact)
+
+        if "シフト修正者" in system_instruction:
+            current, _, _ = user_content.partition("\nEvaluation Result: ")
+            return current[len("Current Shift Draft: "):]
+
+        if "シフト評価者" in system_instruction:
+            preferences, _, draft = user_content.partition("\nShift Draft: ")
+            shift_rules = _load_rules(preferences[len("Employee Shift Preferences: "):])
+            company_info = shift_rules.get("company_info", {})
+            evaluation = evaluate_shift_schedule(
+                shift_rules,
+                _load_schedule(draft, shift_rules),
+                company_info.get("first_day"),
+                company_info.get("last_day")
+            )
+            return evaluation.model_dump_json(exclude={"breakdown"})
+
+        if "飲食店のシフトを厳密に評価する" in system_instruction:
+            _, _, detail = user_content.partition("\nShift Draft: ")
+            shift_rules = _load_rules(detail)
+            evaluation = evaluate_shift_schedule(
+                shift_rules,
+                collect_member_shifts(shift_rules),
+                labor_cost_penalty=FINAL_LABOR_COST_PENALTY
+            )
+            return json.dumps({"comment": evaluation.feedback_japanese}, ensure_ascii=False)
+
+        if "店長に伝える" in system_instruction:
+            return json.loads(user_content).get("feedback_japanese", "")
+
+        return ""
+
+    def _message(self, messages) -> AIMessage:
+        system_instruction, user_content = messages[0][1], messages[1][1]
+        self.calls += 1
+        content = self._respond(system_instruction, user_content)
+        input_tokens = estimate_tokens(system_instruction + user_content)
+        output_tokens = estimate_tokens(content)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        })
+
+    def invoke(self, messages) -> AIMessage:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._message(messages)
+
+    async def ainvoke(self, messages) -> AIMessage:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._message(messages)
+
+
+class RecordingChatModel:
+    """Wraps a chat model and appends every response to record_path for FakeChatModel to replay."""
+
+    def __init__(self, llm, record_path: str, model: str):
+        self.llm = llm
+        self.record_path = record_path
+        self.model = model
+        self._lock = threading.Lock()
+
+    def _record(self, messages, content: str):
+        key = LLMResponseCache.make_key(self.model, messages[0][1], messages[1][1])
+        with self._lock, open(self.record_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "content": content}, ensure_ascii=False) + "\n")
+
+    def invoke(self, messages):
+        response = self.llm.invoke(messages)
+        self._record(messages, response.content)
+        return response
+
+    async def ainvoke(self, messages):
+        response = await self.llm.ainvoke(messages)
+        self._record(messages, response.content)
+        return response
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import threading
+
+PROJECT_ID = "jacksen-server"
+SECRET_ID = "gemini-api-key"
+GEMINI_MODEL = "gemini-2.0-flash-lite"
+
+# "gemini"（既定）または "fake"（オフラインの決定的なスタンドイン，fake_llm.FakeChatModel）
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini")
+GEMINI_FAKE_LATENCY_SECONDS = float(os.getenv("GEMINI_FAKE_LATENCY_SECONDS", "0"))
+GEMINI_FAKE_REPLAY_PATH = os.getenv("GEMINI_FAKE_REPLAY_PATH") or None
+# 設定すると実際の応答をJSONLに記録する（GEMINI_FAKE_REPLAY_PATHで再生できる）
+GEMINI_RECORD_PATH = os.getenv("GEMINI_RECORD_PATH") or None
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def _build_llm():
+    if GEMINI_BACKEND == "fake":
+        from .fake_llm import FakeChatModel
+        return FakeChatModel(GEMINI_FAKE_LATENCY_SECONDS, GEMINI_FAKE_REPLAY_PATH)
+
+    # Secret Managerへのアクセスとlangchainの読み込みは初回利用時まで遅らせる
+    from langchain.chat_models import init_chat_model
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+    from app.secret_manager.secret_key import get_gemini_secret
+
+    llm = init_chat_model(
+        model=GEMINI_MODEL,
+        model_provider='google_genai',
+        temperature=0,
+        max_retries=0,  # 再試行は shift_creator.call_gemini_model で回数を記録しながら行う
+        api_key=get_gemini_secret(PROJECT_ID, SECRET_ID)
+    )
+    if GEMINI_RECORD_PATH:
+        from .fake_llm import RecordingChatModel
+        llm = RecordingChatModel(llm, GEMINI_RECORD_PATH, GEMINI_MODEL)
+    return llm
+
+
+def get_llm():
+    """Returns the shared Gemini chat model, building it on first use (thread-safe)."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = _build_llm()
+    return _llm
+
+
+def set_llm(llm):
+    """
+    Replaces the shared chat model (e.g. with fake_llm.FakeChatModel) and returns the previous one.
+    Passing None makes the next get_llm() build the configured backend again.
+    """
+    global _llm
+    with _llm_lock:
+        previous, _llm = _llm, llm
+    return previous
+
+
+async def aget_llm():
+    """Async version of get_llm; the first build runs in a thread so it does not block the event loop."""
+    if _llm is not None:
+        return _llm
+    return await asyncio.to_thread(get_llm)
+
+
+def warm_up_gemini_client() -> bool:
+    """
+    Builds the Gemini client ahead of the first request (e.g. at application startup).
+
+    Returns:
+        True if the client is ready, False if it could not be built; the error is printed and
+        the next get_llm() call retries.
+    """
+    try:
+        get_llm()
+        return True
+    except Exception as e:
+        print(f"Geminiクライアントの初期化に失敗しました: {e}")
+        return False
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from collections import deque
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class GeminiRequestLimit:
+    """
+    A process-wide cap on in-flight Gemini requests.
+
+    Threads (the sync path: job queue, windowed and best-of-N workers) block in acquire(), and
+    coroutines on any event loop wait in aacquire() without blocking the loop, so both paths
+    take slots from the same budget.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._available = limit
+        self._condition = threading.Condition()
+        self._async_waiters = deque()
+
+    def acquire(self, blocking: bool = True, timeout=None) -> bool:
+        with self._condition:
+            if not blocking:
+                if self._available <= 0:
+                    return False
+            elif not self._condition.wait_for(lambda: self._available > 0, timeout):
+                return False
+            self._available -= 1
+            return True
+
+    async def aacquire(self) -> bool:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._available > 0:
+                    self._available -= 1
+                    return True
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def release(self):
+        with self._condition:
+            if self._available >= self.limit:
+                raise ValueError("GeminiRequestLimit released too many times")
+            self._available += 1
+            self._condition.notify()
+            waiters = list(self._async_waiters)
+            self._async_waiters.clear()
+
+        # 待っているコルーチンを起こし，空いた枠はスレッドと取り合わせる（取れなければ再び待つ）
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # イベントループが既に閉じている
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,153 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("shift_agent.llm")
+
+# 1トークンあたりの文字数の目安（usage_metadataが返らない場合の概算）
+CHARS_PER_TOKEN = 4
+# snapshot()に含める直近のspan数
+RECENT_SPANS = 200
+
+_company_id = contextvars.ContextVar("llm_company_id", default=None)
+_request_spans = contextvars.ContextVar("llm_request_spans", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@contextmanager
+def llm_call_context(company_id=None):
+    """Tags every Gemini call made inside the block (including threads started with its context) with company_id."""
+    token = _company_id.set(company_id)
+    try:
+        yield
+    finally:
+        _company_id.reset(token)
+
+
+@contextmanager
+def collect_request_spans():
+    """Collects the spans of the Gemini calls made inside the block, e.g. for one HTTP request."""
+    spans = []
+    token = _request_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _request_spans.reset(token)
+
+
+def summarize_spans(spans: List[Dict]) -> Dict:
+    return {
+        "calls": len(spans),
+        "cache_hits": sum(1 for s in spans if s["cached"]),
+        "retries": sum(s["retries"] for s in spans),
+        "errors": sum(1 for s in spans if s["error"]),
+        "input_tokens": sum(s["input_tokens"] for s in spans),
+        "output_tokens": sum(s["output_tokens"] for s in spans),
+        "latency_seconds": round(sum(s["latency_seconds"] for s in spans), 3)
+    }
+
+
+class LLMMetrics:
+    """Thread-safe per-tool aggregates of the Gemini call spans, plus the most recent spans."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools = {}
+        self._recent = deque(maxlen=RECENT_SPANS)
+
+    def record(self, span: Dict):
+        with self._lock:
+            tool = self._tools.setdefault(span["tool"], {
+                "calls": 0,
+                "cache_hits": 0,
+                "retries": 0,
+                "errors": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latency_seconds_total": 0.0,
+                "latency_seconds_max": 0.0
+            })
+            tool["calls"] += 1
+            tool["cache_hits"] += int(span["cached"])
+            tool["retries"] += span["retries"]
+            tool["errors"] += int(bool(span["error"]))
+            tool["input_tokens"] += span["input_tokens"]
+            tool["output_tokens"] += span["output_tokens"]
+            tool["latency_seconds_total"] += span["latency_seconds"]
+            tool["latency_seconds_max"] = max(tool["latency_seconds_max"], span["latency_seconds"])
+            self._recent.append(span)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "tools": {name: dict(values) for name, values in self._tools.items()},
+                "recent_spans": list(self._recent)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._tools.clear()
+            self._recent.clear()
+
+    def to_prometheus(self) -> str:
+        """Renders the per-tool aggregates in the Prometheus text exposition format."""
+        metrics = [
+            ("calls", "gemini_calls_total", "counter", "Gemini calls, including cache hits."),
+            ("cache_hits", "gemini_cache_hits_total", "counter", "Gemini calls answered from the response cache."),
+            ("retries", "gemini_retries_total", "counter", "Retried Gemini requests."),
+            ("errors", "gemini_errors_total", "counter", "Gemini calls that failed after all retries."),
+            ("input_tokens", "gemini_input_tokens_total", "counter", "Prompt tokens sent to Gemini."),
+            ("output_tokens", "gemini_output_tokens_total", "counter", "Response tokens received from Gemini."),
+            ("latency_seconds_total", "gemini_latency_seconds_total", "counter", "Total Gemini call latency."),
+            ("latency_seconds_max", "gemini_latency_seconds_max", "gauge", "Slowest Gemini call.")
+        ]
+        tools = self.snapshot()["tools"]
+        lines = []
+        for key, name, kind, help_text in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for tool, values in sorted(tools.items()):
+                lines.append(f'{name}{{tool="{tool}"}} {values[key]}')
+        return "\n".join(lines) + "\n"
+
+
+llm_metrics = LLMMetrics()
+
+
+class LLMCallSpan:
+    """Measures one Gemini call; record() publishes it to llm_metrics, the request log and the logger."""
+
+    def __init__(self, tool: str, prompt: str):
+        self.tool = tool
+        self.prompt = prompt
+        self.retries = 0
+        self.started = time.perf_counter()
+
+    def record(self, response=None, content: Optional[str] = None, cached: bool = False, error: Optional[BaseException] = None):
+        usage = getattr(response, "usage_metadata", None) or {}
+        span = {
+            "tool": self.tool,
+            "company_id": _company_id.get(),
+            "cached": cached,
+            "input_tokens": 0 if cached else usage.get("input_tokens") or estimate_tokens(self.prompt),
+            "output_tokens": 0 if cached or content is None else usage.get("output_tokens") or estimate_tokens(content),
+            "estimated_tokens": not usage,
+            "latency_seconds": round(time.perf_counter() - self.started, 4),
+            "retries": self.retries,
+            "error": repr(error) if error else None,
+            "timestamp": time.time()
+        }
+        llm_metrics.record(span)
+        request_spans = _request_spans.get()
+        if request_spans is not None:
+            request_spans.append(span)
+        logger.info("gemini_call %s", json.dumps(span, ensure_ascii=False))
+        return span
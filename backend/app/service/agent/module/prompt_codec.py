@@ -0,0 +1,263 @@
+import json
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from .shift_timeline import format_minutes, infer_period, to_date, to_minutes
+
+# 列区切り文字（氏名などに含まれる場合は空白に置き換える）
+DELIMITER = "|"
+
+COMPACT_INPUT_INSTRUCTION = """
+
+### 入力形式（コンパクト表形式）
+入力データはJSONではなく、セクションごとの表形式で与えられます。
+- `#` で始まる行はセクション名と列名です。以降の行は `|` 区切りの値です。
+- `day` は `first_day` からの日数（0 = first_day）です。
+- `start` / `finish` は 0:00 からの分数です（例: 540 = 09:00、1320 = 22:00）。
+- `open` / `close` も同様に分数、`rest_day` は休業日の `day` の一覧です。
+- シフト希望 `submitted_shift`、シフト案 `edit_shift` は `user_id|day|start|finish` の行で与えられます。
+- `history`、`history_member`、`history_mix` は過去の確定期間の集計 `history_summary` です。
+- `evaluate_decision_shift` は直近の期間（`start_day|finish_day`、過去の日は負の `day`）とその評価です。
+"""
+
+COMPACT_OUTPUT_INSTRUCTION = """
+
+### 出力形式（上記のJSON出力形式の指定より優先）
+シフトスケジュールはJSONではなく、以下のコンパクト表形式のみで出力してください。1行目は `# edit_shift: user_id|day|start|finish` とし、2行目以降に1シフトを1行で `user_id|day|start|finish` の形式で出力します（day は first_day からの日数、start / finish は 0:00 からの分数）。同じ user_id と day の組み合わせは1行のみとしてください。他のテキストは一切含めないでください。
+"""
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace(DELIMITER, " ").replace("\n", " ")
+
+
+# history_summary の従業員ごとの列
+HISTORY_MEMBER_KEYS = ("user_id", "periods", "shift_days", "high_score_periods", "low_score_periods", "average_score")
+
+# company_member に埋め込まれうるシフトの種類（gemini_create_shift / gemini_evaluate_shift）
+MEMBER_SHIFT_KEYS = ("submitted_shift", "edit_shift")
+
+
+def resolve_first_day(shift_rules: Dict) -> Optional[str]:
+    """Returns the day that day offset 0 refers to in the compact encoding."""
+    first_day = shift_rules.get("company_info", {}).get("first_day")
+    for shift_key in MEMBER_SHIFT_KEYS:
+        if first_day is None:
+            first_day, _ = infer_period(shift_rules.get("company_member", []), shift_key)
+    return first_day
+
+
+def _shift_row(user_id, day_offset: int, start_time, finish_time) -> str:
+    return DELIMITER.join([
+        str(user_id),
+        str(day_offset),
+        str(to_minutes(start_time)),
+        str(to_minutes(finish_time))
+    ])
+
+
+def encode_edit_shift(edit_shift: List[Dict], first_day) -> str:
+    """Encodes schedule entries as `user_id|day|start|finish` rows relative to first_day."""
+    first_day = to_date(first_day)
+    rows = ["# edit_shift: user_id|day|start|finish"]
+    for entry in edit_shift:
+        rows.append(_shift_row(
+            entry["user_id"],
+            (to_date(entry["day"]) - first_day).days,
+            entry["start_time"],
+            entry["finish_time"]
+        ))
+    return "\n".join(rows)
+
+
+def encode_shift_rules(shift_rules: Dict) -> str:
+    """
+    Encodes the payload of gemini_create_shift / gemini_evaluate_shift as a compact table.
+
+    Repeated JSON keys are replaced by one column header per section, times by minutes from
+    midnight and days by their offset from company_info['first_day'] (inferred from the
+    embedded shifts when absent). Past evaluated periods get negative offsets.
+    """
+    company_info = shift_rules.get("company_info", {})
+    company_member = shift_rules.get("company_member", [])
+    first_day = resolve_first_day(shift_rules)
+    base_day = to_date(first_day) if first_day else None
+
+    def day_offset(day) -> int:
+        return (to_date(day) - base_day).days
+
+    lines = ["# company: company_id|first_day|open|close|labor_cost|comment"]
+    lines.append(DELIMITER.join([
+        _cell(company_info.get("company_id")),
+        _cell(first_day),
+        _cell(to_minutes(company_info["open_time"]) if company_info.get("open_time") else None),
+        _cell(to_minutes(company_info["close_time"]) if company_info.get("close_time") else None),
+        _cell(company_info.get("labor_cost")),
+        _cell(company_info.get("comment"))
+    ]))
+
+    lines.append("# company_member: user_id|name|evaluate|position|experience|hour_pay")
+    for member in company_member:
+        lines.append(DELIMITER.join(_cell(member.get(k)) for k in (
+            "user_id", "name", "evaluate", "position", "experience", "hour_pay"
+        )))
+
+    if base_day is None:
+        return "\n".join(lines)
+
+    lines.append("# rest_day: day")
+    lines.append(",".join(str(day_offset(d)) for d in company_info.get("rest_day", [])))
+
+    for shift_key in MEMBER_SHIFT_KEYS:
+        if not any(shift_key in m for m in company_member):
+            continue
+        lines.append(f"# {shift_key}: user_id|day|start|finish")
+        for member in company_member:
+            for shift in member.get(shift_key, []):
+                lines.append(_shift_row(member["user_id"], day_offset(shift["day"]), shift["start_time"], shift["finish_time"]))
+
+    history = shift_rules.get("history_summary")
+    if history:
+        lines.append("# history: periods|average_score")
+        lines.append(DELIMITER.join([_cell(history.get("periods")), _cell(history.get("average_score"))]))
+        lines.append("# history_member: user_id|periods|shift_days|high_score_periods|low_score_periods|average_score")
+        for member in history.get("members", []):
+            lines.append(DELIMITER.join(_cell(member.get(k)) for k in HISTORY_MEMBER_KEYS))
+        lines.append("# history_mix: feature|periods|average_score")
+        for mix in history.get("staffing_mix", []):
+            lines.append(DELIMITER.join(_cell(mix.get(k)) for k in ("feature", "periods", "average_score")))
+        lines.append("# evaluate_decision_shift: start_day|finish_day|evaluate")
+        for evaluation in history.get("recent_evaluations", []):
+            lines.append(DELIMITER.join([
+                str(day_offset(evaluation["start_day"])),
+                str(day_offset(evaluation["finish_day"])),
+                _cell(evaluation.get("evaluate"))
+            ]))
+    return "\n".join(lines)
+
+
+def _parse_sections(text: str) -> Dict[str, tuple]:
+    sections = {}
+    name = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#"):
+            header, _, columns = line[1:].partition(":")
+            name = header.strip()
+            sections[name] = ([c.strip() for c in columns.split(DELIMITER)], [])
+        elif line and name is not None:
+            sections[name][1].append(line)
+    return sections
+
+
+def _value(cell: str):
+    if cell == "":
+        return None
+    try:
+        return int(cell)
+    except ValueError:
+        return cell
+
+
+def _score(cell):
+    # 平均スコアは小数になりうる（_valueは整数以外を文字列のまま返す）
+    return float(cell) if isinstance(cell, str) else cell
+
+
+def decode_shift_rules(text: str) -> Dict:
+    """Decodes the output of encode_shift_rules back into the gemini_create_shift / gemini_evaluate_shift dict."""
+    sections = _parse_sections(text)
+
+    def rows(name: str) -> List[Dict]:
+        columns, lines = sections.get(name, ([], []))
+        return [dict(zip(columns, (_value(c) for c in line.split(DELIMITER)))) for line in lines]
+
+    company_rows = rows("company")
+    company = company_rows[0] if company_rows else {}
+    first_day = to_date(company["first_day"]) if company.get("first_day") else None
+
+    def day(offset) -> str:
+        return (first_day + timedelta(days=int(offset))).isoformat()
+
+    def shift(row: Dict) -> Dict:
+        return {
+            "day": day(row["day"]),
+            "start_time": format_minutes(row["start"]),
+            "finish_time": format_minutes(row["finish"])
+        }
+
+    company_info = {
+        "company_id": company.get("company_id"),
+        "first_day": company.get("first_day"),
+        "open_time": format_minutes(company["open"]) if company.get("open") is not None else None,
+        "close_time": format_minutes(company["close"]) if company.get("close") is not None else None,
+        "rest_day": [],
+        "labor_cost": company.get("labor_cost"),
+        "comment": company.get("comment")
+    }
+    rest_day_lines = sections.get("rest_day", ([], []))[1]
+    if first_day is not None and rest_day_lines:
+        company_info["rest_day"] = [day(d) for d in rest_day_lines[0].split(",") if d.strip()]
+
+    company_member = rows("company_member")
+    members = {m["user_id"]: m for m in company_member}
+    for shift_key in MEMBER_SHIFT_KEYS:
+        if shift_key not in sections or first_day is None:
+            continue
+        for member in company_member:
+            member[shift_key] = []
+        for row in rows(shift_key):
+            if row.get("user_id") in members:
+                members[row["user_id"]][shift_key].append(shift(row))
+
+    shift_rules = {"company_info": company_info, "company_member": company_member}
+    if "history" in sections:
+        history = rows("history")[0] if rows("history") else {}
+        shift_rules["history_summary"] = {
+            "periods": history.get("periods"),
+            "average_score": _score(history.get("average_score")),
+            "members": [{**row, "average_score": _score(row.get("average_score"))} for row in rows("history_member")],
+            "staffing_mix": [{**row, "average_score": _score(row.get("average_score"))} for row in rows("history_mix")],
+            "recent_evaluations": [
+                {"start_day": day(row["start_day"]), "finish_day": day(row["finish_day"]), "evaluate": row["evaluate"]}
+                for row in rows("evaluate_decision_shift")
+            ] if first_day is not None else []
+        }
+    return shift_rules
+
+
+def decode_edit_shift(text: str, first_day, company_id: int) -> List[Dict]:
+    """
+    Decodes `user_id|day|start|finish` rows produced by the model into edit_shift entries.
+    Section headers, code fences and malformed rows are skipped.
+    """
+    entries = []
+    if first_day is None:
+        return entries
+    first_day = to_date(first_day)
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("```"):
+            continue
+        cells = [c.strip() for c in line.replace(",", DELIMITER).split(DELIMITER)]
+        if len(cells) != 4:
+            continue
+        try:
+            user_id, day, start, finish = (int(c) for c in cells)
+        except ValueError:
+            continue
+        entries.append({
+            "user_id": user_id,
+            "company_id": company_id,
+            "day": (first_day + timedelta(days=day)).isoformat(),
+            "start_time": format_minutes(start),
+            "finish_time": format_minutes(finish)
+        })
+    return entries
+
+
+def decode_edit_shift_json(text: str, first_day, company_id: int) -> str:
+    """Decodes compact model output into the EditShiftSchedule JSON string used downstream."""
+    return json.dumps({"edit_shift": decode_edit_shift(text, first_day, company_id)}, ensure_ascii=False)
@@ -1,38 +1,16 @@
 import os
+import re
 import json
+import time
+import asyncio
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-from typing import Dict, List
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
-from langchain.chat_models import init_chat_model
+from typing import Callable, Dict, List, Optional
 from langchain.tools import tool
 
 
-# --- Pydantic Models ---
-class Shift(BaseModel):
-    """Represents a single shift with a day, start time, and finish time."""
-    shift_id: str = Field(..., description="The unique identifier for the shift.")
-    day: str = Field(..., description="The date of the shift in YYYY-MM-DD format.")
-    start: str = Field(..., description="The start time of the shift in HH:MM format.")
-    finish: str = Field(..., description="The finish time of the shift in HH:MM format.")
-
-class EditShiftEntry(BaseModel):
-    """Represents a single shift entry in the comprehensive schedule."""
-    user_id: str = Field(..., description="The name of the worker.")
-    company_id: int = Field(..., description="The ID of the company.")
-    day: str = Field(..., description="The date of the shift in YYYY-MM-DD format.")
-    start_time: str = Field(..., description="The start time of the shift in HH:MM format.")
-    finish_time: str = Field(..., description="The finish time of the shift in HH:MM format.")
-
-class EditShiftSchedule(BaseModel):
-    """Represents the comprehensive shift schedule for all employees."""
-    edit_shift: List[EditShiftEntry] = Field(..., description="A list of shift entries.")
-
-class ShiftEvaluation(BaseModel):
-    """Represents the evaluation result of a shift schedule."""
-    quantitative_score: int = Field(..., description="The quantitative score of the shift proposal.")
-    feedback_japanese: str = Field(..., description="Detailed feedback in Japanese.")
-
 # --- LLM and Environment Setup ---
 # 高橋の環境で
 # load_dotenv()
@@ -41,49 +19,53 @@ class ShiftEvaluation(BaseModel):
 #   os.environ["GOOGLE_API_KEY"] = os.getenv('GOOGLE_API_KEY')
 # else:
 #   print("Google API key not found.")
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
-from app.secret_manager.secret_key import get_gemini_secret
-
-PROJECT_ID = "jacksen-server"
-SECRET_ID = "gemini-api-key"
-api_key = get_gemini_secret(PROJECT_ID, SECRET_ID)
-
-llm = init_chat_model(
-    model="gemini-2.0-flash-lite",
-    model_provider='google_genai',
-    temperature=0,
-    max_retries=2,
-    api_key=api_key
+from .gemini_client import GEMINI_MODEL, aget_llm, get_llm
+from .gemini_request_limit import GeminiRequestLimit
+from .shift_models import Shift, EditShiftEntry, EditShiftSchedule, ShiftEvaluation
+from .llm_cache import LLMResponseCache
+from .llm_metrics import LLMCallSpan
+from .prompt_codec import (
+    COMPACT_INPUT_INSTRUCTION,
+    COMPACT_OUTPUT_INSTRUCTION,
+    decode_edit_shift_json,
+    encode_edit_shift,
+    encode_shift_rules,
+    resolve_first_day,
+)
+from .shift_evaluator import evaluate_shift_schedule
+from .shift_repair import repair_shift_schedule
+from .shift_solver import solve_shift_schedule
+from .shift_timeline import infer_period
+from .shift_windows import DEFAULT_WINDOW_DAYS, EMPTY_SCHEDULE, arun_windowed, run_windowed
+
+# Geminiクライアント（シークレット取得を含む）は gemini_client.get_llm() で初回利用時に作る
+
+# 同時に実行するGeminiリクエスト数の上限（同期・非同期の経路で共有するプロセス全体の枠）
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+_default_gemini_request_limit = GeminiRequestLimit(GEMINI_MAX_CONCURRENCY)
+# バッチ実行ではプロセス間共有のセマフォに差し替える
+_gemini_request_limit = _default_gemini_request_limit
+# プロセス間共有のセマフォを非同期経路で待つときの問い合わせ間隔
+GEMINI_LIMIT_POLL_SECONDS = 0.05
+
+# 失敗したGeminiリクエストの再試行回数と初回の待ち時間（再試行ごとに倍になる）
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BACKOFF_SECONDS = float(os.getenv("GEMINI_RETRY_BACKOFF_SECONDS", "1.0"))
+
+# temperature=0なので同じ入力には同じ応答を返せる（GEMINI_CACHE_SIZE=0でメモリ層を無効化）
+llm_cache = LLMResponseCache(
+    max_entries=int(os.getenv("GEMINI_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "86400")),
+    sqlite_path=os.getenv("GEMINI_CACHE_PATH") or None
 )
 
-# --- LLM-based Tool Helper ---
-def call_gemini_model(system_instruction: str, user_content: str) -> str:
-    """Calls the Gemini model with a system instruction and user content."""
-    messages = [
-        ("system", system_instruction),
-        ("human", user_content)
-    ]
-    response = llm.invoke(messages)
-    return response.content
+# Best-of-N で並列に作るドラフト数の上限（Geminiの同時リクエスト枠を1つの実行で使い切らないよう小さく保つ）
+SHIFT_CANDIDATE_PARALLELISM = int(os.getenv("SHIFT_CANDIDATE_PARALLELISM", "3"))
 
-# --- New Shift Creation Tool ---
-@tool
-def create_shift_draft_tool(full_json_input: str) -> str:
-    """
-    Creates a draft for a new shift based on a comprehensive JSON input.
-    This tool analyzes the full company and worker data to propose a new shift,
-    prioritizing the worker's requested shifts.
-
-    Args:
-        full_json_input: A string containing the full JSON data with company info,
-                        worker details, and constraints.
+_SCORE_PATTERN = re.compile(r"quantitative_score['\"]?\s*[:：]\s*(-?\d+(?:\.\d+)?)")
 
-    Returns:
-        A JSON string representing the newly created draft shift for one worker.
-    """
-    system_instruction = """You are an expert shift scheduler and planner. Your primary mission is to create a comprehensive shift schedule for ALL employees, based on the provided JSON data. This data includes company policies, detailed worker information, their individual shift preferences for the specified period, and overall operational constraints.
+# --- Prompts ---
+CREATE_SHIFT_DRAFT_INSTRUCTION = """You are an expert shift scheduler and planner. Your primary mission is to create a comprehensive shift schedule for ALL employees, based on the provided JSON data. This data includes company policies, detailed worker information, their individual shift preferences for the specified period, and overall operational constraints.
 
 Your main goal is to generate an optimal shift plan that simultaneously satisfies as many employee shift preferences as possible while strictly adhering to all company policies and operational constraints (e.g., worker availability, required skill levels for each shift, minimum rest periods, labor cost considerations, and specific pairing requirements like rookies with veterans).
 
@@ -101,55 +83,8 @@ Example Output:
   ]
 }
 """
-    user_content = full_json_input
-    response = call_gemini_model(system_instruction, user_content)
-    response = response.strip() # LLM応答の先頭・末尾の空白・改行を削除
-    # Remove markdown code block if present
-    if response.startswith("```json") and response.endswith("```"):
-        response = response[len("```json"): -len("```")].strip()
-    return response
-
-
-
-# --- Shift Evaluate Tool ---
-@tool
-def eval_shift_tool(input_data: str) -> str:
-    """
-    Evaluates a proposed shift schedule using a 100-point deduction system.
-    The evaluation prioritizes essential criteria like minimum staffing levels
-    for different roles (hall, cashier, kitchen) and adherence to labor cost limits.
-    Employee shift preferences are considered as a desirable goal. This tool
-    provides a quantitative score and detailed feedback in Japanese.
-
-    Args:
-        input_data: A JSON string containing both employee preferences and shift draft.
-                   Format: '{"employee_preferences": "...", "shift_draft": "..."}'
-                   Or a combined string with both data separated by a delimiter.
-
-    Returns:
-        A JSON string containing the evaluation results, including a quantitative score
-        based on deductions, and specific feedback in Japanese regarding adherence
-        to staffing requirements, labor cost constraints, and efforts made to accommodate
-        employee shift preferences.
-    """
-
-    # Parse input data to extract employee preferences and shift draft
-    try:
-        # Try to parse as structured JSON first
-        data = json.loads(input_data)
-        if isinstance(data, dict) and 'employee_preferences' in data and 'shift_draft' in data:
-            employee_preferences_json = data['employee_preferences']
-            shift_draft_json = data['shift_draft']
-        else:
-            # Fallback: treat as single string containing both data
-            employee_preferences_json = ""
-            shift_draft_json = input_data
-    except (json.JSONDecodeError, KeyError):
-        # Fallback: treat as single string containing both data
-        employee_preferences_json = ""
-        shift_draft_json = input_data
 
-    system_instruction = """あなたは熟練したシフト評価者であり、検証者です。与えられたシフト提案を、初期値100点からの減点方式で厳密に評価することがあなたの主な任務です。
+EVAL_SHIFT_INSTRUCTION = """あなたは熟練したシフト評価者であり、検証者です。与えられたシフト提案を、初期値100点からの減点方式で厳密に評価することがあなたの主な任務です。
 
 **評価基準（減点項目）:**
 1. **最低人員配置の未達:** ユーザーから入力された各ポジションにおいて、最低でもそれぞれ1人ずつスタッフが確保されていない場合、1箇所につき-3点。
@@ -175,58 +110,8 @@ def eval_shift_tool(input_data: str) -> str:
     "feedback_japanese": "初期スコア100点から、以下の点が減点されました.\n- ホール人員の不足：-9点 (〇月〇日の12:00-14:00にホール担当が0人でした.)\n- シフト希望の未考慮：-1点 (鈴木太郎さんの土曜午前希望が叶っていません.)\n人件費は予算内に収まっており、レジとキッチンの最低人員は満たされています。ホールの人員不足を解消し、鈴木さんの希望シフトを再検討できるか見てみましょう。"
 }
     """
-    # Create user content with both employee preferences and shift draft
-    user_content = f"Employee Shift Preferences: {employee_preferences_json}\nShift Draft: {shift_draft_json}"
-
-    response = call_gemini_model(system_instruction, user_content)
-    response = response.strip()
-
-    # Remove markdown code block if present
-    if response.startswith("```json") and response.endswith("```"):
-        response = response[len("```json"): -len("```")].strip()
-    elif response.startswith("```") and response.endswith("```"):
-        response = response[3:-3].strip()
-
-    return response
-
-
-
-# --- Shift Modify Tool ---
-@tool
-def modify_shift_tool(input_data: str) -> str:
-    """
-    Modifies a proposed shift schedule based on evaluation feedback.
-    This tool takes a JSON string containing both the current shift draft and
-    evaluation result, and generates a revised shift schedule that addresses
-    the identified issues, aiming to improve the evaluation score while
-    prioritizing employee preferences.
 
-    Args:
-        input_data: A JSON string containing both shift draft and evaluation result.
-                   Format: '{"shift_draft": "...", "evaluation_result": "..."}'
-                   Or a combined string with both data separated by a delimiter.
-
-    Returns:
-        A JSON string representing the modified shift schedule (EditShiftSchedule format).
-    """
-
-    # Parse input data to extract shift draft and evaluation result
-    try:
-        # Try to parse as structured JSON first
-        data = json.loads(input_data)
-        if isinstance(data, dict) and 'shift_draft' in data and 'evaluation_result' in data:
-            shift_draft_json = data['shift_draft']
-            evaluation_result_json = data['evaluation_result']
-        else:
-            # Fallback: treat as single string containing both data
-            shift_draft_json = input_data
-            evaluation_result_json = ""
-    except (json.JSONDecodeError, KeyError):
-        # Fallback: treat as single string containing both data
-        shift_draft_json = input_data
-        evaluation_result_json = ""
-
-    system_instruction = """あなたは熟練したシフト修正者です。与えられたシフト案と、その評価結果（スコアとフィードバック）を基に、シフト案を修正することがあなたの任務です。
+MODIFY_SHIFT_INSTRUCTION = """あなたは熟練したシフト修正者です。与えられたシフト案と、その評価結果（スコアとフィードバック）を基に、シフト案を修正することがあなたの任務です。
 
 **修正の目的:**
 * 評価スコアを改善すること。
@@ -252,60 +137,7 @@ def modify_shift_tool(input_data: str) -> str:
 }
     """
 
-    # Create user content with both shift draft and evaluation result
-    user_content = f"Current Shift Draft: {shift_draft_json}\nEvaluation Result: {evaluation_result_json}"
-
-    response = call_gemini_model(system_instruction, user_content)
-    response = response.strip()
-
-    # Remove markdown code block if present
-    if response.startswith("```json") and response.endswith("```"):
-        response = response[len("```json"): -len("```")].strip()
-    elif response.startswith("```") and response.endswith("```"):
-        response = response[3:-3].strip()
-
-    return response
-
-
-
-
-def eval_final_shift_tool(input_data: str) -> str:
-    """
-    Evaluates a proposed shift schedule using a 100-point deduction system.
-    The evaluation prioritizes essential criteria like minimum staffing levels
-    for different roles (hall, cashier, kitchen) and adherence to labor cost limits.
-    Employee shift preferences are considered as a desirable goal. This tool
-    provides a quantitative score and detailed feedback in Japanese.
-
-    Args:
-        input_data: A JSON string containing both employee preferences and shift draft.
-                   Format: '{"employee_preferences": "...", "shift_draft": "..."}'
-                   Or a combined string with both data separated by a delimiter.
-
-    Returns:
-        A JSON string containing the evaluation results, including a quantitative score
-        based on deductions, and specific feedback in Japanese regarding adherence
-        to staffing requirements, labor cost constraints, and efforts made to accommodate
-        employee shift preferences.
-    """
-
-    # Parse input data to extract employee preferences and shift draft
-    try:
-        # Try to parse as structured JSON first
-        data = json.loads(input_data)
-        if isinstance(data, dict) and 'employee_preferences' in data and 'shift_draft' in data:
-            employee_preferences_json = data['employee_preferences']
-            shift_draft_json = data['shift_draft']
-        else:
-            # Fallback: treat as single string containing both data
-            employee_preferences_json = ""
-            shift_draft_json = input_data
-    except (json.JSONDecodeError, KeyError):
-        # Fallback: treat as single string containing both data
-        employee_preferences_json = ""
-        shift_draft_json = input_data
-
-    system_instruction = """
+EVAL_FINAL_SHIFT_INSTRUCTION = """
 あなたは飲食店のシフトを厳密に評価するAIアシスタントです。与えられたシフトデータ、従業員情報、過去のシフト評価データを基に、以下の評価基準に従ってシフト案を評価し、結果をJSONオブジェクト形式で出力してください。
 
 ### 初期スコア
@@ -327,16 +159,18 @@ def eval_final_shift_tool(input_data: str) -> str:
     4. 算出した総人件費が `labor_cost` を上回っているか判定します。
 
 **3. 過去データとの相関（加点）**
-- **分析**: `company_member`情報と`evaluate_decision_shift`（`decision_shift`と`evaluate`を含む）を分析し、「特定の従業員がシフトに多く入ると評価が高くなる/低くなる」といった傾向を把握してください。
+- **分析**: `company_member`情報と`history_summary`（過去の確定期間の集計）を分析し、「特定の従業員がシフトに多く入ると評価が高くなる/低くなる」といった傾向を把握してください。
 - **条件**: 上記の分析結果と、今回評価する確定シフトの従業員構成に正の相関が見られる場合（例: 過去の評価が高いシフトに多く参加していた従業員が、今回のシフトにも適切に配置されているなど）。
 - **加点**: **+3点**。
 
 ### 入力データ
 - `company_member`: 全従業員の情報（時給 "hour_pay" を含む）。
 - 確定シフトスケジュールデータ: 評価対象のシフト。
-- `evaluate_decision_shift`:
-    - `decision_shift`: 過去のシフト履歴。
-    - `evaluate`: `decision_shift`に対応する期間のシフト全体の評価。
+- `history_summary`: 過去の確定シフトの集計（件数は履歴の長さによらず一定）。
+    - `periods` / `average_score`: 確定した期間の数とその平均スコア。
+    - `members`: 従業員ごとの参加期間数 `periods`、勤務日数 `shift_days`、高評価期間・低評価期間への参加数 `high_score_periods` / `low_score_periods`、参加期間の平均スコア `average_score`。
+    - `staffing_mix`: ベテラン比率 `veteran_share` と1日あたりの人数 `daily_staff` の区分ごとの期間数と平均スコア。
+    - `recent_evaluations`: 直近の期間（`start_day`〜`finish_day`）に対する評価 `evaluate`。
 - `labor_cost`: 人件費の予算。
 
 ### 出力フォーマット
@@ -352,46 +186,726 @@ def eval_final_shift_tool(input_data: str) -> str:
     'comment': '初期スコア100点から，{quantitative_score}と評価しました。\n- 人件費超過: -2点 (予算100,000円に対し、実績105,000円でした。)\n- キッチン人員不足: -3点 (XX月XX日の14:00-15:00のキッチン担当が0人でした。)\n- レジ人員不足: -3点 (XX月XX日の21:00-22:00のレジ担当が0人でした。)\n過去の評価傾向と今回のシフト構成に良い相関が見られたため+2点です。ホール人員は全ての時間帯で満たされています。人件費の削減と、特定時間帯の人員不足の解消が必要です。'
 }
     """
-    # Create user content with both employee preferences and shift draft
-    user_content = f"Employee Shift Preferences: {employee_preferences_json}\nShift Draft: {shift_draft_json}"
 
-    response = call_gemini_model(system_instruction, user_content)
-    response = response.strip()
+PHRASE_FEEDBACK_INSTRUCTION = """あなたは飲食店のシフト評価結果を店長に伝えるアシスタントです。入力として、ローカルで算出済みの評価結果（quantitative_score、feedback_japanese、減点内訳 breakdown）をJSONで受け取ります。
+
+スコアや減点内容を変更・再計算せず、その内容を店長に分かりやすい自然な日本語で伝えてください。全体的な評価を50文字程度，修正ポイント，修正箇所についてを50文字程度で出力してください。
+
+出力はフィードバックの本文のみとし、JSONやマークダウンなど他のテキストは一切含めないでください。
+"""
+
+# Best-of-N の各候補ドラフトで作成指示に追記する方針（temperature=0でも候補が分かれるようにする）
+CANDIDATE_HINTS = [
+    "",
+    "\nPriority for this draft: make sure every position is staffed in every hour of the business day.",
+    "\nPriority for this draft: keep the total labor cost well below labor_cost, preferring workers with a lower hour_pay.",
+    "\nPriority for this draft: grant as many of the submitted shift preferences as possible.",
+    "\nPriority for this draft: pair rookies with veterans and prefer workers with a high evaluate."
+]
+
 
+# --- LLM-based Tool Helper ---
+def set_gemini_request_limit(limit):
+    """
+    Caps the in-flight Gemini requests of both paths with `limit`, any semaphore with
+    acquire()/release() (e.g. a multiprocessing Manager BoundedSemaphore), so that several
+    processes can share one budget. None restores the process-wide GEMINI_MAX_CONCURRENCY cap.
+    """
+    global _gemini_request_limit
+    _gemini_request_limit = limit if limit is not None else _default_gemini_request_limit
+
+def _retry_delay(attempt: int) -> float:
+    return GEMINI_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+
+def call_gemini_model(system_instruction: str, user_content: str, tool_name: str = "call_gemini_model") -> str:
+    """
+    Calls the Gemini model with a system instruction and user content.
+
+    The call is retried up to GEMINI_MAX_RETRIES times and recorded as a span (tool_name,
+    company_id, tokens, latency, retries) in llm_metrics.
+    """
+    span = LLMCallSpan(tool_name, system_instruction + user_content)
+    cache_key = llm_cache.make_key(GEMINI_MODEL, system_instruction, user_content)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        span.record(content=cached, cached=True)
+        return cached
+
+    messages = [
+        ("system", system_instruction),
+        ("human", user_content)
+    ]
+    llm = get_llm()
+    while True:
+        try:
+            with _gemini_request_limit:
+                response = llm.invoke(messages)
+            break
+        except Exception as e:
+            if span.retries >= GEMINI_MAX_RETRIES:
+                span.record(error=e)
+                raise
+            time.sleep(_retry_delay(span.retries))
+            span.retries += 1
+    span.record(response, response.content)
+    llm_cache.set(cache_key, response.content)
+    return response.content
+
+@contextlib.asynccontextmanager
+async def _gemini_request_slot():
+    # 同期経路と同じ枠を，イベントループを塞がずに取る
+    limit = _gemini_request_limit
+    if isinstance(limit, GeminiRequestLimit):
+        await limit.aacquire()
+    else:
+        while not limit.acquire(False):
+            await asyncio.sleep(GEMINI_LIMIT_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        limit.release()
+
+async def acall_gemini_model(system_instruction: str, user_content: str, tool_name: str = "call_gemini_model") -> str:
+    """Async version of call_gemini_model, sharing the sync path's in-flight request cap."""
+    span = LLMCallSpan(tool_name, system_instruction + user_content)
+    cache_key = llm_cache.make_key(GEMINI_MODEL, system_instruction, user_content)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        span.record(content=cached, cached=True)
+        return cached
+
+    messages = [
+        ("system", system_instruction),
+        ("human", user_content)
+    ]
+    llm = await aget_llm()
+    while True:
+        try:
+            async with _gemini_request_slot():
+                response = await llm.ainvoke(messages)
+            break
+        except Exception as e:
+            if span.retries >= GEMINI_MAX_RETRIES:
+                span.record(error=e)
+                raise
+            await asyncio.sleep(_retry_delay(span.retries))
+            span.retries += 1
+    span.record(response, response.content)
+    llm_cache.set(cache_key, response.content)
+    return response.content
+
+def _strip_code_block(response: str) -> str:
+    response = response.strip() # LLM応答の先頭・末尾の空白・改行を削除
     # Remove markdown code block if present
     if response.startswith("```json") and response.endswith("```"):
         response = response[len("```json"): -len("```")].strip()
     elif response.startswith("```") and response.endswith("```"):
         response = response[3:-3].strip()
-
     return response
 
+def _instruction(system_instruction: str, prompt_format: str, compact_output: bool = False) -> str:
+    # compact形式では入力（と必要なら出力）の形式説明を追記する
+    if prompt_format != "compact":
+        return system_instruction
+    system_instruction += COMPACT_INPUT_INSTRUCTION
+    if compact_output:
+        system_instruction += COMPACT_OUTPUT_INSTRUCTION
+    return system_instruction
+
+def _eval_user_content(input_data: str) -> str:
+    # Parse input data to extract employee preferences and shift draft
+    try:
+        # Try to parse as structured JSON first
+        data = json.loads(input_data)
+        if isinstance(data, dict) and 'employee_preferences' in data and 'shift_draft' in data:
+            employee_preferences_json = data['employee_preferences']
+            shift_draft_json = data['shift_draft']
+        else:
+            # Fallback: treat as single string containing both data
+            employee_preferences_json = ""
+            shift_draft_json = input_data
+    except (json.JSONDecodeError, KeyError):
+        # Fallback: treat as single string containing both data
+        employee_preferences_json = ""
+        shift_draft_json = input_data
+
+    # Create user content with both employee preferences and shift draft
+    return f"Employee Shift Preferences: {employee_preferences_json}\nShift Draft: {shift_draft_json}"
+
+def _modify_user_content(input_data: str) -> str:
+    # Parse input data to extract shift draft and evaluation result
+    try:
+        # Try to parse as structured JSON first
+        data = json.loads(input_data)
+        if isinstance(data, dict) and 'shift_draft' in data and 'evaluation_result' in data:
+            shift_draft_json = data['shift_draft']
+            evaluation_result_json = data['evaluation_result']
+        else:
+            # Fallback: treat as single string containing both data
+            shift_draft_json = input_data
+            evaluation_result_json = ""
+    except (json.JSONDecodeError, KeyError):
+        # Fallback: treat as single string containing both data
+        shift_draft_json = input_data
+        evaluation_result_json = ""
+
+    # Create user content with both shift draft and evaluation result
+    return f"Current Shift Draft: {shift_draft_json}\nEvaluation Result: {evaluation_result_json}"
+
+# --- New Shift Creation Tool ---
+@tool
+def create_shift_draft_tool(full_json_input: str) -> str:
+    """
+    Creates a draft for a new shift based on a comprehensive JSON input.
+    This tool analyzes the full company and worker data to propose a new shift,
+    prioritizing the worker's requested shifts.
+
+    Args:
+        full_json_input: A string containing the full JSON data with company info,
+                        worker details, and constraints.
+
+    Returns:
+        A JSON string representing the newly created draft shift for one worker.
+    """
+    response = call_gemini_model(CREATE_SHIFT_DRAFT_INSTRUCTION, full_json_input, "create_shift_draft_tool")
+    return _strip_code_block(response)
+
+@tool
+async def acreate_shift_draft_tool(full_json_input: str) -> str:
+    """
+    Async version of create_shift_draft_tool.
+
+    Args:
+        full_json_input: A string containing the full JSON data with company info,
+                        worker details, and constraints.
+
+    Returns:
+        A JSON string representing the newly created draft shift.
+    """
+    response = await acall_gemini_model(CREATE_SHIFT_DRAFT_INSTRUCTION, full_json_input, "create_shift_draft_tool")
+    return _strip_code_block(response)
+
+
+
+# --- Shift Evaluate Tool ---
+@tool
+def eval_shift_tool(input_data: str) -> str:
+    """
+    Evaluates a proposed shift schedule using a 100-point deduction system.
+    The evaluation prioritizes essential criteria like minimum staffing levels
+    for different roles (hall, cashier, kitchen) and adherence to labor cost limits.
+    Employee shift preferences are considered as a desirable goal. This tool
+    provides a quantitative score and detailed feedback in Japanese.
+
+    Args:
+        input_data: A JSON string containing both employee preferences and shift draft.
+                   Format: '{"employee_preferences": "...", "shift_draft": "..."}'
+                   Or a combined string with both data separated by a delimiter.
+
+    Returns:
+        A JSON string containing the evaluation results, including a quantitative score
+        based on deductions, and specific feedback in Japanese regarding adherence
+        to staffing requirements, labor cost constraints, and efforts made to accommodate
+        employee shift preferences.
+    """
+    response = call_gemini_model(EVAL_SHIFT_INSTRUCTION, _eval_user_content(input_data), "eval_shift_tool")
+    return _strip_code_block(response)
+
+@tool
+async def aeval_shift_tool(input_data: str) -> str:
+    """
+    Async version of eval_shift_tool.
+
+    Args:
+        input_data: A JSON string containing both employee preferences and shift draft.
+                   Format: '{"employee_preferences": "...", "shift_draft": "..."}'
+
+    Returns:
+        A JSON string containing the quantitative score and Japanese feedback.
+    """
+    response = await acall_gemini_model(EVAL_SHIFT_INSTRUCTION, _eval_user_content(input_data), "eval_shift_tool")
+    return _strip_code_block(response)
+
+
+
+# --- Shift Modify Tool ---
+@tool
+def modify_shift_tool(input_data: str) -> str:
+    """
+    Modifies a proposed shift schedule based on evaluation feedback.
+    This tool takes a JSON string containing both the current shift draft and
+    evaluation result, and generates a revised shift schedule that addresses
+    the identified issues, aiming to improve the evaluation score while
+    prioritizing employee preferences.
+
+    Args:
+        input_data: A JSON string containing both shift draft and evaluation result.
+                   Format: '{"shift_draft": "...", "evaluation_result": "..."}'
+                   Or a combined string with both data separated by a delimiter.
+
+    Returns:
+        A JSON string representing the modified shift schedule (EditShiftSchedule format).
+    """
+    response = call_gemini_model(MODIFY_SHIFT_INSTRUCTION, _modify_user_content(input_data), "modify_shift_tool")
+    return _strip_code_block(response)
+
+@tool
+async def amodify_shift_tool(input_data: str) -> str:
+    """
+    Async version of modify_shift_tool.
+
+    Args:
+        input_data: A JSON string containing both shift draft and evaluation result.
+                   Format: '{"shift_draft": "...", "evaluation_result": "..."}'
+
+    Returns:
+        A JSON string representing the modified shift schedule (EditShiftSchedule format).
+    """
+    response = await acall_gemini_model(MODIFY_SHIFT_INSTRUCTION, _modify_user_content(input_data), "modify_shift_tool")
+    return _strip_code_block(response)
+
+
+
+
+def eval_final_shift_tool(input_data: str, prompt_format: str = "json") -> str:
+    """
+    Evaluates a proposed shift schedule using a 100-point deduction system.
+    The evaluation prioritizes essential criteria like minimum staffing levels
+    for different roles (hall, cashier, kitchen) and adherence to labor cost limits.
+    Employee shift preferences are considered as a desirable goal. This tool
+    provides a quantitative score and detailed feedback in Japanese.
+
+    Args:
+        input_data: A JSON string containing both employee preferences and shift draft.
+                   Format: '{"employee_preferences": "...", "shift_draft": "..."}'
+                   Or a combined string with both data separated by a delimiter.
+        prompt_format: "compact" if input_data is encoded with prompt_codec.encode_shift_rules.
+
+    Returns:
+        A JSON string containing the evaluation results, including a quantitative score
+        based on deductions, and specific feedback in Japanese regarding adherence
+        to staffing requirements, labor cost constraints, and efforts made to accommodate
+        employee shift preferences.
+    """
+    response = call_gemini_model(_instruction(EVAL_FINAL_SHIFT_INSTRUCTION, prompt_format), _eval_user_content(input_data), "eval_final_shift_tool")
+    return _strip_code_block(response)
+
+async def aeval_final_shift_tool(input_data: str, prompt_format: str = "json") -> str:
+    """Async version of eval_final_shift_tool."""
+    response = await acall_gemini_model(_instruction(EVAL_FINAL_SHIFT_INSTRUCTION, prompt_format), _eval_user_content(input_data), "eval_final_shift_tool")
+    return _strip_code_block(response)
+
+
+
+def phrase_evaluation_feedback_tool(evaluation_json: str) -> str:
+    """
+    Rewrites the templated feedback of a locally computed evaluation in natural Japanese.
+    The score and the itemized deductions are computed locally; the LLM only phrases them.
+
+    Args:
+        evaluation_json: A JSON string of a ShiftEvaluation including its breakdown.
+
+    Returns:
+        The Japanese feedback text.
+    """
+    response = call_gemini_model(PHRASE_FEEDBACK_INSTRUCTION, evaluation_json, "phrase_evaluation_feedback_tool")
+    return response.strip()
+
+
+
+def parse_quantitative_score(eval_result: str) -> Optional[float]:
+    """Extracts quantitative_score from an evaluation response, or None if it has none."""
+    try:
+        data = json.loads(eval_result)
+        if isinstance(data, dict) and isinstance(data.get("quantitative_score"), (int, float)):
+            return float(data["quantitative_score"])
+    except (json.JSONDecodeError, TypeError):
+        pass
+    match = _SCORE_PATTERN.search(eval_result or "")
+    return float(match.group(1)) if match else None
+
+
+def _encode_shift_request(shift_request_path: str, prompt_format: str):
+    """Returns (employee_preferences, decode) where decode turns a model schedule back into EditShiftSchedule JSON."""
+    if prompt_format != "compact":
+        return shift_request_path, lambda shift: shift
+    shift_rules = json.loads(shift_request_path)
+    first_day = resolve_first_day(shift_rules)
+    company_id = shift_rules.get("company_info", {}).get("company_id")
+    return encode_shift_rules(shift_rules), lambda shift: decode_edit_shift_json(shift, first_day, company_id)
+
+
+def _loop_steps(prompt_format: str):
+    """Returns the (draft, evaluate, modify) calls of the revision loop for the prompt format."""
+    if prompt_format != "compact":
+        return create_shift_draft_tool.invoke, eval_shift_tool.invoke, modify_shift_tool.invoke
+
+    def draft(full_input: str) -> str:
+        return _strip_code_block(call_gemini_model(_instruction(CREATE_SHIFT_DRAFT_INSTRUCTION, prompt_format, True), full_input, "create_shift_draft_tool"))
+
+    def evaluate(input_data: str) -> str:
+        return _strip_code_block(call_gemini_model(_instruction(EVAL_SHIFT_INSTRUCTION, prompt_format), _eval_user_content(input_data), "eval_shift_tool"))
+
+    def modify(input_data: str) -> str:
+        return _strip_code_block(call_gemini_model(_instruction(MODIFY_SHIFT_INSTRUCTION, prompt_format, True), _modify_user_content(input_data), "modify_shift_tool"))
+
+    return draft, evaluate, modify
+
+
+def _aloop_steps(prompt_format: str):
+    """Async version of _loop_steps."""
+    if prompt_format != "compact":
+        return acreate_shift_draft_tool.ainvoke, aeval_shift_tool.ainvoke, amodify_shift_tool.ainvoke
+
+    async def draft(full_input: str) -> str:
+        return _strip_code_block(await acall_gemini_model(_instruction(CREATE_SHIFT_DRAFT_INSTRUCTION, prompt_format, True), full_input, "create_shift_draft_tool"))
+
+    async def evaluate(input_data: str) -> str:
+        return _strip_code_block(await acall_gemini_model(_instruction(EVAL_SHIFT_INSTRUCTION, prompt_format), _eval_user_content(input_data), "eval_shift_tool"))
+
+    async def modify(input_data: str) -> str:
+        return _strip_code_block(await acall_gemini_model(_instruction(MODIFY_SHIFT_INSTRUCTION, prompt_format, True), _modify_user_content(input_data), "modify_shift_tool"))
+
+    return draft, evaluate, modify
+
+
+def _shift_period(shift_rules: Dict) -> tuple:
+    company_info = shift_rules.get("company_info", {})
+    first_day, last_day = infer_period(shift_rules.get("company_member", []))
+    return company_info.get("first_day") or first_day, company_info.get("last_day") or last_day
+
+
+def _warm_start_draft(shift_request_path: str, initial_draft: List[Dict], prompt_format: str) -> str:
+    """Encodes the entries of initial_draft that fall in the run's period as a draft in the prompt format."""
+    shift_rules = json.loads(shift_request_path)
+    first_day, last_day = _shift_period(shift_rules)
+    entries = [
+        entry for entry in initial_draft
+        if (first_day is None or str(entry["day"])[:10] >= first_day) and (last_day is None or str(entry["day"])[:10] <= last_day)
+    ]
+    if prompt_format == "compact":
+        return encode_edit_shift(entries, resolve_first_day(shift_rules))
+    return json.dumps({"edit_shift": entries}, ensure_ascii=False)
+
+
+def _candidate_instruction(index: int, prompt_format: str) -> str:
+    hint = CANDIDATE_HINTS[index % len(CANDIDATE_HINTS)]
+    if index >= len(CANDIDATE_HINTS):
+        hint += f" (variant {index // len(CANDIDATE_HINTS) + 1})"
+    return _instruction(CREATE_SHIFT_DRAFT_INSTRUCTION + hint, prompt_format, True)
+
+
+def _solver_candidate(shift_rules: Dict, prompt_format: str) -> str:
+    first_day, last_day = _shift_period(shift_rules)
+    schedule = solve_shift_schedule(shift_rules, first_day, last_day)
+    if prompt_format == "compact":
+        return encode_edit_shift(schedule.model_dump()["edit_shift"], resolve_first_day(shift_rules))
+    return schedule.model_dump_json()
+
+
+def _local_evaluation(shift_rules: Dict, shift: str, decode_shift: Callable) -> Optional[ShiftEvaluation]:
+    """Evaluates a draft with the local evaluator, or None if it cannot be parsed."""
+    first_day, last_day = _shift_period(shift_rules)
+    try:
+        edit_shift = json.loads(decode_shift(shift))["edit_shift"]
+        return evaluate_shift_schedule(shift_rules, edit_shift, first_day, last_day)
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _score_candidate(shift_rules: Dict, shift: str, decode_shift: Callable) -> Optional[int]:
+    """Scores a draft with the local evaluator, or None if it cannot be parsed."""
+    evaluation = _local_evaluation(shift_rules, shift, decode_shift)
+    return evaluation.quantitative_score if evaluation is not None else None
+
+
+def _select_candidate(shift_rules: Dict, drafts: List[tuple], decode_shift: Callable) -> tuple:
+    """Returns (best draft, candidate report) from (source, draft, seconds) tuples."""
+    candidates = []
+    for index, (source, shift, seconds) in enumerate(drafts):
+        candidates.append({
+            "candidate": index,
+            "source": source,
+            "score": _score_candidate(shift_rules, shift, decode_shift),
+            "seconds": seconds
+        })
+    scored = [c for c in candidates if c["score"] is not None]
+    best = max(scored, key=lambda c: c["score"]) if scored else candidates[-1]
+    best["selected"] = True
+    print(f"{len(drafts)}件の候補から{best['source']}の候補（ローカル評価: {best['score']}点）を選びました．")
+    return drafts[best["candidate"]][1], candidates
+
+
+def _best_of_n_draft(
+    shift_request_path: str,
+    employee_preferences: str,
+    decode_shift: Callable,
+    num_candidates: int,
+    parallelism: Optional[int],
+    prompt_format: str
+) -> tuple:
+    """Generates the solver draft and num_candidates - 1 Gemini drafts in parallel and keeps the best."""
+    shift_rules = json.loads(shift_request_path)
+
+    def generate(index: int) -> tuple:
+        started = time.perf_counter()
+        if index == 0:
+            shift, source = _solver_candidate(shift_rules, prompt_format), "solver"
+        else:
+            response = call_gemini_model(_candidate_instruction(index - 1, prompt_format), employee_preferences, "create_shift_draft_tool")
+            shift, source = _strip_code_block(response), "gemini"
+        return source, shift, time.perf_counter() - started
+
+    contexts = [contextvars.copy_context() for _ in range(num_candidates)]
+    with ThreadPoolExecutor(max_workers=min(parallelism or SHIFT_CANDIDATE_PARALLELISM, num_candidates)) as executor:
+        drafts = list(executor.map(lambda context, index: context.run(generate, index), contexts, range(num_candidates)))
+    return _select_candidate(shift_rules, drafts, decode_shift)
+
+
+async def _abest_of_n_draft(
+    shift_request_path: str,
+    employee_preferences: str,
+    decode_shift: Callable,
+    num_candidates: int,
+    parallelism: Optional[int],
+    prompt_format: str
+) -> tuple:
+    """Async version of _best_of_n_draft."""
+    shift_rules = json.loads(shift_request_path)
+    semaphore = asyncio.Semaphore(parallelism or SHIFT_CANDIDATE_PARALLELISM)
+
+    async def generate(index: int) -> tuple:
+        async with semaphore:
+            started = time.perf_counter()
+            if index == 0:
+                # ソルバーとローカル評価はCPUを使うので，イベントループを塞がないようスレッドで動かす
+                shift, source = await asyncio.to_thread(_solver_candidate, shift_rules, prompt_format), "solver"
+            else:
+                response = await acall_gemini_model(_candidate_instruction(index - 1, prompt_format), employee_preferences, "create_shift_draft_tool")
+                shift, source = _strip_code_block(response), "gemini"
+            return source, shift, time.perf_counter() - started
+
+    drafts = await asyncio.gather(*(generate(index) for index in range(num_candidates)))
+    return await asyncio.to_thread(_select_candidate, shift_rules, list(drafts), decode_shift)
+
+
+class _ShiftRepairer:
+    """Applies the local repair pass to the drafts of the revision loop, keeping their prompt format."""
+
+    def __init__(self, shift_request_path: str, prompt_format: str, decode_shift: Callable):
+        self.shift_rules = json.loads(shift_request_path)
+        self.first_day, self.last_day = _shift_period(self.shift_rules)
+        self.base_day = resolve_first_day(self.shift_rules)
+        self.prompt_format = prompt_format
+        self.decode_shift = decode_shift
+        self.reports = []
+
+    def __call__(self, round_num: int, shift: str) -> tuple:
+        """Returns (the repaired draft, its local ShiftEvaluation), or (draft, None) if nothing was repaired."""
+        if self.prompt_format == "compact" and self.base_day is None:
+            return shift, None
+        try:
+            edit_shift = json.loads(self.decode_shift(shift))["edit_shift"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return shift, None
+
+        repaired, report = repair_shift_schedule(self.shift_rules, edit_shift, self.first_day, self.last_day)
+        if not report.changed:
+            return shift, None
+        self.reports.append({"round": round_num, "counts": report.counts})
+        print(f"シフト案を機械的に修復しました．({report.counts})")
+
+        if self.prompt_format == "compact":
+            shift = encode_edit_shift(repaired, self.base_day)
+        else:
+            shift = json.dumps({"edit_shift": repaired}, ensure_ascii=False)
+        return shift, evaluate_shift_schedule(self.shift_rules, repaired, self.first_day, self.last_day)
+
+
+def _ranking_score(evaluation: Optional[ShiftEvaluation]) -> Optional[float]:
+    # 表示する点数は0点で頭打ちになり，悪い案同士が同点になるので，比較には下限のない点数を使う
+    if evaluation is None:
+        return None
+    return evaluation.breakdown.raw_score if evaluation.breakdown is not None else float(evaluation.quantitative_score)
+
+
+class _RevisionTracker:
+    """
+    Keeps the best draft of the revision loop and decides when to stop early. Every draft is
+    ranked by the local evaluator's unfloored score; Gemini's evaluations only feed the modify step.
+    """
+
+    def __init__(self, target_score: float, patience: int):
+        self.target_score = target_score
+        self.patience = patience
+        self.best_shift = None
+        self.best_score = None
+        self.best_raw_score = None
+        self.best_round = None
+        self.stale_rounds = 0
+        self.rounds = []
+        self.draft_seconds = None
+        self.candidates = None
+        self.repairs = None
+        self.stop_reason = None
+
+    def observe(self, round_num: int, shift: str, evaluation: Optional[ShiftEvaluation]) -> Optional[str]:
+        """Records a draft scored by the local evaluator and returns the stop reason, or None to keep revising."""
+        raw_score = _ranking_score(evaluation)
+        score = evaluation.quantitative_score if evaluation is not None else None
+        self.rounds.append({
+            "round": round_num,
+            "score": score,
+            "raw_score": raw_score,
+            "gemini_score": None,
+            "eval_seconds": None,
+            "modify_seconds": None
+        })
+
+        if raw_score is not None and (self.best_raw_score is None or raw_score > self.best_raw_score):
+            self.best_shift, self.best_score, self.best_raw_score, self.best_round = shift, score, raw_score, round_num
+            self.stale_rounds = 0
+        elif round_num > 0:
+            self.stale_rounds += 1
+
+        if raw_score is not None and raw_score >= self.target_score:
+            self.stop_reason = "target_score"
+        elif self.patience and self.stale_rounds >= self.patience:
+            self.stop_reason = "plateau"
+        return self.stop_reason
+
+    def observe_repaired(self, round_num: int, shift: str, evaluation: ShiftEvaluation) -> Optional[str]:
+        """Like observe, for a draft changed by the repair pass; reaching target_score stops with "repaired"."""
+        if self.observe(round_num, shift, evaluation) == "target_score":
+            self.stop_reason = "repaired"
+        return self.stop_reason
+
+    def record_feedback(self, eval_result: str, eval_seconds: float):
+        """Records the Gemini evaluation passed to the modify step (reported, but not used for ranking)."""
+        self.rounds[-1]["gemini_score"] = parse_quantitative_score(eval_result)
+        self.rounds[-1]["eval_seconds"] = eval_seconds
+
+    def record_modify(self, modify_seconds: float):
+        self.rounds[-1]["modify_seconds"] = modify_seconds
+
+    def result(self, last_shift: str) -> str:
+        # スコアが一度も読み取れなかった場合は従来通り最後のシフトを返す
+        return self.best_shift if self.best_shift is not None else last_shift
+
+    def to_report(self) -> Dict:
+        return {
+            "draft_seconds": self.draft_seconds,
+            "candidates": self.candidates,
+            "repairs": self.repairs,
+            "rounds": self.rounds,
+            "best_round": self.best_round,
+            "best_score": self.best_score,
+            "best_raw_score": self.best_raw_score,
+            "stop_reason": self.stop_reason
+        }
 
 
 def shift_creator_run(
     shift_request_path: str,
-    numb_rate_revisions: int = 3
+    numb_rate_revisions: int = 3,
+    target_score: float = 100,
+    patience: int = 1,
+    return_report: bool = False,
+    on_progress: Optional[Callable] = None,
+    prompt_format: str = "json",
+    num_candidates: int = 1,
+    candidate_parallelism: Optional[int] = None,
+    repair: bool = True,
+    initial_draft: Optional[List[Dict]] = None
 ):
-    employee_preferences = shift_request_path
+    """
+    Drafts a shift schedule and refines it with up to numb_rate_revisions evaluate/modify rounds.
+
+    Every draft is scored with the local evaluator and the best one is returned; drafts are
+    compared on the evaluator's unfloored score, so drafts below 0 points still rank. Gemini
+    evaluates a draft only to give the modify step its feedback, so the loop makes at most
+    1 + 2 * numb_rate_revisions Gemini calls (plus num_candidates - 1 drafts with best-of-N).
+    The loop stops as soon as a draft reaches target_score, or when the score has not improved
+    for `patience` consecutive rounds (0 disables the plateau check).
+
+    Args:
+        shift_request_path: The JSON string of the shift rules.
+        numb_rate_revisions: The maximum number of modify rounds.
+        target_score: The score at which the loop stops.
+        patience: The number of non-improving rounds tolerated before stopping.
+        return_report: If True, returns (shift, report) with per-round scores and timings.
+        on_progress: Called as on_progress(stage, **detail) after the draft and each round.
+        prompt_format: "json" sends shift_request_path as is; "compact" sends it as the tabular
+                       encoding of prompt_codec and decodes the model's schedules back to JSON.
+        num_candidates: If greater than 1, the draft is the best of a solver draft and
+                        num_candidates - 1 Gemini drafts (each with a different priority hint),
+                        generated in parallel and scored with the local evaluator.
+        candidate_parallelism: The number of candidate drafts generated at once
+                               (SHIFT_CANDIDATE_PARALLELISM if None).
+        repair: If True, every draft goes through shift_repair before it is evaluated. A
+                repaired draft that reaches target_score stops the loop with stop reason "repaired".
+        initial_draft: Schedule entries to start the loop from instead of a Gemini draft,
+                       e.g. the warm-start projection of shift_warm_start (entries outside
+                       the period are ignored, so a windowed run can pass the whole period).
+
+    Returns:
+        The JSON string of the best shift schedule, with the report if return_report is True.
+    """
+    employee_preferences, decode_shift = _encode_shift_request(shift_request_path, prompt_format)
+    create_draft, evaluate_shift, modify_shift = _loop_steps(prompt_format)
+    shift_rules = json.loads(shift_request_path)
+    tracker = _RevisionTracker(target_score, patience)
+    repair_shift = _ShiftRepairer(shift_request_path, prompt_format, decode_shift) if repair else None
+    on_progress = on_progress or (lambda stage, **detail: None)
 
     # 初期シフトドラフトを作成
-    current_shift = create_shift_draft_tool.invoke(employee_preferences)
+    started = time.perf_counter()
+    if initial_draft is not None:
+        current_shift = _warm_start_draft(shift_request_path, initial_draft, prompt_format)
+        print("前期間の確定シフトを初期ドラフトとして使います．")
+    elif num_candidates > 1:
+        current_shift, tracker.candidates = _best_of_n_draft(
+            shift_request_path, employee_preferences, decode_shift, num_candidates, candidate_parallelism, prompt_format
+        )
+    else:
+        current_shift = create_draft(employee_preferences)
+    tracker.draft_seconds = time.perf_counter() - started
+    local_evaluation = None
+    if repair_shift:
+        current_shift, local_evaluation = repair_shift(0, current_shift)
     print(current_shift)
-    print("シフトドラフトが完成しました．")
+    print(f"シフトドラフトが完成しました．({tracker.draft_seconds:.1f}秒)")
+    on_progress("drafted")
 
-    # 評価・修正の繰り返し処理
-    for i in range(numb_rate_revisions):
+    # 評価・修正の繰り返し処理（案の比較と打ち切りはローカル評価器の点数で行い，Geminiの評価は修正の手がかりにだけ使う）
+    for i in range(numb_rate_revisions + 1):
         iteration_num = i + 1
 
         # シフトの評価
         print(f"{iteration_num}回目のシフトの評価をします．")
+        if local_evaluation is not None:
+            stop_reason = tracker.observe_repaired(i, current_shift, local_evaluation)
+        else:
+            stop_reason = tracker.observe(i, current_shift, _local_evaluation(shift_rules, current_shift, decode_shift))
+        print(f"{iteration_num}回目のシフトの評価が完了しました．(スコア: {tracker.rounds[-1]['score']})")
+        on_progress("evaluated", round=iteration_num, score=tracker.rounds[-1]["score"])
+
+        if stop_reason:
+            print(f"評価・修正を終了します．(理由: {stop_reason})")
+            break
+        if i == numb_rate_revisions:
+            tracker.stop_reason = "max_revisions"
+            break
+
+        # 修正に渡す評価をGeminiに作らせる
         eval_input = json.dumps({
             "employee_preferences": employee_preferences,
             "shift_draft": current_shift
         })
-        eval_result = eval_shift_tool.invoke(eval_input)
+        started = time.perf_counter()
+        eval_result = evaluate_shift(eval_input)
+        tracker.record_feedback(eval_result, time.perf_counter() - started)
         print(eval_result)
-        print(f"{iteration_num}回目のシフトの評価が完了しました．")
 
         # シフトの修正
         print(f"{iteration_num}回目のシフトの修正をします．")
@@ -399,7 +913,171 @@ def shift_creator_run(
             "shift_draft": current_shift,
             "evaluation_result": eval_result
         })
-        current_shift = modify_shift_tool.invoke(modify_input)
+        started = time.perf_counter()
+        current_shift = modify_shift(modify_input)
+        tracker.record_modify(time.perf_counter() - started)
+        if repair_shift:
+            current_shift, local_evaluation = repair_shift(iteration_num, current_shift)
         print(current_shift)
         print(f"{iteration_num}回目のシフト修正が完了しました．")
-    return current_shift
+        on_progress("modified", round=iteration_num)
+
+    if repair_shift:
+        tracker.repairs = repair_shift.reports
+    best_shift = decode_shift(tracker.result(current_shift))
+    if tracker.best_round is not None:
+        print(f"最良のシフトは{tracker.best_round + 1}回目の評価のもの（スコア: {tracker.best_score}）です．")
+    if return_report:
+        return best_shift, tracker.to_report()
+    return best_shift
+
+
+async def ashift_creator_run(
+    shift_request_path: str,
+    numb_rate_revisions: int = 3,
+    target_score: float = 100,
+    patience: int = 1,
+    return_report: bool = False,
+    on_progress: Optional[Callable] = None,
+    prompt_format: str = "json",
+    num_candidates: int = 1,
+    candidate_parallelism: Optional[int] = None,
+    repair: bool = True,
+    initial_draft: Optional[List[Dict]] = None
+):
+    """
+    Async version of shift_creator_run built on the chat model's async API.
+    Gemini requests share the process-wide GEMINI_MAX_CONCURRENCY cap with the sync path.
+    """
+    employee_preferences, decode_shift = _encode_shift_request(shift_request_path, prompt_format)
+    create_draft, evaluate_shift, modify_shift = _aloop_steps(prompt_format)
+    shift_rules = json.loads(shift_request_path)
+    tracker = _RevisionTracker(target_score, patience)
+    repair_shift = _ShiftRepairer(shift_request_path, prompt_format, decode_shift) if repair else None
+    on_progress = on_progress or (lambda stage, **detail: None)
+
+    # 初期シフトドラフトを作成
+    started = time.perf_counter()
+    if initial_draft is not None:
+        current_shift = _warm_start_draft(shift_request_path, initial_draft, prompt_format)
+    elif num_candidates > 1:
+        current_shift, tracker.candidates = await _abest_of_n_draft(
+            shift_request_path, employee_preferences, decode_shift, num_candidates, candidate_parallelism, prompt_format
+        )
+    else:
+        current_shift = await create_draft(employee_preferences)
+    tracker.draft_seconds = time.perf_counter() - started
+    local_evaluation = None
+    if repair_shift:
+        current_shift, local_evaluation = repair_shift(0, current_shift)
+    print(f"シフトドラフトが完成しました．({tracker.draft_seconds:.1f}秒)")
+    on_progress("drafted")
+
+    # 評価・修正の繰り返し処理（案の比較と打ち切りはローカル評価器の点数で行い，Geminiの評価は修正の手がかりにだけ使う）
+    for i in range(numb_rate_revisions + 1):
+        iteration_num = i + 1
+
+        if local_evaluation is not None:
+            stop_reason = tracker.observe_repaired(i, current_shift, local_evaluation)
+        else:
+            stop_reason = tracker.observe(i, current_shift, _local_evaluation(shift_rules, current_shift, decode_shift))
+        print(f"{iteration_num}回目のシフトの評価が完了しました．(スコア: {tracker.rounds[-1]['score']})")
+        on_progress("evaluated", round=iteration_num, score=tracker.rounds[-1]["score"])
+
+        if stop_reason:
+            print(f"評価・修正を終了します．(理由: {stop_reason})")
+            break
+        if i == numb_rate_revisions:
+            tracker.stop_reason = "max_revisions"
+            break
+
+        eval_input = json.dumps({
+            "employee_preferences": employee_preferences,
+            "shift_draft": current_shift
+        })
+        started = time.perf_counter()
+        eval_result = await evaluate_shift(eval_input)
+        tracker.record_feedback(eval_result, time.perf_counter() - started)
+
+        modify_input = json.dumps({
+            "shift_draft": current_shift,
+            "evaluation_result": eval_result
+        })
+        started = time.perf_counter()
+        current_shift = await modify_shift(modify_input)
+        tracker.record_modify(time.perf_counter() - started)
+        if repair_shift:
+            current_shift, local_evaluation = repair_shift(iteration_num, current_shift)
+        print(f"{iteration_num}回目のシフト修正が完了しました．")
+        on_progress("modified", round=iteration_num)
+
+    if repair_shift:
+        tracker.repairs = repair_shift.reports
+    best_shift = decode_shift(tracker.result(current_shift))
+    if return_report:
+        return best_shift, tracker.to_report()
+    return best_shift
+
+
+def _window_progress(on_progress: Optional[Callable], window_request: str) -> Callable:
+    on_progress = on_progress or (lambda stage, **detail: None)
+    window = json.loads(window_request).get("company_info", {}).get("first_day")
+    return lambda stage, **detail: on_progress(stage, window=window, **detail)
+
+
+def shift_creator_run_windowed(
+    shift_request_path: str,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable] = None,
+    **run_options
+) -> str:
+    """
+    Runs shift_creator_run per window of at most window_days days, generating the windows
+    concurrently in a thread pool, and stitches the windows into one EditShiftSchedule.
+
+    The period is taken from company_info['first_day'/'last_day'] (inferred from the submitted
+    shifts if absent). Each window gets the labor_cost pro-rated by its working days, so the
+    stitched schedule stays within the period's budget when every window stays within its own.
+
+    Args:
+        shift_request_path: The JSON string of the shift rules for the whole period.
+        window_days: The maximum number of days per window.
+        max_workers: The number of windows generated at once (WINDOW_MAX_WORKERS of shift_windows if None).
+        on_progress: Called as on_progress(stage, window=<first day of the window>, **detail).
+        **run_options: Passed to shift_creator_run (numb_rate_revisions, prompt_format, ...).
+
+    Returns:
+        The JSON string of the stitched shift schedule.
+    """
+    shift_rules = json.loads(shift_request_path)
+    first_day, last_day = _shift_period(shift_rules)
+    if first_day is None or last_day is None:
+        return EMPTY_SCHEDULE
+
+    def run_window(window_request: str) -> str:
+        return shift_creator_run(window_request, on_progress=_window_progress(on_progress, window_request), **run_options)
+
+    return run_windowed(shift_rules, first_day, last_day, run_window, window_days, max_workers)
+
+
+async def ashift_creator_run_windowed(
+    shift_request_path: str,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable] = None,
+    **run_options
+) -> str:
+    """
+    Async version of shift_creator_run_windowed. At most max_workers windows run concurrently on
+    the event loop, and their Gemini requests share the process-wide GEMINI_MAX_CONCURRENCY cap.
+    """
+    shift_rules = json.loads(shift_request_path)
+    first_day, last_day = _shift_period(shift_rules)
+    if first_day is None or last_day is None:
+        return EMPTY_SCHEDULE
+
+    async def run_window(window_request: str) -> str:
+        return await ashift_creator_run(window_request, on_progress=_window_progress(on_progress, window_request), **run_options)
+
+    return await arun_windowed(shift_rules, first_day, last_day, run_window, window_days, max_workers)
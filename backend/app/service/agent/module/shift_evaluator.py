@@ -0,0 +1,226 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .shift_models import IgnoredPreference, ShiftEvaluation, ShiftEvaluationBreakdown, UncoveredSlot
+from .shift_timeline import (
+    SLOT_MINUTES,
+    business_hours,
+    format_minutes,
+    period_days,
+    slot_count,
+    to_date,
+    to_minutes,
+)
+
+# 評価基準（eval_shift_tool / eval_final_shift_tool と同じ減点）
+UNCOVERED_SLOT_PENALTY = 3
+DRAFT_LABOR_COST_PENALTY = 9
+FINAL_LABOR_COST_PENALTY = 2
+IGNORED_PREFERENCE_PENALTY = 0.2
+
+# breakdownに列挙する不足コマ・未考慮希望の上限（件数自体は全件数える）
+MAX_LISTED_ITEMS = 100
+
+
+def _entry_value(entry, key):
+    return entry[key] if isinstance(entry, dict) else getattr(entry, key)
+
+
+def collect_member_shifts(shift_rules: Dict, shift_key: str = "edit_shift") -> List[Dict]:
+    """Flattens the shifts embedded per member (e.g. by gemini_evaluate_shift) into entry dicts."""
+    company_id = shift_rules.get("company_info", {}).get("company_id")
+    return [
+        {
+            "user_id": member["user_id"],
+            "company_id": company_id,
+            "day": shift["day"],
+            "start_time": shift["start_time"],
+            "finish_time": shift["finish_time"]
+        }
+        for member in shift_rules.get("company_member", [])
+        for shift in member.get(shift_key, [])
+    ]
+
+
+class ShiftCoverage:
+    """
+    The (day x time-slot x position) staffing tensor of a schedule.
+
+    coverage[d, s, p] is the number of workers of position p present in slot s of day d.
+    Rest days stay in the tensor but are masked out by working_day_mask.
+    """
+
+    def __init__(self, shift_rules: Dict, edit_shift: List, first_day, last_day):
+        company_info = shift_rules.get("company_info", {})
+        company_member = shift_rules.get("company_member", [])
+
+        self.open_minutes, self.close_minutes = business_hours(company_info)
+        self.days = period_days(first_day, last_day)
+        self.positions = sorted({m["position"] for m in company_member if m.get("position")})
+        self.n_slots = slot_count(self.open_minutes, self.close_minutes)
+
+        rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+        self.working_day_mask = np.array([d not in rest_days for d in self.days], dtype=bool)
+
+        day_index = {d: i for i, d in enumerate(self.days)}
+        position_index = {p: i for i, p in enumerate(self.positions)}
+        member_position = {m["user_id"]: position_index.get(m.get("position"), -1) for m in company_member}
+        member_pay = {m["user_id"]: m.get("hour_pay") or 0 for m in company_member}
+
+        n_entries = len(edit_shift)
+        user_ids = np.empty(n_entries, dtype=np.int64)
+        day_idx = np.full(n_entries, -1, dtype=np.int64)
+        starts = np.empty(n_entries, dtype=np.int64)
+        finishes = np.empty(n_entries, dtype=np.int64)
+        for i, entry in enumerate(edit_shift):
+            user_ids[i] = int(_entry_value(entry, "user_id"))
+            day_idx[i] = day_index.get(to_date(_entry_value(entry, "day")), -1)
+            starts[i] = to_minutes(_entry_value(entry, "start_time"))
+            finishes[i] = to_minutes(_entry_value(entry, "finish_time"))
+
+        pos_idx = np.array([member_position.get(u, -1) for u in user_ids.tolist()], dtype=np.int64)
+        hour_pay = np.array([member_pay.get(u, 0) for u in user_ids.tolist()], dtype=np.float64)
+
+        # 人件費はシフト時間全体で計算する（営業時間外の部分も含む）
+        in_period = day_idx >= 0
+        durations = np.clip(finishes - starts, 0, None)
+        self.labor_cost_per_day = np.zeros(len(self.days), dtype=np.float64)
+        np.add.at(self.labor_cost_per_day, day_idx[in_period], (durations * hour_pay / 60)[in_period])
+
+        # 人員配置は営業時間内に切り詰めたコマで数える
+        clipped_start = np.maximum(starts, self.open_minutes)
+        clipped_finish = np.minimum(finishes, self.close_minutes)
+        first_slot = (clipped_start - self.open_minutes) // SLOT_MINUTES
+        last_slot = -((self.open_minutes - clipped_finish) // SLOT_MINUTES)
+        valid = in_period & (pos_idx >= 0) & (clipped_finish > clipped_start)
+
+        diff = np.zeros((len(self.days), self.n_slots + 1, len(self.positions)), dtype=np.int32)
+        np.add.at(diff, (day_idx[valid], first_slot[valid], pos_idx[valid]), 1)
+        np.add.at(diff, (day_idx[valid], last_slot[valid], pos_idx[valid]), -1)
+        self.coverage = np.cumsum(diff[:, :self.n_slots, :], axis=1)
+
+        self.scheduled = set(zip(user_ids[in_period].tolist(), day_idx[in_period].tolist()))
+
+    @property
+    def labor_cost_total(self) -> float:
+        return float(self.labor_cost_per_day.sum())
+
+    def uncovered_mask(self) -> np.ndarray:
+        return (self.coverage == 0) & self.working_day_mask[:, None, None]
+
+    def slot_times(self, slot: int) -> tuple[str, str]:
+        start = self.open_minutes + slot * SLOT_MINUTES
+        finish = min(start + SLOT_MINUTES, self.close_minutes)
+        return format_minutes(start), format_minutes(finish)
+
+
+def _ignored_preferences(shift_rules: Dict, coverage: ShiftCoverage) -> List[tuple]:
+    day_index = {d: i for i, d in enumerate(coverage.days)}
+    preferred = set()
+    for member in shift_rules.get("company_member", []):
+        for submitted in member.get("submitted_shift", []):
+            i = day_index.get(to_date(submitted["day"]))
+            if i is not None and coverage.working_day_mask[i]:
+                preferred.add((member["user_id"], i))
+    return sorted(preferred - coverage.scheduled, key=lambda p: (p[1], p[0]))
+
+
+def _feedback_japanese(score: int, breakdown: ShiftEvaluationBreakdown) -> str:
+    lines = [f"初期スコア100点から，{score}点と評価しました。"]
+    deductions = breakdown.deductions
+    if deductions.get("uncovered_slot"):
+        example = ""
+        if breakdown.uncovered_slots:
+            slot = breakdown.uncovered_slots[0]
+            example = f"例: {slot.day}の{slot.start_time[:5]}-{slot.finish_time[:5]}に{slot.position}担当が0人でした。"
+        lines.append(f"- 人員不足: -{deductions['uncovered_slot']:g}点 ({breakdown.uncovered_slot_count}箇所。{example})")
+    if deductions.get("labor_cost"):
+        lines.append(
+            f"- 人件費超過: -{deductions['labor_cost']:g}点 "
+            f"(予算{breakdown.labor_cost_budget:,}円に対し、実績{breakdown.labor_cost_total:,}円でした。)"
+        )
+    if deductions.get("ignored_preference"):
+        lines.append(
+            f"- シフト希望の未考慮: -{deductions['ignored_preference']:g}点 ({breakdown.ignored_preference_count}件)"
+        )
+    if len(lines) == 1:
+        lines.append("全ての時間帯で各ポジションの人員が確保され、人件費も予算内で、希望も全て考慮されています。")
+    return "\n".join(lines)
+
+
+def evaluate_shift_schedule(
+    shift_rules: Dict,
+    edit_shift: List,
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None,
+    labor_cost_penalty: float = DRAFT_LABOR_COST_PENALTY
+) -> ShiftEvaluation:
+    """
+    Scores a schedule locally with the 100-point deduction rules of eval_shift_tool.
+
+    Args:
+        shift_rules: A dict with company_info and company_member (with hour_pay, position and,
+                     for the preference criterion, submitted_shift), e.g. from gemini_create_shift.
+        edit_shift: The schedule entries (dicts or EditShiftEntry).
+        first_day: The first day of the period. Inferred from the shifts if omitted.
+        last_day: The last day of the period. Inferred from the shifts if omitted.
+        labor_cost_penalty: The deduction for exceeding labor_cost
+                            (DRAFT_LABOR_COST_PENALTY or FINAL_LABOR_COST_PENALTY).
+
+    Returns:
+        A ShiftEvaluation with the score, templated Japanese feedback and the breakdown.
+    """
+    company_info = shift_rules.get("company_info", {})
+    if first_day is None or last_day is None:
+        days = [_entry_value(e, "day") for e in edit_shift]
+        days += [s["day"] for m in shift_rules.get("company_member", []) for s in m.get("submitted_shift", [])]
+        if not days:
+            return ShiftEvaluation(quantitative_score=100, feedback_japanese="評価対象のシフトがありません。")
+        first_day = first_day or min(days)
+        last_day = last_day or max(days)
+
+    coverage = ShiftCoverage(shift_rules, edit_shift, first_day, last_day)
+
+    uncovered = np.argwhere(coverage.uncovered_mask())
+    uncovered_slots = []
+    for d, s, p in uncovered[:MAX_LISTED_ITEMS].tolist():
+        start_time, finish_time = coverage.slot_times(s)
+        uncovered_slots.append(UncoveredSlot(
+            day=coverage.days[d].isoformat(),
+            start_time=start_time,
+            finish_time=finish_time,
+            position=coverage.positions[p]
+        ))
+
+    ignored = _ignored_preferences(shift_rules, coverage)
+    labor_cost_total = int(round(coverage.labor_cost_total))
+    labor_cost_budget = company_info.get("labor_cost")
+
+    deductions = {
+        "uncovered_slot": UNCOVERED_SLOT_PENALTY * len(uncovered),
+        "labor_cost": labor_cost_penalty if labor_cost_budget is not None and labor_cost_total > labor_cost_budget else 0,
+        "ignored_preference": round(IGNORED_PREFERENCE_PENALTY * len(ignored), 1)
+    }
+    # 比較には下限のない点数を使い，0点で頭打ちにするのは表示する点数だけにする
+    raw_score = 100 - sum(deductions.values())
+    score = max(0, int(round(raw_score)))
+
+    breakdown = ShiftEvaluationBreakdown(
+        uncovered_slot_count=len(uncovered),
+        uncovered_slots=uncovered_slots,
+        labor_cost_total=labor_cost_total,
+        labor_cost_budget=labor_cost_budget,
+        ignored_preference_count=len(ignored),
+        ignored_preferences=[
+            IgnoredPreference(user_id=u, day=coverage.days[d].isoformat())
+            for u, d in ignored[:MAX_LISTED_ITEMS]
+        ],
+        deductions=deductions,
+        raw_score=round(raw_score, 1)
+    )
+    return ShiftEvaluation(
+        quantitative_score=score,
+        feedback_japanese=_feedback_japanese(score, breakdown),
+        breakdown=breakdown
+    )
@@ -0,0 +1,139 @@
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+from .shift_evaluator import MAX_LISTED_ITEMS, ShiftCoverage, collect_member_shifts
+from .shift_models import ShiftFeasibilityReport, UncoveredSlot
+from .shift_timeline import SLOT_MINUTES, infer_period, slot_range, to_date, to_minutes
+
+# 埋められないコマがこの割合を超えたら実行不能とする（数コマの不足はLLM/ソルバーの減点で扱う）
+MAX_UNCOVERED_RATIO = float(os.getenv("SHIFT_FEASIBILITY_MAX_UNCOVERED_RATIO", "0.1"))
+
+
+class ShiftInfeasibleError(ValueError):
+    """Raised when a scheduling request cannot be satisfied by its submitted shifts."""
+
+    def __init__(self, report: ShiftFeasibilityReport):
+        self.report = report
+        super().__init__(" ".join(report.reasons))
+
+
+def _min_labor_cost(shift_rules: Dict, coverage: ShiftCoverage, submitted_shift) -> np.ndarray:
+    """
+    Returns min_cost[d, s, p]: the cheapest pay for one worker of position p to staff slot s
+    of day d, i.e. min(hour_pay x available minutes in the slot), inf where nobody is available.
+    """
+    company_member = shift_rules.get("company_member", [])
+    day_index = {d: i for i, d in enumerate(coverage.days)}
+    position_index = {p: i for i, p in enumerate(coverage.positions)}
+    member_position = {m["user_id"]: position_index.get(m.get("position"), -1) for m in company_member}
+    member_pay = {m["user_id"]: m.get("hour_pay") or 0 for m in company_member}
+
+    min_cost = np.full((len(coverage.days), coverage.n_slots, len(coverage.positions)), np.inf)
+    slot_starts = coverage.open_minutes + np.arange(coverage.n_slots) * SLOT_MINUTES
+    slot_finishes = np.minimum(slot_starts + SLOT_MINUTES, coverage.close_minutes)
+    for entry in submitted_shift:
+        d = day_index.get(to_date(entry["day"]))
+        p = member_position.get(entry["user_id"], -1)
+        if d is None or p < 0:
+            continue
+        start, finish = to_minutes(entry["start_time"]), to_minutes(entry["finish_time"])
+        first, last = slot_range(start, finish, coverage.open_minutes, coverage.close_minutes)
+        if first == last:
+            continue
+        overlap = np.minimum(finish, slot_finishes[first:last]) - np.maximum(start, slot_starts[first:last])
+        cost = member_pay[entry["user_id"]] * overlap / 60
+        min_cost[d, first:last, p] = np.minimum(min_cost[d, first:last, p], cost)
+    return min_cost
+
+
+def check_shift_feasibility(
+    shift_rules: Dict,
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None,
+    max_uncovered_ratio: Optional[float] = None
+) -> ShiftFeasibilityReport:
+    """
+    Checks, before any schedule is generated, whether the submitted shifts can staff every
+    position in every slot of the business hours and whether doing so fits labor_cost.
+
+    Availability per (day, slot, position) is the sweep of the submitted shifts (as in
+    ShiftCoverage); the minimum labor cost staffs every coverable cell with its cheapest
+    available worker for the minutes they are available in it.
+
+    Args:
+        shift_rules: The payload of gemini_create_shift (company_member with submitted_shift).
+        first_day: The first day of the period. Inferred from the submitted shifts if omitted.
+        last_day: The last day of the period. Inferred from the submitted shifts if omitted.
+        max_uncovered_ratio: The share of (working day, slot, position) cells that may be
+                             uncoverable (MAX_UNCOVERED_RATIO if None).
+
+    Returns:
+        A ShiftFeasibilityReport; feasible is False with the reasons in Japanese otherwise.
+    """
+    company_info = shift_rules.get("company_info", {})
+    submitted_shift = collect_member_shifts(shift_rules, "submitted_shift")
+    if first_day is None or last_day is None:
+        inferred_first, inferred_last = infer_period(shift_rules.get("company_member", []))
+        first_day, last_day = first_day or inferred_first, last_day or inferred_last
+    budget = company_info.get("labor_cost")
+    if max_uncovered_ratio is None:
+        max_uncovered_ratio = MAX_UNCOVERED_RATIO
+
+    if not submitted_shift or first_day is None:
+        return ShiftFeasibilityReport(
+            feasible=False,
+            reasons=["期間内にシフト希望が1件も提出されていません。"],
+            submitted_shift_count=0,
+            uncovered_slot_count=0,
+            uncovered_ratio=0.0,
+            min_labor_cost=0,
+            labor_cost_budget=budget
+        )
+
+    coverage = ShiftCoverage(shift_rules, submitted_shift, first_day, last_day)
+    uncovered = coverage.uncovered_mask()
+    min_cost = _min_labor_cost(shift_rules, coverage, submitted_shift)
+    coverable = ~uncovered & coverage.working_day_mask[:, None, None]
+    min_labor_cost = int(np.ceil(min_cost[coverable].sum())) if coverable.any() else 0
+    required_cells = int(coverage.working_day_mask.sum()) * coverage.n_slots * len(coverage.positions)
+    uncovered_ratio = int(uncovered.sum()) / required_cells if required_cells else 0.0
+
+    uncovered_slots = []
+    for d, s, p in np.argwhere(uncovered)[:MAX_LISTED_ITEMS]:
+        start_time, finish_time = coverage.slot_times(int(s))
+        uncovered_slots.append(UncoveredSlot(
+            day=coverage.days[d].isoformat(),
+            start_time=start_time,
+            finish_time=finish_time,
+            position=coverage.positions[p]
+        ))
+    uncovered_by_position = {
+        position: int(count)
+        for position, count in zip(coverage.positions, uncovered.sum(axis=(0, 1)))
+        if count
+    }
+
+    reasons = []
+    if uncovered_by_position and uncovered_ratio > max_uncovered_ratio:
+        example = uncovered_slots[0]
+        reasons.append(
+            f"シフト希望だけでは埋められない時間帯が{int(uncovered.sum())}箇所（{uncovered_ratio:.0%}）あります"
+            f"（{'、'.join(f'{p}: {c}' for p, c in uncovered_by_position.items())}。"
+            f"例: {example.day}の{example.start_time[:5]}-{example.finish_time[:5]}の{example.position}）。"
+        )
+    if budget is not None and min_labor_cost > budget:
+        reasons.append(f"全時間帯を最も安く配置しても人件費が{min_labor_cost:,}円となり、予算{budget:,}円を超えます。")
+
+    return ShiftFeasibilityReport(
+        feasible=not reasons,
+        reasons=reasons,
+        submitted_shift_count=len(submitted_shift),
+        uncovered_slot_count=int(uncovered.sum()),
+        uncovered_ratio=round(uncovered_ratio, 4),
+        uncovered_slots=uncovered_slots,
+        uncovered_by_position=uncovered_by_position,
+        min_labor_cost=min_labor_cost,
+        labor_cost_budget=budget
+    )
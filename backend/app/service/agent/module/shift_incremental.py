@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .shift_evaluator import FINAL_LABOR_COST_PENALTY, IGNORED_PREFERENCE_PENALTY, UNCOVERED_SLOT_PENALTY
+from .shift_models import ShiftScoreSnapshot
+from .shift_timeline import business_hours, period_days, slot_count, slot_range, to_date, to_minutes
+
+# プロセス内に保持する期間の数と，他のワーカーでの編集や希望の提出を取り込むための有効期限
+SHIFT_SCORE_CACHE_SIZE = int(os.getenv("SHIFT_SCORE_CACHE_SIZE", "64"))
+SHIFT_SCORE_CACHE_TTL_SECONDS = float(os.getenv("SHIFT_SCORE_CACHE_TTL_SECONDS", "300"))
+
+
+class IncrementalShiftScorer:
+    """
+    The local score of one (company, period), kept up to date shift by shift.
+
+    Holds the same counters as ShiftCoverage (staff per day x slot x position, labor cost per
+    day, scheduled members per day) plus the number of empty cells and ignored preferences,
+    so adding, moving or removing a shift costs O(its slots) instead of a full re-evaluation.
+    score() gives the same result as evaluate_shift_schedule with FINAL_LABOR_COST_PENALTY.
+    """
+
+    def __init__(self, shift_rules: Dict, edit_shift: List[Dict], first_day, last_day, labor_cost_penalty: float = FINAL_LABOR_COST_PENALTY):
+        company_info = shift_rules.get("company_info", {})
+        company_member = shift_rules.get("company_member", [])
+
+        self.first_day = to_date(first_day)
+        self.last_day = to_date(last_day)
+        self.labor_cost_budget = company_info.get("labor_cost")
+        self.labor_cost_penalty = labor_cost_penalty
+        self.open_minutes, self.close_minutes = business_hours(company_info)
+
+        days = period_days(first_day, last_day)
+        positions = sorted({m["position"] for m in company_member if m.get("position")})
+        self.day_index = {d: i for i, d in enumerate(days)}
+        position_index = {p: i for i, p in enumerate(positions)}
+        self.member_position = {m["user_id"]: position_index.get(m.get("position"), -1) for m in company_member}
+        self.member_pay = {m["user_id"]: m.get("hour_pay") or 0 for m in company_member}
+
+        rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+        self.working_day_mask = np.array([d not in rest_days for d in days], dtype=bool)
+        self.coverage = np.zeros((len(days), slot_count(self.open_minutes, self.close_minutes), len(positions)), dtype=np.int32)
+        self.labor_cost_per_day = np.zeros(len(days), dtype=np.float64)
+        self.uncovered_count = int(self.working_day_mask.sum()) * self.coverage.shape[1] * self.coverage.shape[2]
+
+        self.preferred = set()
+        for member in company_member:
+            for submitted in member.get("submitted_shift", []):
+                d = self.day_index.get(to_date(submitted["day"]))
+                if d is not None and self.working_day_mask[d]:
+                    self.preferred.add((member["user_id"], d))
+        self.ignored_count = len(self.preferred)
+        self.scheduled = Counter()
+        self.shift_count = 0
+
+        self.entries = {}
+        for entry in edit_shift:
+            self.add(entry)
+
+    def covers(self, day) -> bool:
+        return self.first_day <= to_date(day) <= self.last_day
+
+    def _apply(self, entry: Dict, sign: int):
+        d = self.day_index.get(to_date(entry["day"]))
+        if d is None:
+            return
+        self.shift_count += sign
+        user_id = int(entry["user_id"])
+        start, finish = to_minutes(entry["start_time"]), to_minutes(entry["finish_time"])
+
+        # 人件費はシフト時間全体，人員配置は営業時間内のコマで数える（ShiftCoverageと同じ）
+        self.labor_cost_per_day[d] += sign * max(finish - start, 0) * self.member_pay.get(user_id, 0) / 60
+
+        p = self.member_position.get(user_id, -1)
+        first, last = slot_range(start, finish, self.open_minutes, self.close_minutes)
+        if p >= 0 and first < last:
+            cells = self.coverage[d, first:last, p]
+            if sign > 0:
+                newly_covered = int((cells == 0).sum())
+                cells += 1
+            else:
+                cells -= 1
+                newly_covered = -int((cells == 0).sum())
+            if self.working_day_mask[d]:
+                self.uncovered_count -= newly_covered
+
+        before = self.scheduled[(user_id, d)]
+        self.scheduled[(user_id, d)] = before + sign
+        if (user_id, d) in self.preferred and (before == 0) != (before + sign == 0):
+            self.ignored_count += -1 if before == 0 else 1
+        if not self.scheduled[(user_id, d)]:
+            del self.scheduled[(user_id, d)]
+
+    def add(self, entry: Dict):
+        """Adds a shift; entries with an edit_shift_id can later be updated or removed by it."""
+        entry = dict(entry)
+        if entry.get("edit_shift_id") is not None:
+            self.remove(entry["edit_shift_id"])
+            self.entries[entry["edit_shift_id"]] = entry
+        self._apply(entry, 1)
+
+    def remove(self, edit_shift_id: int) -> bool:
+        entry = self.entries.pop(edit_shift_id, None)
+        if entry is None:
+            return False
+        self._apply(entry, -1)
+        return True
+
+    def update(self, edit_shift_id: int, start_time: str, finish_time: str) -> bool:
+        entry = self.entries.get(edit_shift_id)
+        if entry is None:
+            return False
+        self.add(dict(entry, start_time=start_time, finish_time=finish_time))
+        return True
+
+    def score(self) -> ShiftScoreSnapshot:
+        labor_cost_total = int(round(float(self.labor_cost_per_day.sum())))
+        over_budget = self.labor_cost_budget is not None and labor_cost_total > self.labor_cost_budget
+        deductions = (
+            UNCOVERED_SLOT_PENALTY * self.uncovered_count
+            + (self.labor_cost_penalty if over_budget else 0)
+            + round(IGNORED_PREFERENCE_PENALTY * self.ignored_count, 1)
+        )
+        return ShiftScoreSnapshot(
+            quantitative_score=max(0, int(round(100 - deductions))),
+            shift_count=self.shift_count,
+            uncovered_slot_count=self.uncovered_count,
+            labor_cost_total=labor_cost_total,
+            labor_cost_budget=self.labor_cost_budget,
+            ignored_preference_count=self.ignored_count
+        )
+
+
+class ShiftScoreCache:
+    """
+    IncrementalShiftScorer per (company_id, first_day, last_day), least recently used first out.
+
+    The cache lives in the process: edits made through EditShiftUseCase update the cached
+    periods in place, the other write paths (shift creation, crew submissions, finalize and
+    company info edits) invalidate the company, and entries expire after
+    SHIFT_SCORE_CACHE_TTL_SECONDS so that writes made by other workers are picked up by a rebuild.
+    """
+
+    def __init__(self, max_periods: int = SHIFT_SCORE_CACHE_SIZE, ttl_seconds: float = SHIFT_SCORE_CACHE_TTL_SECONDS):
+        self.max_periods = max_periods
+        self.ttl_seconds = ttl_seconds
+        self._scorers = OrderedDict()
+        # 会社ごとの世代．apply_edits/invalidateで進め，読み込み中に変わった結果は保存しない
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def score(self, company_id: int, first_day: str, last_day: str, load: Callable[[], tuple]) -> ShiftScoreSnapshot:
+        """
+        Returns the current score of the period, building its scorer with load() on a miss.
+
+        load returns (shift_rules, edit_shift entries with their edit_shift_id).
+        """
+        key = (company_id, str(first_day)[:10], str(last_day)[:10])
+        with self._lock:
+            cached = self._scorers.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+                self._scorers.move_to_end(key)
+                return cached[1].score()
+            generation = self._generations[company_id]
+
+        shift_rules, edit_shift = load()
+        scorer = IncrementalShiftScorer(shift_rules, edit_shift, first_day, last_day)
+        with self._lock:
+            if self._generations[company_id] != generation:
+                # 読み込み中に編集・無効化されたので，編集前かもしれない状態でキャッシュを上書きしない
+                return scorer.score()
+            self._scorers[key] = (time.monotonic(), scorer)
+            self._scorers.move_to_end(key)
+            while len(self._scorers) > self.max_periods:
+                self._scorers.popitem(last=False)
+            return scorer.score()
+
+    def apply_edits(
+        self,
+        company_id: int,
+        add_edit_shift: List[Dict],
+        update_edit_shift: List[Dict],
+        delete_edit_shift: List[int]
+    ) -> List[Dict]:
+        """
+        Applies persisted edits to the company's cached periods.
+
+        Returns [{first_day, last_day, score}] of the cached periods the edits touched.
+        """
+        touched = []
+        with self._lock:
+            self._generations[company_id] += 1
+            for (cached_company_id, first_day, last_day), (_, scorer) in self._scorers.items():
+                if cached_company_id != company_id:
+                    continue
+                changed = False
+                for edit_shift_id in delete_edit_shift:
+                    changed |= scorer.remove(edit_shift_id)
+                for shift in update_edit_shift:
+                    changed |= scorer.update(shift["edit_shift_id"], shift["start_time"], shift["finish_time"])
+                for shift in add_edit_shift:
+                    if scorer.covers(shift["day"]):
+                        scorer.add(shift)
+                        changed = True
+                if changed:
+                    touched.append({"first_day": first_day, "last_day": last_day, "score": scorer.score().model_dump()})
+        return touched
+
+    def invalidate(self, company_id: Optional[int] = None):
+        with self._lock:
+            if company_id is None:
+                for cached_company_id in list(self._generations):
+                    self._generations[cached_company_id] += 1
+            else:
+                self._generations[company_id] += 1
+            for key in [k for k in self._scorers if company_id is None or k[0] == company_id]:
+                del self._scorers[key]
+
+
+shift_score_cache = ShiftScoreCache()
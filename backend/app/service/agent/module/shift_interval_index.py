@@ -0,0 +1,133 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from .shift_evaluator import collect_member_shifts
+from .shift_timeline import to_date, to_minutes
+
+
+class _DayIndex:
+    """
+    The sweep arrays of one day: bounds are the sorted distinct start/finish minutes, and
+    active[i] / counts[position][i] are the shifts / the staff present in [bounds[i], bounds[i+1]).
+    """
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        intervals = [(to_minutes(e["start_time"]), to_minutes(e["finish_time"])) for e in entries]
+        self.bounds = sorted({m for interval in intervals for m in interval})
+
+        events = [[] for _ in self.bounds]
+        for i, (start, finish) in enumerate(intervals):
+            if finish > start:
+                events[bisect_left(self.bounds, start)].append((1, i))
+                events[bisect_left(self.bounds, finish)].append((-1, i))
+
+        self.active = []
+        present = {}
+        for segment_events in events[:-1]:
+            for sign, i in segment_events:
+                if sign > 0:
+                    present[i] = None
+                else:
+                    del present[i]
+            self.active.append(tuple(present))
+
+        positions = {e.get("position") for e in entries}
+        self.counts = {
+            position: [sum(1 for i in active if entries[i].get("position") == position) for active in self.active]
+            for position in positions
+        }
+        self.counts[None] = [len(active) for active in self.active]
+
+    def segments(self, start: int, finish: int) -> range:
+        """The indexes of the segments overlapping [start, finish)."""
+        first = max(bisect_right(self.bounds, start) - 1, 0)
+        last = min(bisect_left(self.bounds, finish), len(self.active))
+        return range(first, last)
+
+
+class ShiftIntervalIndex:
+    """
+    An in-memory index of the shifts of a period for "who is working at time T" queries.
+
+    Shifts are grouped per day into sweep arrays, so a point query is a binary search plus
+    the size of the answer, and a range query is a binary search plus the segments it spans.
+    Entries are the usual shift dicts (user_id, day, start_time, finish_time, optionally
+    edit_shift_id); position comes from the entry or from member_position.
+    """
+
+    def __init__(self, shifts: List[Dict], member_position: Optional[Dict[int, str]] = None):
+        member_position = member_position or {}
+        by_day = {}
+        for shift in shifts:
+            entry = dict(shift)
+            entry.setdefault("position", member_position.get(entry["user_id"]))
+            by_day.setdefault(to_date(entry["day"]), []).append(entry)
+        self._days = {day: _DayIndex(entries) for day, entries in by_day.items()}
+
+    @classmethod
+    def from_shift_rules(cls, shift_rules: Dict, shift_key: str = "edit_shift") -> "ShiftIntervalIndex":
+        """Builds the index of the shifts embedded per member (e.g. by gemini_evaluate_shift)."""
+        company_member = shift_rules.get("company_member", [])
+        return cls(
+            collect_member_shifts(shift_rules, shift_key),
+            {m["user_id"]: m.get("position") for m in company_member}
+        )
+
+    def working_at(self, day, at, position: Optional[str] = None) -> List[Dict]:
+        """The shifts in progress at the given time of the day (start <= at < finish)."""
+        index = self._days.get(to_date(day))
+        if index is None:
+            return []
+        minutes = to_minutes(at)
+        i = bisect_right(index.bounds, minutes) - 1
+        if i < 0 or i >= len(index.active):
+            return []
+        return [index.entries[j] for j in index.active[i] if position is None or index.entries[j].get("position") == position]
+
+    def working_between(self, day, start, finish, position: Optional[str] = None, user_id: Optional[int] = None) -> List[Dict]:
+        """The shifts overlapping [start, finish) of the day."""
+        index = self._days.get(to_date(day))
+        if index is None:
+            return []
+        seen = {}
+        for i in index.segments(to_minutes(start), to_minutes(finish)):
+            for j in index.active[i]:
+                seen[j] = None
+        return [
+            index.entries[j] for j in seen
+            if (position is None or index.entries[j].get("position") == position)
+            and (user_id is None or index.entries[j]["user_id"] == user_id)
+        ]
+
+    def staff_count(self, day, at, position: Optional[str] = None) -> int:
+        """The number of staff (of the position, if given) present at the given time."""
+        index = self._days.get(to_date(day))
+        if index is None:
+            return 0
+        i = bisect_right(index.bounds, to_minutes(at)) - 1
+        if i < 0 or i >= len(index.active):
+            return 0
+        return index.counts.get(position, [0] * len(index.active))[i]
+
+    def min_staff(self, day, start, finish, position: Optional[str] = None) -> int:
+        """The fewest staff (of the position, if given) present at any time in [start, finish)."""
+        index = self._days.get(to_date(day))
+        start, finish = to_minutes(start), to_minutes(finish)
+        if index is None or not index.bounds or start < index.bounds[0] or finish > index.bounds[-1]:
+            return 0
+        counts = index.counts.get(position)
+        if counts is None:
+            return 0
+        return min((counts[i] for i in index.segments(start, finish)), default=0)
+
+    def conflicts(self, shift: Dict) -> List[Dict]:
+        """
+        The indexed shifts of the same user that overlap the given shift on its day, except
+        the shift itself when both carry the same edit_shift_id.
+        """
+        edit_shift_id = shift.get("edit_shift_id")
+        return [
+            other for other in self.working_between(shift["day"], shift["start_time"], shift["finish_time"], user_id=shift["user_id"])
+            if edit_shift_id is None or other.get("edit_shift_id") != edit_shift_id
+        ]
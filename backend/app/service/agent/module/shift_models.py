@@ -0,0 +1,114 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+# --- Pydantic Models ---
+class Shift(BaseModel):
+    """Represents a single shift with a day, start time, and finish time."""
+    shift_id: str = Field(..., description="The unique identifier for the shift.")
+    day: str = Field(..., description="The date of the shift in YYYY-MM-DD format.")
+    start: str = Field(..., description="The start time of the shift in HH:MM format.")
+    finish: str = Field(..., description="The finish time of the shift in HH:MM format.")
+
+class EditShiftEntry(BaseModel):
+    """Represents a single shift entry in the comprehensive schedule."""
+    user_id: int = Field(..., description="The ID of the worker.")
+    company_id: int = Field(..., description="The ID of the company.")
+    day: str = Field(..., description="The date of the shift in YYYY-MM-DD format.")
+    start_time: str = Field(..., description="The start time of the shift in HH:MM format.")
+    finish_time: str = Field(..., description="The finish time of the shift in HH:MM format.")
+
+class EditShiftSchedule(BaseModel):
+    """Represents the comprehensive shift schedule for all employees."""
+    edit_shift: List[EditShiftEntry] = Field(..., description="A list of shift entries.")
+
+class UncoveredSlot(BaseModel):
+    """Represents a time slot in which a position has no staff."""
+    day: str = Field(..., description="The date of the slot in YYYY-MM-DD format.")
+    start_time: str = Field(..., description="The start time of the slot in HH:MM:SS format.")
+    finish_time: str = Field(..., description="The finish time of the slot in HH:MM:SS format.")
+    position: str = Field(..., description="The position that is not staffed.")
+
+class IgnoredPreference(BaseModel):
+    """Represents a submitted shift preference that is not in the schedule."""
+    user_id: int = Field(..., description="The ID of the worker.")
+    day: str = Field(..., description="The date of the preference in YYYY-MM-DD format.")
+
+class ShiftEvaluationBreakdown(BaseModel):
+    """Represents the itemized deductions behind a quantitative score."""
+    uncovered_slot_count: int = Field(..., description="The number of (day, slot, position) cells with no staff.")
+    uncovered_slots: List[UncoveredSlot] = Field(default_factory=list, description="The uncovered cells.")
+    labor_cost_total: int = Field(..., description="The total labor cost of the schedule.")
+    labor_cost_budget: Optional[int] = Field(None, description="The labor cost budget of the company.")
+    ignored_preference_count: int = Field(..., description="The number of submitted preferences not granted.")
+    ignored_preferences: List[IgnoredPreference] = Field(default_factory=list, description="The preferences not granted.")
+    deductions: Dict[str, float] = Field(default_factory=dict, description="The deducted points per criterion.")
+    raw_score: float = Field(..., description="100 minus every deduction, not floored at 0, for ranking schedules.")
+
+class ShiftEvaluation(BaseModel):
+    """Represents the evaluation result of a shift schedule."""
+    quantitative_score: int = Field(..., description="The quantitative score of the shift proposal.")
+    feedback_japanese: str = Field(..., description="Detailed feedback in Japanese.")
+    breakdown: Optional[ShiftEvaluationBreakdown] = Field(None, description="The itemized deductions, if evaluated locally.")
+
+class ShiftRepairChange(BaseModel):
+    """Represents one entry fixed or dropped by the repair pass."""
+    action: str = Field(..., description="What was done, e.g. 'clipped' or 'dropped_duplicate'.")
+    user_id: Optional[int] = Field(None, description="The ID of the worker, if readable.")
+    day: Optional[str] = Field(None, description="The date of the entry, if readable.")
+    detail: str = Field("", description="The original value or the reason.")
+
+class ShiftRepairReport(BaseModel):
+    """Represents what the repair pass changed in a schedule."""
+    input_count: int = Field(..., description="The number of entries before the repair.")
+    output_count: int = Field(..., description="The number of entries after the repair.")
+    counts: Dict[str, int] = Field(default_factory=dict, description="The number of changes per action.")
+    changes: List[ShiftRepairChange] = Field(default_factory=list, description="The changed entries.")
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.counts)
+
+class ShiftFeasibilityReport(BaseModel):
+    """Represents the pre-flight check of a scheduling request against its submitted shifts."""
+    feasible: bool = Field(..., description="Whether a schedule meeting the requirements can exist.")
+    reasons: List[str] = Field(default_factory=list, description="Why the request is infeasible, in Japanese.")
+    submitted_shift_count: int = Field(..., description="The number of submitted shifts in the period.")
+    uncovered_slot_count: int = Field(..., description="The number of (day, slot, position) cells nobody is available for.")
+    uncovered_ratio: float = Field(..., description="The share of required cells nobody is available for.")
+    uncovered_slots: List[UncoveredSlot] = Field(default_factory=list, description="The cells nobody is available for.")
+    uncovered_by_position: Dict[str, int] = Field(default_factory=dict, description="The uncoverable cells per position.")
+    min_labor_cost: int = Field(..., description="The cheapest labor cost of staffing every coverable cell.")
+    labor_cost_budget: Optional[int] = Field(None, description="The labor cost budget of the company.")
+
+class ShiftScoreSnapshot(BaseModel):
+    """Represents the local score of a schedule and the counts behind it."""
+    quantitative_score: int = Field(..., description="The local quantitative score.")
+    shift_count: int = Field(..., description="The number of shifts in the period.")
+    uncovered_slot_count: int = Field(..., description="The number of (day, slot, position) cells with no staff.")
+    labor_cost_total: int = Field(..., description="The total labor cost of the schedule.")
+    labor_cost_budget: Optional[int] = Field(None, description="The labor cost budget of the company.")
+    ignored_preference_count: int = Field(..., description="The number of submitted preferences not granted.")
+
+class ShiftConflict(BaseModel):
+    """Represents a shift that overlaps another shift of the same worker on the same day."""
+    user_id: int = Field(..., description="The ID of the worker.")
+    day: str = Field(..., description="The date of the shifts in YYYY-MM-DD format.")
+    start_time: str = Field(..., description="The start time of the edited shift in HH:MM:SS format.")
+    finish_time: str = Field(..., description="The finish time of the edited shift in HH:MM:SS format.")
+    conflicting_start_time: str = Field(..., description="The start time of the overlapped shift in HH:MM:SS format.")
+    conflicting_finish_time: str = Field(..., description="The finish time of the overlapped shift in HH:MM:SS format.")
+
+class ShiftSimulationResult(BaseModel):
+    """Represents the effect of hypothetical edits on a period, computed without persisting them."""
+    first_day: str = Field(..., description="The first day of the simulated period in YYYY-MM-DD format.")
+    last_day: str = Field(..., description="The last day of the simulated period in YYYY-MM-DD format.")
+    before: ShiftScoreSnapshot = Field(..., description="The schedule as stored.")
+    after: ShiftScoreSnapshot = Field(..., description="The schedule with the edits applied.")
+    score_delta: int = Field(..., description="after - before of the quantitative score.")
+    labor_cost_delta: int = Field(..., description="after - before of the labor cost.")
+    uncovered_slot_delta: int = Field(..., description="after - before of the uncovered cells.")
+    newly_uncovered_slots: List[UncoveredSlot] = Field(default_factory=list, description="The cells the edits leave without staff.")
+    newly_covered_slots: List[UncoveredSlot] = Field(default_factory=list, description="The cells the edits staff.")
+    conflicting_shifts: List[ShiftConflict] = Field(default_factory=list, description="The added or updated shifts that overlap another shift of the same worker.")
+    unknown_edit_shift_ids: List[int] = Field(default_factory=list, description="The updated or deleted IDs not found in the period.")
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional
+
+from .shift_models import ShiftRepairChange, ShiftRepairReport
+from .shift_timeline import business_hours, format_minutes, to_date, to_minutes
+
+# reportに列挙する変更の上限（件数自体は全件数える）
+MAX_LISTED_CHANGES = 100
+
+
+class _RepairLog:
+    def __init__(self):
+        self.counts = {}
+        self.changes = []
+
+    def add(self, action: str, user_id=None, day=None, detail: str = ""):
+        self.counts[action] = self.counts.get(action, 0) + 1
+        if len(self.changes) < MAX_LISTED_CHANGES:
+            self.changes.append(ShiftRepairChange(action=action, user_id=user_id, day=day, detail=detail))
+
+
+def _parse_entry(entry) -> Optional[tuple]:
+    """Returns (user_id, day, start, finish) or None if the entry cannot be read."""
+    try:
+        return (
+            int(entry["user_id"]),
+            to_date(str(entry["day"])[:10]),
+            to_minutes(entry["start_time"]),
+            to_minutes(entry["finish_time"])
+        )
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+
+
+def repair_shift_schedule(
+    shift_rules: Dict,
+    edit_shift: List,
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None
+) -> tuple[List[Dict], ShiftRepairReport]:
+    """
+    Normalizes a schedule produced by the LLM and fixes or drops the entries that violate
+    the hard constraints, so that it can be persisted with insert_shift_request.
+
+    - unreadable entries and unknown user_ids are dropped
+    - days outside first_day..last_day and rest days are dropped
+    - entries finishing at or before their start are dropped
+    - entries are clipped to open_time/close_time (and dropped if nothing is left)
+    - for duplicated (user_id, day) pairs the longest entry is kept
+    - company_id, day and times are normalized to the formats of insert_shift_request
+
+    Args:
+        shift_rules: A dict with company_info and company_member, e.g. from gemini_create_shift.
+        edit_shift: The schedule entries (dicts).
+        first_day: The first day of the period. The period is not checked if omitted.
+        last_day: The last day of the period. The period is not checked if omitted.
+
+    Returns:
+        (the repaired entries sorted by day, start_time and user_id, the ShiftRepairReport)
+    """
+    company_info = shift_rules.get("company_info", {})
+    company_id = company_info.get("company_id")
+    member_ids = {m["user_id"] for m in shift_rules.get("company_member", [])}
+    rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+    open_minutes, close_minutes = business_hours(company_info)
+    first_day = to_date(first_day) if first_day else None
+    last_day = to_date(last_day) if last_day else None
+
+    log = _RepairLog()
+    kept = {}
+    for entry in edit_shift:
+        parsed = _parse_entry(entry) if isinstance(entry, dict) else None
+        if parsed is None:
+            log.add("dropped_invalid", detail=str(entry)[:200])
+            continue
+        user_id, day, start, finish = parsed
+        day_text = day.isoformat()
+
+        if user_id not in member_ids:
+            log.add("dropped_unknown_user", user_id, day_text)
+            continue
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            log.add("dropped_out_of_period", user_id, day_text)
+            continue
+        if day in rest_days:
+            log.add("dropped_rest_day", user_id, day_text)
+            continue
+        if finish <= start:
+            log.add("dropped_finish_before_start", user_id, day_text, f"{entry['start_time']}-{entry['finish_time']}")
+            continue
+
+        clipped_start = max(start, open_minutes)
+        clipped_finish = min(finish, close_minutes)
+        if clipped_finish <= clipped_start:
+            log.add("dropped_outside_business_hours", user_id, day_text, f"{entry['start_time']}-{entry['finish_time']}")
+            continue
+        if (clipped_start, clipped_finish) != (start, finish):
+            log.add("clipped", user_id, day_text, f"{entry['start_time']}-{entry['finish_time']}")
+
+        normalized = {
+            "user_id": user_id,
+            "company_id": company_id if company_id is not None else entry.get("company_id"),
+            "day": day_text,
+            "start_time": format_minutes(clipped_start),
+            "finish_time": format_minutes(clipped_finish)
+        }
+        if (clipped_start, clipped_finish) == (start, finish) and any(
+            entry.get(k) != normalized[k] for k in ("company_id", "day", "start_time", "finish_time")
+        ):
+            log.add("normalized", user_id, day_text)
+
+        key = (user_id, day)
+        if key in kept:
+            previous = kept[key]
+            log.add("dropped_duplicate", user_id, day_text)
+            if to_minutes(previous["finish_time"]) - to_minutes(previous["start_time"]) >= clipped_finish - clipped_start:
+                continue
+        kept[key] = normalized
+
+    repaired = sorted(kept.values(), key=lambda e: (e["day"], e["start_time"], e["user_id"]))
+    return repaired, ShiftRepairReport(
+        input_count=len(edit_shift),
+        output_count=len(repaired),
+        counts=log.counts,
+        changes=log.changes
+    )
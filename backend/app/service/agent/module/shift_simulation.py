@@ -0,0 +1,141 @@
+from typing import Dict, List
+
+import numpy as np
+
+from .shift_evaluator import (
+    FINAL_LABOR_COST_PENALTY,
+    MAX_LISTED_ITEMS,
+    ShiftCoverage,
+    evaluate_shift_schedule,
+)
+from .shift_interval_index import ShiftIntervalIndex
+from .shift_models import ShiftConflict, ShiftSimulationResult, ShiftScoreSnapshot, UncoveredSlot
+
+
+def apply_shift_edits(
+    edit_shift: List[Dict],
+    add_edit_shift: List[Dict],
+    update_edit_shift: List[Dict],
+    delete_edit_shift: List[int]
+) -> tuple[List[Dict], List[int]]:
+    """
+    Applies the edits of EditShiftUseCase to a copy of the entries, in the same order as the
+    repository calls (delete, update, add). Returns (the edited entries, the unknown IDs).
+    """
+    known_ids = {e["edit_shift_id"] for e in edit_shift}
+    deleted = set(delete_edit_shift)
+    updates = {u["edit_shift_id"]: u for u in update_edit_shift}
+    unknown_ids = sorted((deleted | set(updates)) - known_ids)
+
+    edited = []
+    for entry in edit_shift:
+        if entry["edit_shift_id"] in deleted:
+            continue
+        update = updates.get(entry["edit_shift_id"])
+        if update is not None:
+            entry = dict(entry, start_time=update["start_time"], finish_time=update["finish_time"])
+        edited.append(entry)
+    edited.extend(dict(shift, edit_shift_id=None) for shift in add_edit_shift)
+    return edited, unknown_ids
+
+
+def _snapshot(shift_rules: Dict, edit_shift: List[Dict], first_day: str, last_day: str) -> ShiftScoreSnapshot:
+    evaluation = evaluate_shift_schedule(shift_rules, edit_shift, first_day, last_day, labor_cost_penalty=FINAL_LABOR_COST_PENALTY)
+    breakdown = evaluation.breakdown
+    return ShiftScoreSnapshot(
+        quantitative_score=evaluation.quantitative_score,
+        shift_count=len(edit_shift),
+        uncovered_slot_count=breakdown.uncovered_slot_count,
+        labor_cost_total=breakdown.labor_cost_total,
+        labor_cost_budget=breakdown.labor_cost_budget,
+        ignored_preference_count=breakdown.ignored_preference_count
+    )
+
+
+def _slots(coverage: ShiftCoverage, mask: np.ndarray) -> List[UncoveredSlot]:
+    slots = []
+    for d, s, p in np.argwhere(mask)[:MAX_LISTED_ITEMS].tolist():
+        start_time, finish_time = coverage.slot_times(s)
+        slots.append(UncoveredSlot(
+            day=coverage.days[d].isoformat(),
+            start_time=start_time,
+            finish_time=finish_time,
+            position=coverage.positions[p]
+        ))
+    return slots
+
+
+def _conflicts(edited: List[Dict], changed_ids: set) -> List[ShiftConflict]:
+    # 追加分には負の仮IDを振り，編集したシフトが同じ従業員の別のシフトと重なっていないかを索引で調べる
+    entries = [dict(e, edit_shift_id=-i - 1) if e["edit_shift_id"] is None else e for i, e in enumerate(edited)]
+    changed_ids = changed_ids | {e["edit_shift_id"] for e in entries if e["edit_shift_id"] < 0}
+    shift_index = ShiftIntervalIndex(entries)
+
+    conflicts, reported = [], set()
+    for entry in entries:
+        if entry["edit_shift_id"] not in changed_ids:
+            continue
+        for other in shift_index.conflicts(entry):
+            pair = frozenset((entry["edit_shift_id"], other["edit_shift_id"]))
+            if pair in reported:
+                continue
+            reported.add(pair)
+            conflicts.append(ShiftConflict(
+                user_id=entry["user_id"],
+                day=str(entry["day"])[:10],
+                start_time=entry["start_time"],
+                finish_time=entry["finish_time"],
+                conflicting_start_time=other["start_time"],
+                conflicting_finish_time=other["finish_time"]
+            ))
+    return conflicts[:MAX_LISTED_ITEMS]
+
+
+def simulate_shift_edits(
+    shift_rules: Dict,
+    edit_shift: List[Dict],
+    add_edit_shift: List[Dict],
+    update_edit_shift: List[Dict],
+    delete_edit_shift: List[int],
+    first_day: str,
+    last_day: str
+) -> ShiftSimulationResult:
+    """
+    Scores hypothetical edits of a period with the local evaluator, without persisting them.
+
+    Args:
+        shift_rules: The payload of gemini_evaluate_shift (with submitted_shift).
+        edit_shift: The stored entries of the period, each with its edit_shift_id.
+        add_edit_shift: The shifts to add (user_id, day, start_time, finish_time).
+        update_edit_shift: The new times per edit_shift_id.
+        delete_edit_shift: The edit_shift_ids to delete.
+        first_day: The first day of the period.
+        last_day: The last day of the period.
+
+    Returns:
+        A ShiftSimulationResult with both evaluations, their deltas, the coverage changes and
+        the edited shifts that double-book a worker.
+    """
+    edited, unknown_ids = apply_shift_edits(edit_shift, add_edit_shift, update_edit_shift, delete_edit_shift)
+
+    before = _snapshot(shift_rules, edit_shift, first_day, last_day)
+    after = _snapshot(shift_rules, edited, first_day, last_day)
+
+    before_coverage = ShiftCoverage(shift_rules, edit_shift, first_day, last_day)
+    after_coverage = ShiftCoverage(shift_rules, edited, first_day, last_day)
+    before_uncovered = before_coverage.uncovered_mask()
+    after_uncovered = after_coverage.uncovered_mask()
+
+    return ShiftSimulationResult(
+        first_day=str(first_day)[:10],
+        last_day=str(last_day)[:10],
+        before=before,
+        after=after,
+        score_delta=after.quantitative_score - before.quantitative_score,
+        labor_cost_delta=after.labor_cost_total - before.labor_cost_total,
+        uncovered_slot_delta=after.uncovered_slot_count - before.uncovered_slot_count,
+        newly_uncovered_slots=_slots(after_coverage, after_uncovered & ~before_uncovered),
+        newly_covered_slots=_slots(after_coverage, before_uncovered & ~after_uncovered),
+        conflicting_shifts=_conflicts(edited, {u["edit_shift_id"] for u in update_edit_shift}),
+        unknown_edit_shift_ids=unknown_ids
+    )
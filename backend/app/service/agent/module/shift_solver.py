@@ -0,0 +1,192 @@
+from typing import Dict, List, Optional
+
+from .shift_models import EditShiftEntry, EditShiftSchedule
+from .shift_timeline import (
+    business_hours,
+    format_minutes,
+    infer_period,
+    slot_count,
+    slot_range,
+    to_date,
+    to_minutes,
+    working_days,
+)
+
+
+class _Candidate:
+    """A submitted shift clipped to business hours, i.e. one assignable (user, day) slot."""
+    __slots__ = ("user_id", "day", "position", "start", "finish", "first_slot", "last_slot", "cost")
+
+    def __init__(self, user_id, day, position, start, finish, first_slot, last_slot, cost):
+        self.user_id = user_id
+        self.day = day
+        self.position = position
+        self.start = start
+        self.finish = finish
+        self.first_slot = first_slot
+        self.last_slot = last_slot
+        self.cost = cost
+
+
+def _build_candidates(shift_rules: Dict, days, open_minutes: int, close_minutes: int) -> Dict:
+    """Collects one candidate per (user_id, day), keeping the longest submitted shift."""
+    day_set = set(days)
+    candidates = {}
+    for member in shift_rules.get("company_member", []):
+        hour_pay = member.get("hour_pay") or 0
+        for submitted in member.get("submitted_shift", []):
+            day = to_date(submitted["day"])
+            if day not in day_set:
+                continue
+            start = max(to_minutes(submitted["start_time"]), open_minutes)
+            finish = min(to_minutes(submitted["finish_time"]), close_minutes)
+            if finish <= start:
+                continue
+            key = (member["user_id"], day)
+            if key in candidates and candidates[key].finish - candidates[key].start >= finish - start:
+                continue
+            first_slot, last_slot = slot_range(start, finish, open_minutes, close_minutes)
+            candidates[key] = _Candidate(
+                member["user_id"],
+                day,
+                member.get("position"),
+                start,
+                finish,
+                first_slot,
+                last_slot,
+                (finish - start) / 60 * hour_pay
+            )
+    return candidates
+
+
+def _seed_candidates(shift_rules: Dict, initial_draft: List, days, open_minutes: int, close_minutes: int) -> Dict:
+    """Turns the entries of an initial draft into candidates, one per (user_id, day)."""
+    day_set = set(days)
+    members = {m["user_id"]: m for m in shift_rules.get("company_member", [])}
+    seeds = {}
+    for entry in initial_draft:
+        member = members.get(entry["user_id"])
+        day = to_date(entry["day"])
+        if member is None or day not in day_set:
+            continue
+        start = max(to_minutes(entry["start_time"]), open_minutes)
+        finish = min(to_minutes(entry["finish_time"]), close_minutes)
+        if finish <= start:
+            continue
+        first_slot, last_slot = slot_range(start, finish, open_minutes, close_minutes)
+        seeds[(member["user_id"], day)] = _Candidate(
+            member["user_id"],
+            day,
+            member.get("position"),
+            start,
+            finish,
+            first_slot,
+            last_slot,
+            (finish - start) / 60 * (member.get("hour_pay") or 0)
+        )
+    return seeds
+
+
+def _cover_positions(candidates_by_day: Dict, positions: List[str], n_slots: int, preselected: List[_Candidate] = ()) -> List[_Candidate]:
+    """Greedy set cover: picks the cheapest candidates per newly covered slot until every
+    position is staffed in every slot it can be staffed in (slots covered by preselected
+    candidates count as staffed)."""
+    selected = []
+    preselected_ids = {id(c) for c in preselected}
+    for day, day_candidates in candidates_by_day.items():
+        for position in positions:
+            pool = [c for c in day_candidates if c.position == position and id(c) not in preselected_ids]
+            uncovered = set(range(n_slots))
+            for c in preselected:
+                if c.day == day and c.position == position:
+                    uncovered.difference_update(range(c.first_slot, c.last_slot))
+            while uncovered and pool:
+                best, best_gain, best_ratio = None, 0, None
+                for candidate in pool:
+                    gain = sum(1 for s in range(candidate.first_slot, candidate.last_slot) if s in uncovered)
+                    if gain == 0:
+                        continue
+                    ratio = candidate.cost / gain
+                    if best is None or ratio < best_ratio or (ratio == best_ratio and gain > best_gain):
+                        best, best_gain, best_ratio = candidate, gain, ratio
+                if best is None:
+                    break
+                selected.append(best)
+                pool.remove(best)
+                uncovered.difference_update(range(best.first_slot, best.last_slot))
+    return selected
+
+
+def solve_shift_schedule(
+    shift_rules: Dict,
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None,
+    initial_draft: Optional[List] = None
+) -> EditShiftSchedule:
+    """
+    Builds a shift schedule locally from the payload of gemini_create_shift, without calling the LLM.
+
+    Only submitted shifts are assigned (clipped to open_time/close_time, rest days skipped).
+    First every position is covered in every time slot where someone of that position is
+    available, then the remaining preferences are granted cheapest-first within labor_cost.
+
+    Args:
+        shift_rules: The dict built by gemini_shift_repository['gemini_create_shift'].
+        first_day: The first day of the period (YYYY-MM-DD). Inferred from submitted shifts if omitted.
+        last_day: The last day of the period (YYYY-MM-DD). Inferred from submitted shifts if omitted.
+        initial_draft: Entries (dicts) to start from, e.g. the warm-start projection of
+                       shift_warm_start. They are kept, and only the slots and budget they
+                       leave are filled from the submitted shifts.
+
+    Returns:
+        The EditShiftSchedule for the period.
+    """
+    company_info = shift_rules.get("company_info", {})
+    company_member = shift_rules.get("company_member", [])
+
+    if first_day is None or last_day is None:
+        inferred_first_day, inferred_last_day = infer_period(company_member)
+        first_day = first_day or inferred_first_day
+        last_day = last_day or inferred_last_day
+    if first_day is None or last_day is None:
+        return EditShiftSchedule(edit_shift=[])
+
+    open_minutes, close_minutes = business_hours(company_info)
+    n_slots = slot_count(open_minutes, close_minutes)
+    days = working_days(company_info, first_day, last_day)
+
+    candidates = _build_candidates(shift_rules, days, open_minutes, close_minutes)
+    seeds = _seed_candidates(shift_rules, initial_draft or [], days, open_minutes, close_minutes)
+    candidates.update(seeds)
+    candidates_by_day = {}
+    for candidate in candidates.values():
+        candidates_by_day.setdefault(candidate.day, []).append(candidate)
+    positions = sorted({m["position"] for m in company_member if m.get("position")})
+
+    # 1. 初期ドラフトを採用し，各ポジションの最低人員を確保する（予算よりも優先）
+    selected = list(seeds.values())
+    selected += _cover_positions(candidates_by_day, positions, n_slots, selected)
+    total_cost = sum(c.cost for c in selected)
+
+    # 2. 残りの希望を人件費の安い順に予算内で採用する
+    budget = company_info.get("labor_cost")
+    selected_ids = {id(c) for c in selected}
+    for candidate in sorted(candidates.values(), key=lambda c: (c.cost, c.day, c.user_id)):
+        if id(candidate) in selected_ids:
+            continue
+        if budget is not None and total_cost + candidate.cost > budget:
+            continue
+        selected.append(candidate)
+        total_cost += candidate.cost
+
+    selected.sort(key=lambda c: (c.day, c.start, c.user_id))
+    return EditShiftSchedule(edit_shift=[
+        EditShiftEntry(
+            user_id=c.user_id,
+            company_id=company_info.get("company_id"),
+            day=c.day.isoformat(),
+            start_time=format_minutes(c.start),
+            finish_time=format_minutes(c.finish)
+        )
+        for c in selected
+    ])
@@ -0,0 +1,70 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+# 1コマ（時間帯）の長さ（分）．評価基準の「1時間帯」に合わせる
+SLOT_MINUTES = 60
+DAY_MINUTES = 24 * 60
+
+
+def to_minutes(value) -> int:
+    """Converts a time object or an "HH:MM[:SS]" string to minutes from midnight."""
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    parts = str(value).split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def format_minutes(minutes: int) -> str:
+    """Formats minutes from midnight as an "HH:MM:SS" string."""
+    if minutes >= DAY_MINUTES:
+        minutes = DAY_MINUTES - 1
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+def to_date(value) -> date:
+    """Converts a date object or a "YYYY-MM-DD" string to a date."""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def business_hours(company_info: Dict) -> tuple[int, int]:
+    """Returns (open, close) in minutes. A close time at or before open means midnight."""
+    open_minutes = to_minutes(company_info["open_time"]) if company_info.get("open_time") else 0
+    close_minutes = to_minutes(company_info["close_time"]) if company_info.get("close_time") else DAY_MINUTES
+    if close_minutes <= open_minutes:
+        close_minutes = DAY_MINUTES
+    return open_minutes, close_minutes
+
+
+def slot_count(open_minutes: int, close_minutes: int) -> int:
+    return -(-(close_minutes - open_minutes) // SLOT_MINUTES)
+
+
+def slot_range(start: int, finish: int, open_minutes: int, close_minutes: int) -> tuple[int, int]:
+    """Returns the [first, last) slot indexes a shift is present in, clipped to business hours."""
+    start = max(start, open_minutes)
+    finish = min(finish, close_minutes)
+    if finish <= start:
+        return 0, 0
+    return (start - open_minutes) // SLOT_MINUTES, -(-(finish - open_minutes) // SLOT_MINUTES)
+
+
+def period_days(first_day, last_day) -> List[date]:
+    first_day = to_date(first_day)
+    last_day = to_date(last_day)
+    return [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+
+def infer_period(company_member: List[Dict], shift_key: str = "submitted_shift") -> tuple[Optional[str], Optional[str]]:
+    """Infers (first_day, last_day) from the shifts embedded in company_member."""
+    days = [s["day"] for m in company_member for s in m.get(shift_key, [])]
+    if not days:
+        return None, None
+    return min(days), max(days)
+
+
+def working_days(company_info: Dict, first_day, last_day) -> List[date]:
+    """Returns the days of the period, excluding the company's rest days."""
+    rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+    return [d for d in period_days(first_day, last_day) if d not in rest_days]
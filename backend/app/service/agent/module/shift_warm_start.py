@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+
+from .shift_interval_index import ShiftIntervalIndex
+from .shift_repair import repair_shift_schedule
+from .shift_timeline import format_minutes, infer_period, period_days, to_date, to_minutes
+
+
+def project_decision_shifts(
+    shift_rules: Dict,
+    decision_shifts: List[Dict],
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None
+) -> tuple[List[Dict], Dict[str, int]]:
+    """
+    Projects the last finalized weekly pattern onto a new period as a warm-start draft.
+
+    Every day of first_day..last_day takes the shifts of the most recent decision day with
+    the same weekday. Projected shifts on rest days, of unknown members or of members who
+    did not submit a shift for the new day are dropped; the others are narrowed to the
+    submitted shift, and the result goes through repair_shift_schedule.
+
+    Args:
+        shift_rules: The payload of gemini_create_shift (company_member with submitted_shift).
+        decision_shifts: The finalized shifts before the period, e.g. from decision_shift_pattern.
+        first_day: The first day of the period. Inferred from the submitted shifts if omitted.
+        last_day: The last day of the period. Inferred from the submitted shifts if omitted.
+
+    Returns:
+        (the draft entries, the number of entries per outcome)
+    """
+    company_info = shift_rules.get("company_info", {})
+    if first_day is None or last_day is None:
+        inferred_first, inferred_last = infer_period(shift_rules.get("company_member", []))
+        first_day, last_day = first_day or inferred_first, last_day or inferred_last
+    if first_day is None or last_day is None or not decision_shifts:
+        return [], {}
+
+    # 曜日ごとに直近の確定日のシフトを型として使う
+    pattern = {}
+    for shift in decision_shifts:
+        day = to_date(shift["day"])
+        latest = pattern.get(day.weekday())
+        if latest is None or day > latest[0]:
+            pattern[day.weekday()] = (day, [shift])
+        elif day == latest[0]:
+            latest[1].append(shift)
+
+    member_ids = {m["user_id"] for m in shift_rules.get("company_member", [])}
+    rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+    submitted = ShiftIntervalIndex.from_shift_rules(shift_rules, "submitted_shift")
+    counts = {}
+
+    def count(outcome: str):
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    projected = []
+    for day in period_days(first_day, last_day):
+        for shift in pattern.get(day.weekday(), (None, []))[1]:
+            if day in rest_days:
+                count("dropped_rest_day")
+                continue
+            if shift["user_id"] not in member_ids:
+                count("dropped_unknown_user")
+                continue
+            start, finish = to_minutes(shift["start_time"]), to_minutes(shift["finish_time"])
+            overlaps = []
+            for s in submitted.working_between(day, shift["start_time"], shift["finish_time"], user_id=shift["user_id"]):
+                s_start, s_finish = to_minutes(s["start_time"]), to_minutes(s["finish_time"])
+                overlaps.append((min(finish, s_finish) - max(start, s_start), max(start, s_start), min(finish, s_finish)))
+            overlap = max(overlaps, default=(0, 0, 0))
+            if overlap[0] <= 0:
+                count("dropped_no_submission")
+                continue
+            if (overlap[1], overlap[2]) != (start, finish):
+                count("adjusted")
+            projected.append({
+                "user_id": shift["user_id"],
+                "company_id": company_info.get("company_id"),
+                "day": day.isoformat(),
+                "start_time": format_minutes(overlap[1]),
+                "finish_time": format_minutes(overlap[2])
+            })
+
+    draft, repair_report = repair_shift_schedule(shift_rules, projected, first_day, last_day)
+    for action, n in repair_report.counts.items():
+        if action != "normalized":
+            counts[action] = counts.get(action, 0) + n
+    counts["projected"] = len(draft)
+    return draft, counts
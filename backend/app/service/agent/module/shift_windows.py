@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .shift_timeline import to_date, working_days
+
+# 1ウィンドウの既定の日数（1週間）
+DEFAULT_WINDOW_DAYS = 7
+# 休業日で区切る場合の最短ウィンドウ日数（短すぎるウィンドウを作らない）
+MIN_WINDOW_DAYS = 4
+# 同時に作るウィンドウ数の上限（長い期間でもスレッド・Gemini枠を使い切らない）
+WINDOW_MAX_WORKERS = int(os.getenv("SHIFT_WINDOW_MAX_WORKERS", "4"))
+
+EMPTY_SCHEDULE = json.dumps({"edit_shift": []})
+
+
+def split_period(company_info: Dict, first_day, last_day, window_days: int = DEFAULT_WINDOW_DAYS) -> List[tuple]:
+    """
+    Partitions first_day..last_day into consecutive windows of at most window_days days.
+
+    A window ends on the last rest day it contains (at least MIN_WINDOW_DAYS in), so that
+    windows are cut where nobody works; otherwise it is cut after window_days days.
+
+    Returns:
+        A list of (first_day, last_day) date pairs covering the period.
+    """
+    rest_days = {to_date(d) for d in company_info.get("rest_day", [])}
+    first_day = to_date(first_day)
+    last_day = to_date(last_day)
+    min_days = min(MIN_WINDOW_DAYS, window_days)
+
+    windows = []
+    start = first_day
+    while start <= last_day:
+        end = min(start + timedelta(days=window_days - 1), last_day)
+        if end < last_day:
+            for offset in range(window_days - 1, min_days - 2, -1):
+                day = start + timedelta(days=offset)
+                if day in rest_days:
+                    end = day
+                    break
+        windows.append((start, end))
+        start = end + timedelta(days=1)
+    return windows
+
+
+def window_shift_rules(shift_rules: Dict, window_first_day, window_last_day, total_working_days: int) -> Dict:
+    """
+    Narrows the payload of gemini_create_shift to one window.
+
+    Rest days and submitted shifts are filtered to the window, and labor_cost is pro-rated
+    by the window's share of the period's working days.
+    """
+    window_first_day = to_date(window_first_day)
+    window_last_day = to_date(window_last_day)
+
+    def in_window(day) -> bool:
+        return window_first_day <= to_date(day) <= window_last_day
+
+    rules = copy.deepcopy(shift_rules)
+    company_info = rules.setdefault("company_info", {})
+    company_info["first_day"] = window_first_day.isoformat()
+    company_info["last_day"] = window_last_day.isoformat()
+    company_info["rest_day"] = [d for d in company_info.get("rest_day", []) if in_window(d)]
+
+    labor_cost = company_info.get("labor_cost")
+    if labor_cost is not None and total_working_days:
+        share = len(working_days(company_info, window_first_day, window_last_day)) / total_working_days
+        company_info["labor_cost"] = int(labor_cost * share)
+
+    for member in rules.get("company_member", []):
+        member["submitted_shift"] = [s for s in member.get("submitted_shift", []) if in_window(s["day"])]
+    return rules
+
+
+def _window_requests(shift_rules: Dict, first_day, last_day, window_days: int) -> List[tuple]:
+    company_info = shift_rules.get("company_info", {})
+    total_working_days = len(working_days(company_info, first_day, last_day))
+    return [
+        (window_first_day, window_last_day, window_shift_rules(shift_rules, window_first_day, window_last_day, total_working_days))
+        for window_first_day, window_last_day in split_period(company_info, first_day, last_day, window_days)
+    ]
+
+
+def _run_or_skip(request: tuple, run_window: Callable[[str], str]):
+    # 希望シフトが1件もないウィンドウ（休業日だけの週など）はLLMを呼ばない
+    rules = request[2]
+    if not any(m.get("submitted_shift") for m in rules.get("company_member", [])):
+        return EMPTY_SCHEDULE
+    return run_window(json.dumps(rules))
+
+
+def _stitch(requests: List[tuple], results: List[str]) -> str:
+    # ウィンドウ外の日付が返ってきた場合は捨てる（隣のウィンドウとの重複を防ぐ）
+    edit_shift = []
+    for (window_first_day, window_last_day, _), result in zip(requests, results):
+        for entry in json.loads(result).get("edit_shift", []):
+            if window_first_day <= to_date(entry["day"]) <= window_last_day:
+                edit_shift.append(entry)
+    return json.dumps({"edit_shift": edit_shift}, ensure_ascii=False)
+
+
+def run_windowed(
+    shift_rules: Dict,
+    first_day,
+    last_day,
+    run_window: Callable[[str], str],
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    max_workers: Optional[int] = None
+) -> str:
+    """
+    Generates the schedule window by window in a thread pool and stitches the results.
+
+    Args:
+        shift_rules: The payload of gemini_create_shift for the whole period.
+        first_day: The first day of the period.
+        last_day: The last day of the period.
+        run_window: Called with one window's payload as a JSON string; returns EditShiftSchedule JSON.
+        window_days: The maximum number of days per window.
+        max_workers: The number of windows generated at once (WINDOW_MAX_WORKERS if None).
+
+    Returns:
+        The JSON string of the stitched EditShiftSchedule.
+    """
+    requests = _window_requests(shift_rules, first_day, last_day, window_days)
+    if not requests:
+        return EMPTY_SCHEDULE
+    # 呼び出し元のcontextvars（llm_metricsのcompany_idなど）をワーカースレッドに引き継ぐ
+    contexts = [contextvars.copy_context() for _ in requests]
+    with ThreadPoolExecutor(max_workers=min(max_workers or WINDOW_MAX_WORKERS, len(requests))) as executor:
+        results = list(executor.map(lambda context, request: context.run(_run_or_skip, request, run_window), contexts, requests))
+    return _stitch(requests, results)
+
+
+async def arun_windowed(
+    shift_rules: Dict,
+    first_day,
+    last_day,
+    run_window: Callable[[str], Awaitable[str]],
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    max_workers: Optional[int] = None
+) -> str:
+    """Async version of run_windowed; at most max_workers (WINDOW_MAX_WORKERS if None) windows run at once."""
+    requests = _window_requests(shift_rules, first_day, last_day, window_days)
+    semaphore = asyncio.Semaphore(max_workers or WINDOW_MAX_WORKERS)
+
+    async def run_or_skip(request: tuple) -> str:
+        async with semaphore:
+            result = _run_or_skip(request, run_window)
+            return result if isinstance(result, str) else await result
+
+    results = await asyncio.gather(*(run_or_skip(request) for request in requests))
+    return _stitch(requests, list(results))
@@ -0,0 +1,6 @@
+from .job_queue import submit_job, get_job
+
+job_services = {
+    'submit_job': submit_job,
+    'get_job': get_job
+}
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+In-process background jobs with status polling.
+
+Job state lives in the memory of the process that accepted the job, so polling must reach the
+same process: run the API as a single process (one uvicorn worker, and on Cloud Run a single
+instance, e.g. `--max-instances 1 --no-cpu-throttling`). With more workers or instances, a
+poll that lands on another process gets 404.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+# 同時に実行するジョブ数の上限（これを超えたジョブはキューで待機する）
+MAX_WORKERS = int(os.getenv("SHIFT_JOB_MAX_WORKERS", "4"))
+# 完了したジョブの状態を保持する秒数
+JOB_TTL_SECONDS = int(os.getenv("SHIFT_JOB_TTL_SECONDS", "3600"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="shift-job")
+_jobs: Dict[str, Dict] = {}
+_active_keys: Dict[tuple, str] = {}
+_lock = threading.Lock()
+logger = logging.getLogger("shift_agent.job")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _prune_finished_jobs():
+    expire_before = time.time() - JOB_TTL_SECONDS
+    for job_id in [j for j, job in _jobs.items() if job["finished_at"] and job["finished_at"] < expire_before]:
+        del _jobs[job_id]
+
+
+def _update(job_id: str, **fields):
+    with _lock:
+        _jobs[job_id].update(fields, updated_at=_now())
+
+
+def _run(job_id: str, dedupe_key: Optional[tuple], task: Callable):
+    def report_progress(stage: str, **detail):
+        with _lock:
+            job = _jobs[job_id]
+            job["progress"].append({"stage": stage, "at": _now(), **detail})
+            job["stage"] = stage
+            job["updated_at"] = _now()
+
+    _update(job_id, status="running")
+    try:
+        result = task(report_progress)
+        _update(job_id, status="completed", result=result)
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        _update(job_id, status="failed", error=str(e))
+    finally:
+        with _lock:
+            _jobs[job_id]["finished_at"] = time.time()
+            if dedupe_key is not None and _active_keys.get(dedupe_key) == job_id:
+                del _active_keys[dedupe_key]
+
+
+def submit_job(kind: str, company_id: int, task: Callable, dedupe_key: Optional[tuple] = None) -> str:
+    """
+    Queues task on the bounded worker pool and returns its job id immediately.
+
+    task is called with a report_progress(stage, **detail) callback and its return value is
+    stored as the job result. If a job with the same dedupe_key is still queued or running,
+    its id is returned instead of starting a second one.
+    Job state lives in this process's memory (see the module docstring).
+    """
+    with _lock:
+        _prune_finished_jobs()
+        if dedupe_key is not None and dedupe_key in _active_keys:
+            return _active_keys[dedupe_key]
+
+        job_id = uuid.uuid4().hex
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "kind": kind,
+            "company_id": int(company_id),
+            "status": "queued",
+            "stage": None,
+            "progress": [],
+            "result": None,
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+            "finished_at": None
+        }
+        if dedupe_key is not None:
+            _active_keys[dedupe_key] = job_id
+
+    _executor.submit(_run, job_id, dedupe_key, task)
+    return job_id
+
+
+def get_job(job_id: str, company_id: int) -> Optional[Dict]:
+    """Returns a snapshot of the job state, or None if the job is unknown, expired or another company's."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job["company_id"] != int(company_id):
+            return None
+        snapshot = {k: v for k, v in job.items() if k != "finished_at"}
+        snapshot["progress"] = list(job["progress"])
+        return snapshot
@@ -3,6 +3,7 @@ from ....domain.validation.objects.company_rest_day import company_rest_day_vali
 from ....domain.validation.objects.company_position import company_position_validation
 from ....domain.entity.company_info import company_info_entities
 from ...repository.crud.company_info import company_info_repository
+from ...service.agent.module.shift_incremental import shift_score_cache
 
 class EditCompanyInfoUseCase:
     def __init__(self, company_id, company_name, store_location, open_time, close_time, target_sales, labor_cost, rest_day, position):
@@ -57,4 +58,6 @@ class EditCompanyInfoUseCase:
             edit_company_info_entity['company_info']['labor_cost'],
             edit_company_info_entity['rest_day'],
             edit_company_info_entity['position']
-        )
\ No newline at end of file
+        )
+        # 営業時間・休業日・人件費は採点に使うので，差分採点の状態は作り直させる
+        shift_score_cache.invalidate(edit_company_info_entity['company_info']['company_id'])
\ No newline at end of file
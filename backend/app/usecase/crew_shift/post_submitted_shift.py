@@ -1,6 +1,7 @@
 from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
 from ....domain.entity.crew_shift import crew_shift_entities
 from ...repository.crud.crew_submitted_shift import crew_submitted_shift_repository
+from ...service.agent.module.shift_incremental import shift_score_cache
 
 class PostSubmittedShiftUseCase:
     def __init__(self, user_id, company_id, submit_shift):
@@ -41,4 +42,6 @@ class PostSubmittedShiftUseCase:
             })
         
         crew_submitted_shift_repository['submitted_shift_request'](submitted_shift_json)
+        # 希望シフトとedit_shiftの両方が増えたので，差分採点の状態は作り直させる
+        shift_score_cache.invalidate(submitted_shift_entity['company_member_info']['company_id'])
         
\ No newline at end of file
@@ -1,30 +1,60 @@
 from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
+from ....domain.validation.objects.gemini import gemini_validation
 from ....domain.entity.gemini import gemini_entities
 from ...repository.crud.gemini_shift import gemini_shift_repository
 from ...repository.crud.edit_shift import edit_shift_repository
-from ...service.agent.module.shift_creator import shift_creator_run
+from ...repository.crud.decision_shift import decision_shift_repository
+from ...service.agent.module.shift_creator import (
+    shift_creator_run,
+    ashift_creator_run,
+    shift_creator_run_windowed,
+    ashift_creator_run_windowed
+)
+from ...service.agent.module.shift_solver import solve_shift_schedule
+from ...service.agent.module.shift_repair import repair_shift_schedule
+from ...service.agent.module.shift_warm_start import project_decision_shifts
+from ...service.agent.module.shift_feasibility import check_shift_feasibility, ShiftInfeasibleError
+from ...service.agent.module.llm_metrics import llm_call_context
+from ...service.agent.module.shift_incremental import shift_score_cache
 from datetime import time
+import asyncio
 import json
 
 class GeminiCreateShiftUseCase:
-    def __init__(self, company_id, first_day, last_day, comment):
+    def __init__(self, company_id, first_day, last_day, comment, engine='gemini', prompt_format='json', window_days=0, num_candidates=1, warm_start=False):
         self.company_id = company_id
         self.first_day = first_day
         self.last_day = last_day
         self.comment = comment
+        self.engine = engine
+        self.prompt_format = prompt_format
+        self.window_days = window_days
+        self.num_candidates = num_candidates
+        self.warm_start = warm_start
 
-    def execute(self):
+    def _validate(self):
         company_id_validation = submitted_decision_edit_shift_validation['CompanyIDValidation'](self.company_id).execute()
         first_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.first_day).execute()
         last_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.last_day).execute()
+        engine_validation = gemini_validation['EngineValidation'](self.engine).execute()
+        prompt_format_validation = gemini_validation['PromptFormatValidation'](self.prompt_format).execute()
+        window_days_validation = gemini_validation['WindowDaysValidation'](self.window_days).execute()
+        num_candidates_validation = gemini_validation['NumCandidatesValidation'](self.num_candidates).execute()
+        warm_start_validation = gemini_validation['WarmStartValidation'](self.warm_start).execute()
 
-        shift_rules_entity = gemini_entities['CreateShiftEntity'](
+        return gemini_entities['CreateShiftEntity'](
             company_id_validation,
             first_day_validation,
             last_day_validation,
-            self.comment
+            self.comment,
+            engine_validation,
+            prompt_format_validation,
+            window_days_validation,
+            num_candidates_validation,
+            warm_start_validation
         ).to_json()
 
+    def _load_shift_rules(self, shift_rules_entity):
         detail_shifst_rules = gemini_shift_repository['gemini_create_shift'](
             shift_rules_entity['company_id'],
             shift_rules_entity['first_day'],
@@ -32,16 +62,168 @@ class GeminiCreateShiftUseCase:
         )
 
         detail_shifst_rules['company_info']['comment'] = shift_rules_entity['comment']
+        detail_shifst_rules['company_info']['first_day'] = shift_rules_entity['first_day']
+        detail_shifst_rules['company_info']['last_day'] = shift_rules_entity['last_day']
         detail_shifst_rules['company_info']['open_time'] = detail_shifst_rules['company_info']['open_time'].strftime("%H:%M:%S")
         detail_shifst_rules['company_info']['close_time'] = detail_shifst_rules['company_info']['close_time'].strftime("%H:%M:%S")
 
-        edit_shift_gemini = shift_creator_run(json.dumps(detail_shifst_rules))
-        edit_shift_gemini_json = json.loads(edit_shift_gemini)
+        return detail_shifst_rules
 
+    def _check_feasibility(self, shift_rules_entity, detail_shifst_rules, on_progress):
+        # シフト希望だけで営業時間を埋められない・最安でも人件費を超える場合は，生成する前に断る
+        feasibility_report = check_shift_feasibility(
+            detail_shifst_rules,
+            shift_rules_entity['first_day'],
+            shift_rules_entity['last_day']
+        )
+        if not feasibility_report.feasible:
+            on_progress('infeasible', report=feasibility_report.model_dump())
+            raise ShiftInfeasibleError(feasibility_report)
+
+    def _warm_start(self, shift_rules_entity, detail_shifst_rules, on_progress):
+        # 前期間の確定シフトを曜日ごとに新しい期間へ写し，初期ドラフトにする（履歴がなければNone）
+        if not shift_rules_entity['warm_start']:
+            return None
+        decision_shifts = decision_shift_repository['decision_shift_pattern'](
+            shift_rules_entity['company_id'],
+            shift_rules_entity['first_day']
+        )
+        initial_draft, warm_start_counts = project_decision_shifts(
+            detail_shifst_rules,
+            decision_shifts,
+            shift_rules_entity['first_day'],
+            shift_rules_entity['last_day']
+        )
+        on_progress('warm_started', **warm_start_counts)
+        return initial_draft or None
+
+    def _solve(self, shift_rules_entity, detail_shifst_rules, initial_draft=None):
+        return solve_shift_schedule(
+            detail_shifst_rules,
+            shift_rules_entity['first_day'],
+            shift_rules_entity['last_day'],
+            initial_draft=initial_draft
+        ).model_dump()
+
+    def _repair(self, shift_rules_entity, detail_shifst_rules, edit_shift_gemini_json):
+        # LLMの出力をそのまま保存せず，重複・営業時間外・期間外・不明なユーザーを直してから保存する
+        edit_shift, repair_report = repair_shift_schedule(
+            detail_shifst_rules,
+            edit_shift_gemini_json.get('edit_shift', []),
+            shift_rules_entity['first_day'],
+            shift_rules_entity['last_day']
+        )
+        if repair_report.changed:
+            print(f"保存前にシフトを修復しました．({repair_report.counts})")
+
+        return {'edit_shift': edit_shift}
+
+    def _persist(self, shift_rules_entity, edit_shift_gemini_json):
         edit_shift_repository['gemini_delete_shift'](
             shift_rules_entity['company_id'],
             shift_rules_entity['first_day'],
             shift_rules_entity['last_day']
         )
 
-        edit_shift_repository['insert_shift_request'](edit_shift_gemini_json['edit_shift'])
\ No newline at end of file
+        edit_shift_repository['insert_shift_request'](edit_shift_gemini_json['edit_shift'])
+        # 期間のシフトを入れ替えたので，差分採点の状態は作り直させる
+        shift_score_cache.invalidate(shift_rules_entity['company_id'])
+
+    def prepare(self):
+        # ジョブとして受け付ける前に，同期APIと同じ入力検証・読み込み・実行可能性の確認を済ませる
+        # 返り値を execute(prepared=...) に渡すと，ジョブではこれらを繰り返さない
+        shift_rules_entity = self._validate()
+        detail_shifst_rules = self._load_shift_rules(shift_rules_entity)
+        self._check_feasibility(shift_rules_entity, detail_shifst_rules, lambda stage, **detail: None)
+        return shift_rules_entity, detail_shifst_rules
+
+    def execute(self, on_progress=None, prepared=None):
+        # このユースケース内のGemini呼び出しを company_id 付きで記録する
+        with llm_call_context(company_id=self.company_id):
+            return self._execute(on_progress, prepared)
+
+    async def aexecute(self, on_progress=None):
+        with llm_call_context(company_id=self.company_id):
+            return await self._aexecute(on_progress)
+
+    def _execute(self, on_progress=None, prepared=None):
+        on_progress = on_progress or (lambda stage, **detail: None)
+
+        if prepared is None:
+            shift_rules_entity = self._validate()
+            detail_shifst_rules = self._load_shift_rules(shift_rules_entity)
+            on_progress('loaded')
+            self._check_feasibility(shift_rules_entity, detail_shifst_rules, on_progress)
+        else:
+            shift_rules_entity, detail_shifst_rules = prepared
+            on_progress('loaded')
+        initial_draft = self._warm_start(shift_rules_entity, detail_shifst_rules, on_progress)
+
+        if shift_rules_entity['engine'] == 'solver':
+            edit_shift_gemini_json = self._solve(shift_rules_entity, detail_shifst_rules, initial_draft)
+            on_progress('drafted')
+        elif shift_rules_entity['window_days']:
+            # 長い期間はウィンドウごとに並列で作成して結合する
+            edit_shift_gemini = shift_creator_run_windowed(
+                json.dumps(detail_shifst_rules),
+                window_days=shift_rules_entity['window_days'],
+                on_progress=on_progress,
+                prompt_format=shift_rules_entity['prompt_format'],
+                num_candidates=shift_rules_entity['num_candidates'],
+                initial_draft=initial_draft
+            )
+            edit_shift_gemini_json = json.loads(edit_shift_gemini)
+        else:
+            edit_shift_gemini = shift_creator_run(
+                json.dumps(detail_shifst_rules),
+                on_progress=on_progress,
+                prompt_format=shift_rules_entity['prompt_format'],
+                num_candidates=shift_rules_entity['num_candidates'],
+                initial_draft=initial_draft
+            )
+            edit_shift_gemini_json = json.loads(edit_shift_gemini)
+
+        edit_shift_gemini_json = self._repair(shift_rules_entity, detail_shifst_rules, edit_shift_gemini_json)
+        self._persist(shift_rules_entity, edit_shift_gemini_json)
+        on_progress('persisted', shift_count=len(edit_shift_gemini_json['edit_shift']))
+
+        return {'shift_count': len(edit_shift_gemini_json['edit_shift'])}
+
+    async def _aexecute(self, on_progress=None):
+        # DBアクセスと計算の重い処理はスレッドで、Gemini呼び出しは非同期APIで実行し、イベントループを塞がない
+        on_progress = on_progress or (lambda stage, **detail: None)
+
+        shift_rules_entity = self._validate()
+        detail_shifst_rules = await asyncio.to_thread(self._load_shift_rules, shift_rules_entity)
+        on_progress('loaded')
+        await asyncio.to_thread(self._check_feasibility, shift_rules_entity, detail_shifst_rules, on_progress)
+        initial_draft = await asyncio.to_thread(self._warm_start, shift_rules_entity, detail_shifst_rules, on_progress)
+
+        if shift_rules_entity['engine'] == 'solver':
+            edit_shift_gemini_json = await asyncio.to_thread(self._solve, shift_rules_entity, detail_shifst_rules, initial_draft)
+            on_progress('drafted')
+        elif shift_rules_entity['window_days']:
+            edit_shift_gemini = await ashift_creator_run_windowed(
+                json.dumps(detail_shifst_rules),
+                window_days=shift_rules_entity['window_days'],
+                on_progress=on_progress,
+                prompt_format=shift_rules_entity['prompt_format'],
+                num_candidates=shift_rules_entity['num_candidates'],
+                initial_draft=initial_draft
+            )
+            edit_shift_gemini_json = json.loads(edit_shift_gemini)
+        else:
+            edit_shift_gemini = await ashift_creator_run(
+                json.dumps(detail_shifst_rules),
+                on_progress=on_progress,
+                prompt_format=shift_rules_entity['prompt_format'],
+                num_candidates=shift_rules_entity['num_candidates'],
+                initial_draft=initial_draft
+            )
+            edit_shift_gemini_json = json.loads(edit_shift_gemini)
+
+        edit_shift_gemini_json = await asyncio.to_thread(self._repair, shift_rules_entity, detail_shifst_rules, edit_shift_gemini_json)
+        await asyncio.to_thread(self._persist, shift_rules_entity, edit_shift_gemini_json)
+        on_progress('persisted', shift_count=len(edit_shift_gemini_json['edit_shift']))
+
+        return {'shift_count': len(edit_shift_gemini_json['edit_shift'])}
\ No newline at end of file
@@ -1,36 +1,75 @@
 from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
+from ....domain.validation.objects.gemini import gemini_validation
 from ....domain.entity.gemini import gemini_entities
 from ...repository.crud.gemini_shift import gemini_shift_repository
-from ...service.agent.module.shift_creator import eval_final_shift_tool
+from ...service.agent.module.shift_creator import eval_final_shift_tool, phrase_evaluation_feedback_tool
+from ...service.agent.module.prompt_codec import encode_shift_rules
+from ...service.agent.module.llm_metrics import llm_call_context
+from ...service.agent.module.shift_evaluator import evaluate_shift_schedule, collect_member_shifts, FINAL_LABOR_COST_PENALTY
 import json
 
 class GeminiEvaluateShiftUseCase:
-    def __init__(self, company_id, first_day, last_day):
+    def __init__(self, company_id, first_day, last_day, engine='gemini', phrase_feedback=False, prompt_format='json'):
         self.company_id = company_id
         self.first_day = first_day
         self.last_day = last_day
+        self.engine = engine
+        self.phrase_feedback = phrase_feedback
+        self.prompt_format = prompt_format
 
     def execute(self):
+        # このユースケース内のGemini呼び出しを company_id 付きで記録する
+        with llm_call_context(company_id=self.company_id):
+            return self._execute()
+
+    def _execute(self):
         company_id_validation = submitted_decision_edit_shift_validation['CompanyIDValidation'](self.company_id).execute()
         first_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.first_day).execute()
         last_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.last_day).execute()
+        engine_validation = gemini_validation['EvaluateEngineValidation'](self.engine).execute()
+        prompt_format_validation = gemini_validation['PromptFormatValidation'](self.prompt_format).execute()
 
         evaluate_rules_entity = gemini_entities['EvaluateShiftEntity'](
             company_id_validation,
             first_day_validation,
-            last_day_validation
+            last_day_validation,
+            engine_validation,
+            prompt_format_validation
         ).to_json()
 
         detail_shift = gemini_shift_repository['gemini_evaluate_shift'](
             evaluate_rules_entity['company_id'],
             evaluate_rules_entity['first_day'],
-            evaluate_rules_entity['last_day']
+            evaluate_rules_entity['last_day'],
+            include_submitted_shift=evaluate_rules_entity['engine'] == 'local'
         )
 
         detail_shift['company_info']['open_time'] = detail_shift['company_info']['open_time'].strftime("%H:%M:%S")
         detail_shift['company_info']['close_time'] = detail_shift['company_info']['close_time'].strftime("%H:%M:%S")
 
-        evalute_shift_gemini = eval_final_shift_tool(json.dumps(detail_shift))
+        if evaluate_rules_entity['engine'] == 'local':
+            evaluation = evaluate_shift_schedule(
+                detail_shift,
+                collect_member_shifts(detail_shift),
+                evaluate_rules_entity['first_day'],
+                evaluate_rules_entity['last_day'],
+                labor_cost_penalty=FINAL_LABOR_COST_PENALTY
+            )
+
+            if self.phrase_feedback:
+                evaluation.feedback_japanese = phrase_evaluation_feedback_tool(evaluation.model_dump_json())
+
+            return {
+                'comment': evaluation.feedback_japanese,
+                'quantitative_score': evaluation.quantitative_score,
+                'breakdown': evaluation.breakdown.model_dump()
+            }
+
+        if evaluate_rules_entity['prompt_format'] == 'compact':
+            detail_shift['company_info']['first_day'] = evaluate_rules_entity['first_day']
+            evalute_shift_gemini = eval_final_shift_tool(encode_shift_rules(detail_shift), prompt_format='compact')
+        else:
+            evalute_shift_gemini = eval_final_shift_tool(json.dumps(detail_shift))
         evalute_shift_gemini_json = json.loads(evalute_shift_gemini)
 
         return evalute_shift_gemini_json
\ No newline at end of file
@@ -1,5 +1,7 @@
 from .get_decision_shift import GetDecisionShiftUseCase
+from .get_working_staff import GetWorkingStaffUseCase
 
 home_page_usecase = {
-    'GetDecisionShiftUseCase': GetDecisionShiftUseCase
+    'GetDecisionShiftUseCase': GetDecisionShiftUseCase,
+    'GetWorkingStaffUseCase': GetWorkingStaffUseCase
 }
\ No newline at end of file
@@ -0,0 +1,75 @@
+from ....domain.validation.objects.company import company_validation
+from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
+from ....domain.validation.objects.company_position import company_position_validation
+from ....domain.entity.home_page import home_page_entities
+from ...repository.crud.decision_shift import decision_shift_repository
+from ...service.agent.module.shift_interval_index import ShiftIntervalIndex
+
+class GetWorkingStaffUseCase:
+    def __init__(self, company_id, day, start_time, finish_time=None, position=None):
+        self.company_id = company_id
+        self.day = day
+        self.start_time = start_time
+        self.finish_time = finish_time
+        self.position = position
+
+    def execute(self):
+        value_change_type = int(self.company_id)
+        company_id_validation = company_validation['CompanyIDValidation'](value_change_type).execute()
+        day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.day).execute()
+        start_time_validation = submitted_decision_edit_shift_validation['StartTimeValidation'](self.start_time).execute()
+        finish_time_validation = submitted_decision_edit_shift_validation['FinishTimeValidation'](self.finish_time).execute() if self.finish_time is not None else None
+        position_validation = company_position_validation['PositionNameValidation'](self.position).execute() if self.position is not None else None
+
+        working_staff_entity = home_page_entities['WorkingStaffEntity'](
+            company_id_validation,
+            day_validation,
+            start_time_validation,
+            finish_time_validation,
+            position_validation
+        ).to_json()
+
+        decision_shifts = decision_shift_repository['period_decision_shifts'](
+            working_staff_entity['company_id'],
+            working_staff_entity['day'],
+            working_staff_entity['day']
+        )
+        shift_index = ShiftIntervalIndex(decision_shifts)
+
+        # finish_timeがなければその時刻に勤務中の従業員，あれば時間帯に少しでも勤務する従業員を返す
+        if working_staff_entity['finish_time'] is None:
+            working_shifts = shift_index.working_at(working_staff_entity['day'], working_staff_entity['start_time'], working_staff_entity['position'])
+            min_staff = len(working_shifts)
+        else:
+            if working_staff_entity['start_time'] >= working_staff_entity['finish_time']:
+                raise ValueError('start_timeはfinish_timeより前の時刻でなければなりません。')
+            working_shifts = shift_index.working_between(
+                working_staff_entity['day'],
+                working_staff_entity['start_time'],
+                working_staff_entity['finish_time'],
+                working_staff_entity['position']
+            )
+            min_staff = shift_index.min_staff(
+                working_staff_entity['day'],
+                working_staff_entity['start_time'],
+                working_staff_entity['finish_time'],
+                working_staff_entity['position']
+            )
+
+        return {
+            "day": working_staff_entity['day'],
+            "start_time": working_staff_entity['start_time'],
+            "finish_time": working_staff_entity['finish_time'],
+            "position": working_staff_entity['position'],
+            "min_staff": min_staff,
+            "working_staff": [
+                {
+                    "user_id": s['user_id'],
+                    "name": s['name'],
+                    "position": s['position'],
+                    "start_time": s['start_time'],
+                    "finish_time": s['finish_time']
+                }
+                for s in sorted(working_shifts, key=lambda s: (s['start_time'], s['user_id']))
+            ]
+        }
\ No newline at end of file
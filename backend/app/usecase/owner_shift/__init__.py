@@ -1,9 +1,13 @@
 from .get_shift_info import GetShiftInfoUseCase
 from .edit_shift import EditShiftUseCase
 from .complete_shift import CompleteShiftUseCase
+from .simulate_edit_shift import SimulateEditShiftUseCase
+from .shift_score import GetShiftScoreUseCase
 
 owner_shift_usecase = {
     'GetShiftInfoUseCase': GetShiftInfoUseCase,
     'EditShiftUseCase': EditShiftUseCase,
-    'CompleteShiftUseCase': CompleteShiftUseCase
+    'CompleteShiftUseCase': CompleteShiftUseCase,
+    'SimulateEditShiftUseCase': SimulateEditShiftUseCase,
+    'GetShiftScoreUseCase': GetShiftScoreUseCase
 }
\ No newline at end of file
@@ -1,6 +1,11 @@
 from ....domain.validation.objects.company import company_validation
 from ....domain.entity.owner_shift import owner_shift_entities
 from ...repository.crud.edit_shift import edit_shift_repository
+from ...repository.crud.gemini_shift import gemini_shift_repository
+from ...repository.crud.shift_history import shift_history_repository
+from ...repository.db.db_init import unit_of_work
+from ...service.agent.module.shift_incremental import shift_score_cache
+from ...service.agent.module.shift_evaluator import evaluate_shift_schedule, collect_member_shifts, FINAL_LABOR_COST_PENALTY
 
 class CompleteShiftUseCase:
     def __init__(self, company_id):
@@ -11,4 +16,37 @@ class CompleteShiftUseCase:
 
         company_id_entity = owner_shift_entities['CompleteShiftEntity'](company_id_validation).to_json()
 
-        edit_shift_repository['complete_edit_shift_request'](company_id_entity['company_id'])
\ No newline at end of file
+        # 確定と履歴特徴量の更新を1つのトランザクションで行い，履歴の更新に失敗すれば確定もしない
+        with unit_of_work():
+            finalized = edit_shift_repository['complete_edit_shift_request'](company_id_entity['company_id'])
+            if finalized['decision_shift']:
+                self._update_history(company_id_entity['company_id'], finalized)
+        shift_score_cache.invalidate(company_id_entity['company_id'])
+
+        return {'inserted_count': len(finalized['decision_shift'])}
+
+    def _update_history(self, company_id, finalized):
+        # 確定した期間を記録済みの重なる期間まで広げて採点し，その期間の寄与を置き換える（オーナーの評価があればその点数を優先する）
+        # 同じ期間を何度確定しても1期間として数える
+        first_day, last_day = shift_history_repository['get_shift_history_period'](company_id, finalized['first_day'], finalized['last_day'])
+        detail_shift = gemini_shift_repository['gemini_evaluate_shift'](company_id, first_day, last_day, include_submitted_shift=True)
+        detail_shift['company_info']['open_time'] = detail_shift['company_info']['open_time'].strftime("%H:%M:%S")
+        detail_shift['company_info']['close_time'] = detail_shift['company_info']['close_time'].strftime("%H:%M:%S")
+
+        score = shift_history_repository['get_owner_score'](company_id, first_day, last_day)
+        if score is None:
+            score = evaluate_shift_schedule(
+                detail_shift,
+                collect_member_shifts(detail_shift),
+                first_day,
+                last_day,
+                labor_cost_penalty=FINAL_LABOR_COST_PENALTY
+            ).quantitative_score
+
+        shift_history_repository['update_shift_history_features'](
+            company_id,
+            first_day,
+            last_day,
+            detail_shift['company_member'],
+            score
+        )
\ No newline at end of file
@@ -2,6 +2,8 @@ from ....domain.validation.objects.company import company_validation
 from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
 from ....domain.entity.owner_shift import owner_shift_entities
 from ...repository.crud.edit_shift import edit_shift_repository
+from ...repository.db.db_init import unit_of_work
+from ...service.agent.module.shift_incremental import shift_score_cache
 
 class EditShiftUseCase:
     def __init__(self, company_id, add_edit_shift, update_edit_shift, delete_edit_shift):
@@ -11,6 +13,23 @@ class EditShiftUseCase:
         self.delete_edit_shift = delete_edit_shift
 
     def execute(self):
+        edit_shift_entity = self._validate()
+
+        # 削除・更新・追加を1つのトランザクションで保存し，途中で失敗すれば何も保存しない
+        with unit_of_work():
+            edit_shift_repository['delete_shift_request'](edit_shift_entity['company_id'], edit_shift_entity['delete_shift'])
+            edit_shift_repository['update_shift_request'](edit_shift_entity['company_id'], edit_shift_entity['update_shift'])
+            inserted_shifts = edit_shift_repository['insert_shift_request'](edit_shift_entity['add_edit_shift'])
+
+        # コミット後に，採点中の期間があれば，編集したシフトだけで点数を差分更新して返す
+        return shift_score_cache.apply_edits(
+            edit_shift_entity['company_id'],
+            inserted_shifts,
+            edit_shift_entity['update_shift'],
+            edit_shift_entity['delete_shift']
+        )
+
+    def _validate(self):
         company_id_validation = company_validation['CompanyIDValidation'](self.company_id).execute()
 
         add_edit_shift_validation = []
@@ -43,13 +62,9 @@ class EditShiftUseCase:
             edit_shift_id_validation = submitted_decision_edit_shift_validation['EditShiftIDValidation'](a_delete_shift).execute()
             delete_edit_shift_validation.append(edit_shift_id_validation)
 
-        edit_shift_entity = owner_shift_entities['EditShiftEntity'](
+        return owner_shift_entities['EditShiftEntity'](
             company_id_validation,
             add_edit_shift_validation,
             update_edit_shift_validation,
             delete_edit_shift_validation
-        ).to_json()
-
-        edit_shift_repository['delete_shift_request'](edit_shift_entity['delete_shift'])
-        edit_shift_repository['update_shift_request'](edit_shift_entity['update_shift'])
-        edit_shift_repository['insert_shift_request'](edit_shift_entity['add_edit_shift'])
\ No newline at end of file
+        ).to_json()
\ No newline at end of file
@@ -0,0 +1,51 @@
+from ....domain.validation.objects.company import company_validation
+from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
+from ...repository.crud.gemini_shift import gemini_shift_repository
+from ...service.agent.module.shift_incremental import shift_score_cache
+
+def load_period_shifts(company_id, first_day, last_day):
+    # 期間の会社情報・従業員（提出シフト付き）と，edit_shift_id付きの編集中シフトを読み込む
+    detail_shift = gemini_shift_repository['gemini_evaluate_shift'](company_id, first_day, last_day, include_submitted_shift=True)
+    detail_shift['company_info']['open_time'] = detail_shift['company_info']['open_time'].strftime("%H:%M:%S")
+    detail_shift['company_info']['close_time'] = detail_shift['company_info']['close_time'].strftime("%H:%M:%S")
+
+    edit_shift = [
+        {
+            'edit_shift_id': shift['edit_shift_id'],
+            'user_id': member['user_id'],
+            'company_id': company_id,
+            'day': shift['day'],
+            'start_time': shift['start_time'],
+            'finish_time': shift['finish_time']
+        }
+        for member in detail_shift['company_member']
+        for shift in member['edit_shift']
+    ]
+    return detail_shift, edit_shift
+
+class GetShiftScoreUseCase:
+    def __init__(self, company_id, first_day, last_day):
+        self.company_id = company_id
+        self.first_day = first_day
+        self.last_day = last_day
+
+    def execute(self):
+        value_change_type = int(self.company_id)
+        company_id_validation = company_validation['CompanyIDValidation'](value_change_type).execute()
+        first_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.first_day).execute()
+        last_day_validation = submitted_decision_edit_shift_validation['DayValidation'](self.last_day).execute()
+        if first_day_validation > last_day_validation:
+            raise ValueError('first_dayはlast_day以前の日付でなければなりません。')
+
+        # 初回だけ期間を読み込んで採点器を作り，以降はEditShiftUseCaseの編集で差分更新された点数を返す
+        score = shift_score_cache.score(
+            company_id_validation,
+            first_day_validation,
+            last_day_validation,
+            lambda: load_period_shifts(company_id_validation, first_day_validation, last_day_validation)
+        )
+        return {
+            'first_day': first_day_validation,
+            'last_day': last_day_validation,
+            'score': score.model_dump()
+        }
\ No newline at end of file
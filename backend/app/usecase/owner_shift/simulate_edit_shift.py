@@ -0,0 +1,47 @@
+from ....domain.validation.objects.submitted_decision_edit_shift import submitted_decision_edit_shift_validation
+from ...repository.crud.edit_shift import edit_shift_repository
+from ...service.agent.module.shift_simulation import simulate_shift_edits
+from .edit_shift import EditShiftUseCase
+from .shift_score import load_period_shifts
+
+class SimulateEditShiftUseCase(EditShiftUseCase):
+    def __init__(self, company_id, add_edit_shift, update_edit_shift, delete_edit_shift, first_day=None, last_day=None):
+        super().__init__(company_id, add_edit_shift, update_edit_shift, delete_edit_shift)
+        self.first_day = first_day
+        self.last_day = last_day
+
+    def execute(self):
+        # EditShiftUseCaseと同じ入力を検証し，DBには書き込まずにメモリ上で編集後のシフトを採点する
+        edit_shift_entity = self._validate()
+        company_id = edit_shift_entity['company_id']
+
+        edited_ids = edit_shift_entity['delete_shift'] + [s['edit_shift_id'] for s in edit_shift_entity['update_shift']]
+        edited_shifts = edit_shift_repository['edit_shift_by_ids'](company_id, edited_ids)
+        first_day, last_day = self._period(edit_shift_entity['add_edit_shift'] + edited_shifts)
+
+        detail_shift, edit_shift = load_period_shifts(company_id, first_day, last_day)
+
+        simulation = simulate_shift_edits(
+            detail_shift,
+            edit_shift,
+            edit_shift_entity['add_edit_shift'],
+            edit_shift_entity['update_shift'],
+            edit_shift_entity['delete_shift'],
+            first_day,
+            last_day
+        )
+        return simulation.model_dump()
+
+    def _period(self, shifts):
+        # 期間の指定がなければ，編集対象のシフトの日付の範囲を採点する
+        first_day = submitted_decision_edit_shift_validation['DayValidation'](self.first_day).execute() if self.first_day is not None else None
+        last_day = submitted_decision_edit_shift_validation['DayValidation'](self.last_day).execute() if self.last_day is not None else None
+        days = [s['day'] for s in shifts]
+        if first_day is None or last_day is None:
+            if not days:
+                raise ValueError('シミュレーションする期間を特定できません。first_dayとlast_dayを指定してください。')
+            first_day = first_day or min(days)
+            last_day = last_day or max(days)
+        if first_day > last_day:
+            raise ValueError('first_dayはlast_day以前の日付でなければなりません。')
+        return first_day, last_day
\ No newline at end of file
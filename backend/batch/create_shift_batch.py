@@ -0,0 +1,176 @@
+"""
+Generates the schedules of many companies for one period in a process pool.
+
+Each company runs GeminiCreateShiftUseCase in a worker process, which persists its schedule
+to edit_shift as soon as it is done, and is then scored with the local evaluator. Gemini
+requests are capped across all processes by one shared semaphore (--max-llm-requests).
+Every finished company is appended to the checkpoint file, and --resume skips the
+companies already completed there, so an interrupted batch can be restarted.
+
+Run from the repository root:
+    python -m backend.batch.create_shift_batch --company-ids 1 2 3 --first-day 2025-08-01 --last-day 2025-08-31
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from backend.app.service.agent.module.shift_creator import set_gemini_request_limit
+from backend.app.service.agent.module.shift_feasibility import ShiftInfeasibleError
+from backend.app.usecase.gemini import gemini_usecase
+
+DEFAULT_CHECKPOINT_PATH = "create_shift_batch.checkpoint.jsonl"
+
+
+def _init_worker(request_limit):
+    set_gemini_request_limit(request_limit)
+
+
+def _run_company(company_id: int, first_day: str, last_day: str, options: dict) -> dict:
+    """Creates, persists and scores one company's schedule; never raises."""
+    started = time.perf_counter()
+    result = {"company_id": company_id, "first_day": first_day, "last_day": last_day}
+    try:
+        created = gemini_usecase['GeminiCreateShiftUseCase'](
+            company_id,
+            first_day,
+            last_day,
+            options["comment"],
+            options["engine"],
+            options["prompt_format"],
+            options["window_days"],
+            options["num_candidates"],
+            options["warm_start"]
+        ).execute()
+        result["create_seconds"] = round(time.perf_counter() - started, 3)
+
+        evaluation = gemini_usecase['GeminiEvaluateShiftUseCase'](company_id, first_day, last_day, 'local').execute()
+        result.update(
+            status="completed",
+            shift_count=created["shift_count"],
+            score=evaluation["quantitative_score"]
+        )
+    except ShiftInfeasibleError as e:
+        result.update(status="infeasible", error=str(e), report=e.report.model_dump(include={"reasons", "uncovered_slot_count", "min_labor_cost"}))
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _load_checkpoint(path: str, first_day: str, last_day: str) -> dict:
+    """Returns {company_id: result} of the companies already completed for the period."""
+    completed = {}
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("status") == "completed" and (record["first_day"], record["last_day"]) == (first_day, last_day):
+                completed[record["company_id"]] = record
+    return completed
+
+
+def _summarize(results: list, wall_seconds: float) -> dict:
+    scores = [r["score"] for r in results if r.get("score") is not None]
+    by_status = {}
+    for r in results:
+        by_status[r["status"]] = by_status.get(r["status"], 0) + 1
+    return {
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "companies": len(results),
+        "by_status": by_status,
+        "wall_seconds": round(wall_seconds, 3),
+        "company_seconds_total": round(sum(r.get("seconds", 0) for r in results), 3),
+        "average_score": round(sum(scores) / len(scores), 1) if scores else None,
+        "results": sorted(results, key=lambda r: r["company_id"])
+    }
+
+
+def run_batch(
+    company_ids: list,
+    first_day: str,
+    last_day: str,
+    options: dict,
+    processes: int,
+    max_llm_requests: int,
+    checkpoint_path: str,
+    resume: bool
+) -> dict:
+    """Fans the companies out over a process pool and returns the summary report."""
+    done = _load_checkpoint(checkpoint_path, first_day, last_day) if resume else {}
+    pending = [c for c in dict.fromkeys(company_ids) if c not in done]
+    results = [dict(r, resumed=True) for c, r in done.items() if c in company_ids]
+    print(f"{len(pending)}社のシフトを作成します（チェックポイントから{len(results)}社をスキップ）．")
+
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        request_limit = manager.BoundedSemaphore(max_llm_requests)
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(pending)) or 1,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(request_limit,)
+        ) as executor, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            futures = [executor.submit(_run_company, c, first_day, last_day, options) for c in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                checkpoint.write(json.dumps(result, ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                results.append(result)
+                print(f"company_id={result['company_id']}: {result['status']} ({result['seconds']:.1f}秒, スコア: {result.get('score')})")
+
+    return _summarize(results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--first-day", required=True)
+    parser.add_argument("--last-day", required=True)
+    parser.add_argument("--comment", default="")
+    parser.add_argument("--engine", choices=["gemini", "solver"], default="gemini")
+    parser.add_argument("--prompt-format", choices=["json", "compact"], default="json")
+    parser.add_argument("--window-days", type=int, default=0)
+    parser.add_argument("--num-candidates", type=int, default=1)
+    parser.add_argument("--warm-start", action="store_true")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-llm-requests", type=int, default=8, help="Gemini requests in flight across all processes")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="JSONL file of finished companies")
+    parser.add_argument("--resume", action="store_true", help="skip the companies completed in the checkpoint")
+    parser.add_argument("--report", help="write the summary report to this JSON file")
+    args = parser.parse_args()
+
+    options = {
+        "comment": args.comment,
+        "engine": args.engine,
+        "prompt_format": args.prompt_format,
+        "window_days": args.window_days,
+        "num_candidates": args.num_candidates,
+        "warm_start": args.warm_start
+    }
+    summary = run_batch(
+        args.company_ids,
+        args.first_day,
+        args.last_day,
+        options,
+        args.processes,
+        args.max_llm_requests,
+        args.checkpoint,
+        args.resume
+    )
+    report = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Rows/sec of insert_shift_request and submitted_shift_request against the previous ORM versions.
+
+The previous implementations (one ORM object and session.add per row, re-parsing the strings
+for every table) are kept below as the baseline. Both run against a throwaway database
+(SQLite by default, or --database-url, e.g. a scratch Postgres) on the same generated rows.
+
+Run from the repository root:
+    python -m backend.benchmarks.bulk_insert --rows 1000 5000 20000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+
+import sqlalchemy
+
+from backend.app.repository.db import db_init
+from backend.app.repository.db.db_init import get_session_scope
+from backend.app.repository.db.migrations import upgrade
+from backend.app.repository.db.models import Company, EditShift, SubmittedShift, User
+from backend.app.repository.crud.crew_submitted_shift import crew_submitted_shift_repository
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+
+COMPANY_ID = 1
+MEMBERS = 50
+
+
+def legacy_insert_shift_request(new_shifts: list[dict]):
+    today = datetime.today().date()
+    with get_session_scope() as session:
+        for shift in new_shifts:
+            shift_day = datetime.strptime(shift["day"], "%Y-%m-%d").date()
+            if shift_day >= today:
+                session.add(EditShift(
+                    user_id=shift["user_id"],
+                    company_id=shift["company_id"],
+                    day=shift_day,
+                    start_time=datetime.strptime(shift["start_time"], "%H:%M:%S").time(),
+                    finish_time=datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+                ))
+        session.commit()
+
+
+def legacy_submitted_shift_request(shifts: list[dict]):
+    with get_session_scope() as session:
+        for shift in shifts:
+            day = datetime.strptime(shift["day"], "%Y-%m-%d").date()
+            start_time = datetime.strptime(shift["start_time"], "%H:%M:%S").time()
+            finish_time = datetime.strptime(shift["finish_time"], "%H:%M:%S").time()
+            session.add(SubmittedShift(user_id=shift["user_id"], company_id=shift["company_id"], day=day, start_time=start_time, finish_time=finish_time))
+            session.add(EditShift(user_id=shift["user_id"], company_id=shift["company_id"], day=day, start_time=start_time, finish_time=finish_time))
+        session.commit()
+
+
+def make_shifts(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    first_day = date.today() + timedelta(days=1)
+    shifts = []
+    for _ in range(n):
+        start = rng.randint(9, 16)
+        shifts.append({
+            "user_id": rng.randint(1, MEMBERS),
+            "company_id": COMPANY_ID,
+            "day": (first_day + timedelta(days=rng.randint(0, 60))).isoformat(),
+            "start_time": f"{start:02d}:00:00",
+            "finish_time": f"{min(start + rng.randint(4, 8), 22):02d}:00:00"
+        })
+    return shifts
+
+
+def _clear(engine):
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.delete(EditShift))
+        connection.execute(sqlalchemy.delete(SubmittedShift))
+
+
+def _rows_per_second(engine, function, shifts: list[dict], table_rows: int, repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        _clear(engine)
+        started = time.perf_counter()
+        function(shifts)
+        elapsed.append(time.perf_counter() - started)
+    return table_rows / min(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url", help="a scratch database (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bulk_insert.db")
+    engine = sqlalchemy.create_engine(database_url)
+    # リポジトリ関数をCloud SQLではなくこのデータベースに向ける
+    db_init.engine = engine
+    db_init.Session = None
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        upgrade(engine)
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.insert(Company), [{"company_id": COMPANY_ID, "company_name": "benchmark", "open_time": dtime(9), "close_time": dtime(22)}])
+        connection.execute(sqlalchemy.insert(User), [
+            {"user_id": u, "company_id": COMPANY_ID, "email": f"u{u}@example.com", "firebase_uid": f"uid-{u}", "role": "crew"}
+            for u in range(1, MEMBERS + 1)
+        ])
+
+    cases = [
+        ("insert_shift_request", legacy_insert_shift_request, edit_shift_repository['insert_shift_request'], 1),
+        ("submitted_shift_request", legacy_submitted_shift_request, crew_submitted_shift_repository['submitted_shift_request'], 2),
+    ]
+    print(f"{'function':<26}{'rows':>8}{'ORM rows/s':>14}{'bulk rows/s':>14}{'speedup':>10}")
+    for rows in args.rows:
+        shifts = make_shifts(rows)
+        for name, legacy, bulk, tables in cases:
+            legacy_rate = _rows_per_second(engine, legacy, shifts, rows * tables, args.repeat)
+            bulk_rate = _rows_per_second(engine, bulk, shifts, rows * tables, args.repeat)
+            print(f"{name:<26}{rows:>8}{legacy_rate:>14,.0f}{bulk_rate:>14,.0f}{bulk_rate / legacy_rate:>9.1f}x")
+    _clear(engine)
+
+
+if __name__ == "__main__":
+    main()
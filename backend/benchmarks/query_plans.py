@@ -0,0 +1,173 @@
+"""
+Query plans and timings of the hot shift queries before and after the shift index migration.
+
+Seeds a throwaway database (SQLite by default, or --database-url, e.g. a scratch Postgres),
+migrates it to the latest version, reverts 0002_shift_indexes to measure the "before" plans,
+then applies it again. Every query issued by the repository functions below is captured and
+EXPLAINed, and each function is timed over --repeat calls for one company.
+
+Run from the repository root:
+    python -m backend.benchmarks.query_plans --companies 200 --members 15 --days 60
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from datetime import time as dtime
+
+import sqlalchemy
+from sqlalchemy import event
+
+from backend.app.repository.db import db_init
+from backend.app.repository.db.migrations import downgrade, upgrade
+from backend.app.repository.db.models import (
+    Company,
+    CompanyRestDay,
+    DecisionShift,
+    EditShift,
+    SubmittedShift,
+    User,
+    UserProfile,
+)
+from backend.app.repository.crud.decision_shift import decision_shift_repository
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.crud.gemini_shift import gemini_shift_repository
+
+POSITIONS = ["hall", "kitchen", "cashier"]
+FIRST_DAY = date(2030, 1, 1)
+
+
+def seed(engine, companies: int, members: int, days: int, seed_value: int = 0):
+    """Inserts companies x members users with a submitted, edit and decision shift on most days."""
+    rng = random.Random(seed_value)
+    company_rows, user_rows, profile_rows, rest_rows, shift_rows = [], [], [], [], []
+    user_id = 0
+    for company_id in range(1, companies + 1):
+        company_rows.append({
+            "company_id": company_id,
+            "company_name": f"company-{company_id}",
+            "open_time": dtime(9),
+            "close_time": dtime(22),
+            "labor_cost": 3_000_000
+        })
+        rest_rows += [
+            {"company_id": company_id, "rest_day": FIRST_DAY + timedelta(days=d)}
+            for d in range(days) if (FIRST_DAY + timedelta(days=d)).weekday() == 2
+        ]
+        for _ in range(members):
+            user_id += 1
+            user_rows.append({"user_id": user_id, "company_id": company_id, "email": f"u{user_id}@example.com", "firebase_uid": f"uid-{user_id}", "role": "crew"})
+            profile_rows.append({"user_id": user_id, "company_id": company_id, "name": f"user-{user_id}", "position": rng.choice(POSITIONS), "hour_pay": 1100})
+            for d in range(days):
+                if rng.random() < 0.6:
+                    start = rng.randint(9, 16)
+                    shift_rows.append({
+                        "user_id": user_id,
+                        "company_id": company_id,
+                        "day": FIRST_DAY + timedelta(days=d),
+                        "start_time": dtime(start),
+                        "finish_time": dtime(min(start + rng.randint(4, 8), 22))
+                    })
+
+    # 会社ごとの行がまとまらないよう，実運用のように挿入順を混ぜる
+    rng.shuffle(shift_rows)
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.insert(Company), company_rows)
+        connection.execute(sqlalchemy.insert(User), user_rows)
+        connection.execute(sqlalchemy.insert(UserProfile), profile_rows)
+        connection.execute(sqlalchemy.insert(CompanyRestDay), rest_rows)
+        for model in (SubmittedShift, EditShift, DecisionShift):
+            connection.execute(sqlalchemy.insert(model), shift_rows)
+    return len(shift_rows)
+
+
+def _explain(engine, statement: str, parameters) -> list:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def measure(engine, calls: dict, repeat: int) -> dict:
+    """Returns {name: {"ms": average, "plans": [[plan lines] per captured statement]}}."""
+    results = {}
+    for name, call in calls.items():
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "DELETE", "UPDATE")):
+                captured.append((statement, parameters))
+
+        call()  # 初回の接続・コンパイルを計測から外す
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            call()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = {
+            "ms": (time.perf_counter() - started) / repeat * 1000,
+            "plans": [_explain(engine, statement, parameters) for statement, parameters in captured]
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--members", type=int, default=15)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", help="a scratch database to seed (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "query_plans.db")
+    engine = sqlalchemy.create_engine(database_url)
+    # リポジトリ関数をCloud SQLではなくこのデータベースに向ける
+    db_init.engine = engine
+    db_init.Session = None
+
+    upgrade(engine)
+    started = time.perf_counter()
+    rows = seed(engine, args.companies, args.members, args.days)
+    print(f"{args.companies}社・{rows}件/テーブルのシフトを投入しました ({time.perf_counter() - started:.1f}秒)")
+
+    company_id = args.companies // 2 or 1
+    first_day = (FIRST_DAY + timedelta(days=args.days - 31)).isoformat()
+    last_day = (FIRST_DAY + timedelta(days=args.days - 1)).isoformat()
+    calls = {
+        "edit_shift_request": lambda: edit_shift_repository['edit_shift_request'](company_id),
+        "decision_shift_request": lambda: decision_shift_repository['decision_shift_request'](company_id),
+        "gemini_create_shift": lambda: gemini_shift_repository['gemini_create_shift'](company_id, first_day, last_day),
+        "gemini_evaluate_shift": lambda: gemini_shift_repository['gemini_evaluate_shift'](company_id, first_day, last_day, include_submitted_shift=True),
+        "period_edit_shifts": lambda: edit_shift_repository['period_edit_shifts'](company_id, first_day, last_day),
+        "period_decision_shifts": lambda: decision_shift_repository['period_decision_shifts'](company_id, first_day, last_day),
+    }
+
+    downgrade(engine, 1)
+    before = measure(engine, calls, args.repeat)
+    upgrade(engine)
+    after = measure(engine, calls, args.repeat)
+
+    print(f"\n{'query':<24}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in calls:
+        speedup = before[name]["ms"] / after[name]["ms"] if after[name]["ms"] else float("inf")
+        print(f"{name:<24}{before[name]['ms']:>12.2f}{after[name]['ms']:>12.2f}{speedup:>9.1f}x")
+
+    for name in calls:
+        print(f"\n----- {name} -----")
+        for i, (plan_before, plan_after) in enumerate(zip(before[name]["plans"], after[name]["plans"]), 1):
+            print(f"  statement {i}")
+            print("    before: " + " | ".join(plan_before))
+            print("    after:  " + " | ".join(plan_after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end benchmark of the shift agent loop on synthetic companies, without Gemini or Cloud SQL.
+
+The chat model is replaced by fake_llm.FakeChatModel (solver drafts, local evaluations, fixed
+latency per call) and the repository functions used by the Gemini use cases are replaced by
+in-memory stand-ins, so only the orchestration code is measured.
+
+Run from the repository root:
+    python -m backend.benchmarks.shift_agent_loop --crew 10 50 200 --days 7 31 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from datetime import time as dtime
+
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.crud.gemini_shift import gemini_shift_repository
+from backend.app.service.agent.module import gemini_client, shift_creator, shift_feasibility
+from backend.app.service.agent.module.fake_llm import FakeChatModel
+from backend.app.service.agent.module.llm_metrics import collect_request_spans, summarize_spans
+from backend.app.service.agent.module.prompt_codec import encode_shift_rules
+from backend.app.usecase.gemini import gemini_usecase
+
+POSITIONS = ["hall", "kitchen", "cashier"]
+FIRST_DAY = date.today() + timedelta(days=30)
+
+
+def make_company(crew: int, days: int, seed: int = 0) -> dict:
+    """Builds a payload shaped like gemini_create_shift's (times as datetime.time, like the DB)."""
+    rng = random.Random(seed)
+    company_member = []
+    for user_id in range(1, crew + 1):
+        submitted_shift = []
+        for offset in range(days):
+            if rng.random() < 0.5:
+                start = rng.choice([9, 10, 11, 12, 13, 14, 17])
+                finish = min(start + rng.choice([4, 5, 6, 8]), 22)
+                submitted_shift.append({
+                    "edit_shift_id": user_id * 1000 + offset,
+                    "day": (FIRST_DAY + timedelta(days=offset)).isoformat(),
+                    "start_time": f"{start:02d}:00:00",
+                    "finish_time": f"{finish:02d}:00:00"
+                })
+        company_member.append({
+            "user_id": user_id,
+            "name": f"crew{user_id}",
+            "evaluate": rng.randint(1, 5),
+            "position": POSITIONS[user_id % len(POSITIONS)],
+            "experience": rng.choice(["rookie", "veteran"]),
+            "hour_pay": 1000 + rng.randint(0, 500),
+            "submitted_shift": submitted_shift
+        })
+    return {
+        "company_info": {
+            "company_id": 1,
+            "open_time": dtime(9, 0),
+            "close_time": dtime(22, 0),
+            "rest_day": [(FIRST_DAY + timedelta(days=d)).isoformat() for d in range(0, days, 7)],
+            "labor_cost": crew * days * 4000,
+            "comment": ""
+        },
+        "company_member": company_member
+    }
+
+
+def _fresh(payload: dict) -> dict:
+    # use caseは company_info を書き換えるので，呼び出しごとにコピーを渡す
+    company_info = dict(payload["company_info"])
+    return {**payload, "company_info": company_info}
+
+
+@contextlib.contextmanager
+def _in_memory_repository(payload: dict, stored: list):
+    """Replaces the repository functions used by the Gemini use cases with in-memory versions."""
+    def gemini_evaluate_shift(company_id, first_day, last_day, include_submitted_shift=False):
+        evaluated = _fresh(payload)
+        by_user = {}
+        for entry in stored:
+            by_user.setdefault(entry["user_id"], []).append(entry)
+        evaluated["company_member"] = []
+        for member in payload["company_member"]:
+            member = {**member, "edit_shift": by_user.get(member["user_id"], [])}
+            if not include_submitted_shift:
+                member.pop("submitted_shift")
+            evaluated["company_member"].append(member)
+        evaluated["history_summary"] = {"periods": 0, "average_score": None, "members": [], "staffing_mix": [], "recent_evaluations": []}
+        return evaluated
+
+    replaced = [
+        (gemini_shift_repository, "gemini_create_shift", lambda company_id, first_day, last_day: _fresh(payload)),
+        (gemini_shift_repository, "gemini_evaluate_shift", gemini_evaluate_shift),
+        (edit_shift_repository, "gemini_delete_shift", lambda company_id, first_day, last_day: stored.clear()),
+        (edit_shift_repository, "insert_shift_request", lambda new_shifts: stored.extend(new_shifts))
+    ]
+    originals = [(registry, name, registry[name]) for registry, name, _ in replaced]
+    for registry, name, function in replaced:
+        registry[name] = function
+    try:
+        yield
+    finally:
+        for registry, name, function in originals:
+            registry[name] = function
+
+
+def _measure(function):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run_case(crew: int, days: int, latency: float, prompt_format: str, revisions: int) -> dict:
+    payload = make_company(crew, days)
+    first_day = FIRST_DAY.isoformat()
+    last_day = (FIRST_DAY + timedelta(days=days - 1)).isoformat()
+
+    request = _fresh(payload)
+    request["company_info"].update({
+        "open_time": "09:00:00",
+        "close_time": "22:00:00",
+        "first_day": first_day,
+        "last_day": last_day
+    })
+    request_json = json.dumps(request)
+
+    fake = FakeChatModel(latency_seconds=latency)
+    gemini_client.set_llm(fake)
+    shift_creator.llm_cache.clear()
+
+    with collect_request_spans() as loop_spans:
+        (_, loop_report), loop_seconds, loop_peak = _measure(lambda: shift_creator.shift_creator_run(
+            request_json,
+            numb_rate_revisions=revisions,
+            return_report=True,
+            prompt_format=prompt_format
+        ))
+    loop_llm = summarize_spans(loop_spans)
+    loop_calls = fake.calls
+
+    stored = []
+    with _in_memory_repository(payload, stored):
+        shift_creator.llm_cache.clear()
+        create = gemini_usecase["GeminiCreateShiftUseCase"](1, first_day, last_day, "", "gemini", prompt_format)
+        _, create_seconds, create_peak = _measure(create.execute)
+
+        evaluate = gemini_usecase["GeminiEvaluateShiftUseCase"](1, first_day, last_day, "local")
+        evaluation, evaluate_seconds, evaluate_peak = _measure(evaluate.execute)
+
+    return {
+        "crew": crew,
+        "days": days,
+        "prompt_format": prompt_format,
+        "prompt_chars": {"json": len(request_json), "compact": len(encode_shift_rules(request))},
+        "loop": {
+            "seconds": round(loop_seconds, 3),
+            "draft_seconds": round(loop_report["draft_seconds"], 3),
+            "eval_seconds": round(sum(r["eval_seconds"] or 0 for r in loop_report["rounds"]), 3),
+            "modify_seconds": round(sum(r["modify_seconds"] or 0 for r in loop_report["rounds"]), 3),
+            "rounds": len(loop_report["rounds"]),
+            "llm_calls": loop_calls,
+            "input_tokens": loop_llm["input_tokens"],
+            "output_tokens": loop_llm["output_tokens"],
+            "stop_reason": loop_report["stop_reason"],
+            "peak_mib": round(loop_peak / 2 ** 20, 2)
+        },
+        "create_usecase": {"seconds": round(create_seconds, 3), "shifts": len(stored), "peak_mib": round(create_peak / 2 ** 20, 2)},
+        "evaluate_usecase": {
+            "seconds": round(evaluate_seconds, 3),
+            "score": evaluation["quantitative_score"],
+            "peak_mib": round(evaluate_peak / 2 ** 20, 2)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crew", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 31])
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of fake latency per LLM call")
+    parser.add_argument("--prompt-format", choices=["json", "compact"], default="json")
+    parser.add_argument("--revisions", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per case")
+    args = parser.parse_args()
+
+    previous = gemini_client.set_llm(None)
+    # 合成データは希望の疎な小規模ケースも測るので，実行可能性チェックでは断らない
+    previous_ratio, shift_feasibility.MAX_UNCOVERED_RATIO = shift_feasibility.MAX_UNCOVERED_RATIO, 1.0
+    try:
+        for crew in args.crew:
+            for days in args.days:
+                result = run_case(crew, days, args.latency, args.prompt_format, args.revisions)
+                if args.json:
+                    print(json.dumps(result))
+                    continue
+                loop = result["loop"]
+                print(
+                    f"crew={crew:4d} days={days:3d} prompt={result['prompt_chars'][args.prompt_format]:8d} chars | "
+                    f"loop {loop['seconds']:7.3f}s (draft {loop['draft_seconds']:.3f}s, eval {loop['eval_seconds']:.3f}s, "
+                    f"modify {loop['modify_seconds']:.3f}s, {loop['rounds']} rounds, {loop['llm_calls']} calls, "
+                    f"{loop['input_tokens']}/{loop['output_tokens']} tokens, "
+                    f"{loop['peak_mib']:.1f} MiB) | create {result['create_usecase']['seconds']:.3f}s | "
+                    f"evaluate {result['evaluate_usecase']['seconds']:.3f}s"
+                )
+    finally:
+        gemini_client.set_llm(previous)
+        shift_feasibility.MAX_UNCOVERED_RATIO = previous_ratio
+
+
+if __name__ == "__main__":
+    main()
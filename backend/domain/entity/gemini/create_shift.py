@@ -1,15 +1,25 @@
 class CreateShiftEntity:
-    def __init__(self, company_id, first_day, last_day, comment):
+    def __init__(self, company_id, first_day, last_day, comment, engine='gemini', prompt_format='json', window_days=0, num_candidates=1, warm_start=False):
         self.company_id = company_id
         self.first_day = first_day
         self.last_day = last_day
         self.comment = comment
+        self.engine = engine
+        self.prompt_format = prompt_format
+        self.window_days = window_days
+        self.num_candidates = num_candidates
+        self.warm_start = warm_start
 
     def to_json(self):
         create_shift_entity_to_json = {
             "company_id": self.company_id,
             "first_day": self.first_day,
             "last_day": self.last_day,
-            "comment": self.comment
+            "comment": self.comment,
+            "engine": self.engine,
+            "prompt_format": self.prompt_format,
+            "window_days": self.window_days,
+            "num_candidates": self.num_candidates,
+            "warm_start": self.warm_start
         }
         return create_shift_entity_to_json
\ No newline at end of file
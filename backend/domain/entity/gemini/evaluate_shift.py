@@ -1,13 +1,17 @@
 class EvaluateShiftEntity:
-    def __init__(self, company_id, first_day, last_day):
+    def __init__(self, company_id, first_day, last_day, engine='gemini', prompt_format='json'):
         self.company_id = company_id
         self.first_day = first_day
         self.last_day = last_day
+        self.engine = engine
+        self.prompt_format = prompt_format
 
     def to_json(self):
         evaluate_shift_entity_to_json = {
             "company_id": self.company_id,
             "first_day": self.first_day,
-            "last_day": self.last_day
+            "last_day": self.last_day,
+            "engine": self.engine,
+            "prompt_format": self.prompt_format
         }
         return evaluate_shift_entity_to_json
\ No newline at end of file
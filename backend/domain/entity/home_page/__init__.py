@@ -1,5 +1,7 @@
 from .decision_shift import DecisionShiftEntity
+from .working_staff import WorkingStaffEntity
 
 home_page_entities = {
-    "DecisionShiftEntity": DecisionShiftEntity
+    "DecisionShiftEntity": DecisionShiftEntity,
+    "WorkingStaffEntity": WorkingStaffEntity
 }
\ No newline at end of file
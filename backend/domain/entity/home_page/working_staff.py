@@ -0,0 +1,17 @@
+class WorkingStaffEntity:
+    def __init__(self, company_id, day, start_time, finish_time, position):
+        self.company_id = company_id
+        self.day = day
+        self.start_time = start_time
+        self.finish_time = finish_time
+        self.position = position
+
+    def to_json(self):
+        working_staff_entity_to_json = {
+            "company_id": self.company_id,
+            "day": self.day,
+            "start_time": self.start_time,
+            "finish_time": self.finish_time,
+            "position": self.position
+        }
+        return working_staff_entity_to_json
\ No newline at end of file
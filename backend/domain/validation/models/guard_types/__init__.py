@@ -2,10 +2,12 @@ from .integer import IntegerType
 from .string import StringType
 from .date import DateType
 from .time import TimeType
+from .boolean import BooleanType
 
 type_models = {
     'IntegerType': IntegerType,
     'StringType': StringType,
     'DateType': DateType,
-    'TimeType': TimeType
+    'TimeType': TimeType,
+    'BooleanType': BooleanType
 }
\ No newline at end of file
@@ -0,0 +1,9 @@
+class BooleanType:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if not isinstance(self.value, bool):
+            raise TypeError('値は真偽値でなければなりません。')
+        
+        return self.value
\ No newline at end of file
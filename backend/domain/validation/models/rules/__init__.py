@@ -4,6 +4,13 @@ from .literal_post import LiteralPost
 from .literal_role import LiteralRole
 from .not_hyphen import NotHyphen
 from .literal_experience import LiteralExperience
+from .literal_engine import LiteralEngine
+from .literal_evaluate_engine import LiteralEvaluateEngine
+from .literal_prompt_format import LiteralPromptFormat
+from .not_negative import NotNegative
+from .positive import Positive
+from .max_num_candidates import MaxNumCandidates
+from .min_window_days import MinWindowDays
 
 rule_models = {
     'InAtmarkRule': InAtmarkRule,
@@ -11,5 +18,12 @@ rule_models = {
     'LiteralPost': LiteralPost,
     'LiteralRole': LiteralRole,
     'NotHyphen': NotHyphen,
-    'LiteralExperience': LiteralExperience
+    'LiteralExperience': LiteralExperience,
+    'LiteralEngine': LiteralEngine,
+    'LiteralEvaluateEngine': LiteralEvaluateEngine,
+    'LiteralPromptFormat': LiteralPromptFormat,
+    'NotNegative': NotNegative,
+    'Positive': Positive,
+    'MaxNumCandidates': MaxNumCandidates,
+    'MinWindowDays': MinWindowDays
 }
\ No newline at end of file
@@ -0,0 +1,9 @@
+class LiteralEngine:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value not in ['gemini', 'solver']:
+            raise ValueError('値は「gemini」または「solver」でなければなりません。')
+        
+        return self.value
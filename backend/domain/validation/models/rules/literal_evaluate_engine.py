@@ -0,0 +1,9 @@
+class LiteralEvaluateEngine:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value not in ['gemini', 'local']:
+            raise ValueError('値は「gemini」または「local」でなければなりません。')
+        
+        return self.value
\ No newline at end of file
@@ -0,0 +1,9 @@
+class LiteralPromptFormat:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value not in ['json', 'compact']:
+            raise ValueError('値は「json」または「compact」でなければなりません。')
+        
+        return self.value
@@ -0,0 +1,12 @@
+# Best-of-Nで一度に作れる候補数の上限（Geminiの呼び出しは候補数-1回増える）
+MAX_NUM_CANDIDATES = 8
+
+class MaxNumCandidates:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value > MAX_NUM_CANDIDATES:
+            raise ValueError(f'値は{MAX_NUM_CANDIDATES}以下でなければなりません。')
+        
+        return self.value
@@ -0,0 +1,12 @@
+# 分割するウィンドウの最短日数（0は分割しない．短いウィンドウほど境界での不整合とGemini呼び出しが増える）
+MIN_WINDOW_DAYS = 7
+
+class MinWindowDays:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value != 0 and self.value < MIN_WINDOW_DAYS:
+            raise ValueError(f'値は0（分割しない）または{MIN_WINDOW_DAYS}以上でなければなりません。')
+        
+        return self.value
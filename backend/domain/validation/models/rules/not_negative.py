@@ -0,0 +1,9 @@
+class NotNegative:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value < 0:
+            raise ValueError('値は0以上でなければなりません。')
+        
+        return self.value
@@ -0,0 +1,9 @@
+class Positive:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        if self.value < 1:
+            raise ValueError('値は1以上でなければなりません。')
+        
+        return self.value
@@ -0,0 +1,15 @@
+from .engine import EngineValidation
+from .evaluate_engine import EvaluateEngineValidation
+from .prompt_format import PromptFormatValidation
+from .window_days import WindowDaysValidation
+from .num_candidates import NumCandidatesValidation
+from .warm_start import WarmStartValidation
+
+gemini_validation = {
+    'EngineValidation': EngineValidation,
+    'EvaluateEngineValidation': EvaluateEngineValidation,
+    'PromptFormatValidation': PromptFormatValidation,
+    'WindowDaysValidation': WindowDaysValidation,
+    'NumCandidatesValidation': NumCandidatesValidation,
+    'WarmStartValidation': WarmStartValidation
+}
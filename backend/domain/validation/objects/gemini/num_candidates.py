@@ -0,0 +1,13 @@
+from ...models.guard_types import type_models
+from ...models.rules import rule_models
+
+class NumCandidatesValidation:
+    def __init__(self, value: int):
+        self.value = value
+    
+    def execute(self):
+        type_validated_value = type_models['IntegerType'](self.value).execute()
+        validated_value = rule_models['Positive'](type_validated_value).execute()
+        validated_value = rule_models['MaxNumCandidates'](validated_value).execute()
+        
+        return validated_value
\ No newline at end of file
@@ -0,0 +1,10 @@
+from ...models.guard_types import type_models
+
+class WarmStartValidation:
+    def __init__(self, value: bool):
+        self.value = value
+    
+    def execute(self):
+        validated_value = type_models['BooleanType'](self.value).execute()
+        
+        return validated_value
\ No newline at end of file
@@ -1,5 +1,9 @@
+import os
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from .routes import (
     auth_router,
     company_info_router,
@@ -9,8 +13,19 @@ from .routes import (
     home_page_router,
     owner_shift_router
 )
+from .app.service.agent.module.gemini_client import warm_up_gemini_client
+from .app.service.agent.module.llm_metrics import collect_request_spans, summarize_spans
 
-app = FastAPI()
+request_logger = logging.getLogger("shift_agent.request")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # GEMINI_WARM_UP=1 のときだけ起動時にGeminiクライアントを作っておく（既定は初回リクエスト時）
+    if os.getenv("GEMINI_WARM_UP") == "1":
+        await run_in_threadpool(warm_up_gemini_client)
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:8080",
@@ -28,6 +43,17 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+@app.middleware("http")
+async def log_gemini_calls(request, call_next):
+    # リクエスト中のGemini呼び出し（回数・トークン・待ち時間・再試行）をリクエストログに残す
+    with collect_request_spans() as spans:
+        response = await call_next(request)
+    if spans:
+        summary = summarize_spans(spans)
+        request_logger.info("%s %s %s gemini=%s", request.method, request.url.path, response.status_code, summary)
+        response.headers["Server-Timing"] = f'gemini;dur={summary["latency_seconds"] * 1000:.0f};desc="{summary["calls"]} calls"'
+    return response
+
 app.include_router(auth_router)
 app.include_router(company_info_router)
 app.include_router(crew_info_router)
@@ -1,8 +1,14 @@
+from functools import partial
+
 from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
 from ..app.usecase.gemini import gemini_usecase
 from ..app.service.auth import auth_services
+from ..app.service.job import job_services
+from ..app.service.agent.module.llm_metrics import llm_metrics
+from ..app.service.agent.module.shift_feasibility import ShiftInfeasibleError
 
 app = APIRouter()
 
@@ -12,7 +18,73 @@ async def gemini_create_shift(request: Request, response: Response):
         auth_services['verify_and_refresh_token'](request, response, required_role="owner")
 
         request_body = await request.json()
-        gemini_usecase['GeminiCreateShiftUseCase'](request_body['company_id'], request_body['first_day'], request_body['last_day'], request_body['comment']).execute()
+        create_shift_usecase = gemini_usecase['GeminiCreateShiftUseCase'](
+            request_body['company_id'],
+            request_body['first_day'],
+            request_body['last_day'],
+            request_body['comment'],
+            request_body.get('engine', 'gemini'),
+            request_body.get('prompt_format', 'json'),
+            request_body.get('window_days', 0),
+            request_body.get('num_candidates', 1),
+            request_body.get('warm_start', False)
+        )
+        await create_shift_usecase.aexecute()
+
+    except HTTPException as e:
+        raise e
+
+    except ShiftInfeasibleError as e:
+        raise HTTPException(status_code=422, detail=e.report.model_dump())
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post('/gemini-create-shift-job')
+async def submit_gemini_create_shift_job(request: Request, response: Response):
+    try:
+        auth_services['verify_and_refresh_token'](request, response, required_role="owner")
+
+        request_body = await request.json()
+        create_shift_usecase = gemini_usecase['GeminiCreateShiftUseCase'](
+            request_body['company_id'],
+            request_body['first_day'],
+            request_body['last_day'],
+            request_body['comment'],
+            request_body.get('engine', 'gemini'),
+            request_body.get('prompt_format', 'json'),
+            request_body.get('window_days', 0),
+            request_body.get('num_candidates', 1),
+            request_body.get('warm_start', False)
+        )
+        # 入力の誤りや実行不能な期間は，ジョブを積む前に同期APIと同じステータスで返す
+        prepared = await run_in_threadpool(create_shift_usecase.prepare)
+        job_id = job_services['submit_job'](
+            'gemini_create_shift',
+            request_body['company_id'],
+            partial(create_shift_usecase.execute, prepared=prepared),
+            dedupe_key=('gemini_create_shift', request_body['company_id'], request_body['first_day'], request_body['last_day'])
+        )
+        return {'job_id': job_id}
+
+    except HTTPException as e:
+        raise e
+
+    except ShiftInfeasibleError as e:
+        raise HTTPException(status_code=422, detail=e.report.model_dump())
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get('/gemini-create-shift-job')
+def get_gemini_create_shift_job(job_id, company_id, request: Request, response: Response):
+    try:
+        auth_services['verify_and_refresh_token'](request, response, required_role="owner")
+
+        job = job_services['get_job'](job_id, company_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
 
     except HTTPException as e:
         raise e
@@ -26,11 +98,33 @@ async def gemini_evaluate_shift(request: Request, response: Response):
         auth_services['verify_and_refresh_token'](request, response, required_role="owner")
 
         request_body = await request.json()
-        response_value = gemini_usecase['GeminiEvaluateShiftUseCase'](request_body['company_id'], request_body['first_day'], request_body['last_day']).execute()
+        evaluate_shift_usecase = gemini_usecase['GeminiEvaluateShiftUseCase'](
+            request_body['company_id'],
+            request_body['first_day'],
+            request_body['last_day'],
+            request_body.get('engine', 'gemini'),
+            request_body.get('phrase_feedback', False),
+            request_body.get('prompt_format', 'json')
+        )
+        response_value = await run_in_threadpool(evaluate_shift_usecase.execute)
         return response_value
 
     except HTTPException as e:
         raise e
     
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+@app.get('/gemini-metrics')
+def get_gemini_metrics(request: Request, response: Response, format: str = 'json'):
+    try:
+        auth_services['verify_and_refresh_token'](request, response, required_role="owner")
+
+        if format == 'prometheus':
+            return PlainTextResponse(llm_metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+        return llm_metrics.snapshot()
+
+    except HTTPException as e:
+        raise e
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -17,5 +17,19 @@ def get_decision_shift(company_id, request: Request, response: Response):
     except HTTPException as e:
         raise e
     
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get('/working-staff')
+def get_working_staff(company_id, day, start_time, request: Request, response: Response, finish_time: str = None, position: str = None):
+    try:
+        auth_services['verify_and_refresh_token'](request, response)
+
+        response_values = home_page_usecase['GetWorkingStaffUseCase'](company_id, day, start_time, finish_time, position).execute()
+        return response_values
+
+    except HTTPException as e:
+        raise e
+
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
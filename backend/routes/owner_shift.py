@@ -26,26 +26,64 @@ async def edit_shift(request: Request, response: Response):
         auth_services['verify_and_refresh_token'](request, response, required_role="owner")
 
         request_body = await request.json()
-        owner_shift_usecase['EditShiftUseCase'](
+        response_values = owner_shift_usecase['EditShiftUseCase'](
             request_body['company_id'],
             request_body['add_edit_shift'],
             request_body['update_edit_shift'],
             request_body['delete_edit_shift']
         ).execute()
+        return response_values
     
     except HTTPException as e:
         raise e
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    
+
+@app.get('/edit-shift-score')
+def get_shift_score(company_id, first_day, last_day, request: Request, response: Response):
+    try:
+        auth_services['verify_and_refresh_token'](request, response, required_role="owner")
+
+        response_values = owner_shift_usecase['GetShiftScoreUseCase'](company_id, first_day, last_day).execute()
+        return response_values
+
+    except HTTPException as e:
+        raise e
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post('/edit-shift-simulate')
+async def simulate_edit_shift(request: Request, response: Response):
+    try:
+        auth_services['verify_and_refresh_token'](request, response, required_role="owner")
+
+        request_body = await request.json()
+        response_values = owner_shift_usecase['SimulateEditShiftUseCase'](
+            request_body['company_id'],
+            request_body['add_edit_shift'],
+            request_body['update_edit_shift'],
+            request_body['delete_edit_shift'],
+            request_body.get('first_day'),
+            request_body.get('last_day')
+        ).execute()
+        return response_values
+
+    except HTTPException as e:
+        raise e
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post('/complete_edit_shift')
 async def complete_shift(request: Request, response: Response):
     try:
         auth_services['verify_and_refresh_token'](request, response, required_role="owner")
 
         request_body = await request.json()
-        owner_shift_usecase['CompleteShiftUseCase'](request_body['company_id']).execute()
+        response_values = owner_shift_usecase['CompleteShiftUseCase'](request_body['company_id']).execute()
+        return response_values
 
     except HTTPException as e:
         raise e
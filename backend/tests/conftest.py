@@ -0,0 +1,165 @@
+"""
+Shared fixtures of the backend tests.
+
+Run from the repository root (the app is imported as the `backend` package):
+    python -m pytest backend/tests
+"""
+import contextlib
+import io
+import random
+import sys
+from datetime import date, time, timedelta
+from pathlib import Path
+
+import pytest
+import sqlalchemy
+
+# リポジトリのルートをパスに入れ，アプリと同じく backend.app... で読み込む
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.app.repository.db import db_init  # noqa: E402
+from backend.app.repository.db.migrations import upgrade  # noqa: E402
+from backend.app.repository.db.models import EditShift  # noqa: E402
+from backend.app.service.agent.module import gemini_client, shift_creator  # noqa: E402
+from backend.app.service.agent.module.fake_llm import FakeChatModel  # noqa: E402
+from backend.app.service.agent.module.llm_cache import LLMResponseCache  # noqa: E402
+
+POSITIONS = ["hall", "kitchen", "cashier"]
+FIRST_DAY = date(2030, 7, 1)
+# day_shift_rules の営業日
+SHIFT_DAY = "2030-07-02"
+
+
+def _build_shift_rules(members: int = 20, days: int = 14, seed: int = 0, labor_cost: int = 3_000_000):
+    rng = random.Random(seed)
+    company_member = []
+    for user_id in range(1, members + 1):
+        submitted_shift = []
+        for d in range(days):
+            if rng.random() < 0.5:
+                start = rng.choice([9, 10, 11, 12, 13, 14, 17])
+                finish = min(start + rng.choice([4, 5, 6, 8]), 23)
+                submitted_shift.append({
+                    "edit_shift_id": user_id * 100 + d,
+                    "day": (FIRST_DAY + timedelta(days=d)).isoformat(),
+                    "start_time": f"{start:02d}:00:00",
+                    "finish_time": f"{finish:02d}:00:00"
+                })
+        company_member.append({
+            "user_id": user_id,
+            "name": f"user-{user_id}",
+            "evaluate": 3,
+            "position": POSITIONS[user_id % len(POSITIONS)],
+            "experience": "veteran",
+            "hour_pay": 1000 + rng.randint(0, 500),
+            "submitted_shift": submitted_shift
+        })
+    first_day = FIRST_DAY.isoformat()
+    last_day = (FIRST_DAY + timedelta(days=days - 1)).isoformat()
+    company_info = {
+        "company_id": 1,
+        "open_time": "09:00:00",
+        "close_time": "22:00:00",
+        "rest_day": [(FIRST_DAY + timedelta(days=d)).isoformat() for d in range(0, days, 7)],
+        "labor_cost": labor_cost,
+        "comment": "",
+        "first_day": first_day,
+        "last_day": last_day
+    }
+    return {"company_info": company_info, "company_member": company_member}, first_day, last_day
+
+
+@pytest.fixture
+def make_shift_rules():
+    """
+    Builds a synthetic gemini_create_shift payload: members with random submitted shifts from
+    2030-07-01, open 09:00-22:00 with a rest day every 7 days. Returns (rules, first_day, last_day).
+    """
+    return _build_shift_rules
+
+
+@pytest.fixture
+def day_shift_rules():
+    """One working day (SHIFT_DAY, 10:00-14:00) with a hall and a kitchen member who both want all of it."""
+    return {
+        "company_info": {"company_id": 1, "open_time": "10:00:00", "close_time": "14:00:00", "rest_day": [], "labor_cost": 100_000},
+        "company_member": [
+            {"user_id": 1, "position": "hall", "hour_pay": 1000, "submitted_shift": [{"day": SHIFT_DAY, "start_time": "10:00:00", "finish_time": "14:00:00"}]},
+            {"user_id": 2, "position": "kitchen", "hour_pay": 1200, "submitted_shift": [{"day": SHIFT_DAY, "start_time": "10:00:00", "finish_time": "14:00:00"}]},
+        ]
+    }
+
+
+@pytest.fixture
+def shift_day():
+    return SHIFT_DAY
+
+
+@pytest.fixture
+def make_shift():
+    """Builds an edit_shift entry of company 1, on SHIFT_DAY from 10:00 to 14:00 unless overridden."""
+    def make(user_id, day=SHIFT_DAY, start_time="10:00:00", finish_time="14:00:00", **fields):
+        return dict({"user_id": user_id, "company_id": 1, "day": day, "start_time": start_time, "finish_time": finish_time}, **fields)
+    return make
+
+
+@pytest.fixture
+def engine():
+    """An in-memory SQLite database migrated to the latest version, used by get_session_scope()."""
+    previous = db_init.engine, db_init.Session
+    # ルートはスレッドプールからDBを使うので，1つのインメモリ接続を複数スレッドで共有する
+    engine = sqlalchemy.create_engine(
+        "sqlite://",
+        poolclass=sqlalchemy.pool.StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    db_init.engine, db_init.Session = engine, None
+    with contextlib.redirect_stdout(io.StringIO()):
+        upgrade(engine)
+    yield engine
+    db_init.engine, db_init.Session = previous
+    engine.dispose()
+
+
+@pytest.fixture
+def fake_llm():
+    """Routes every Gemini call to FakeChatModel, with the response cache disabled."""
+    fake = FakeChatModel()
+    previous_llm = gemini_client.set_llm(fake)
+    previous_cache = shift_creator.llm_cache
+    shift_creator.llm_cache = LLMResponseCache(max_entries=0)
+    yield fake
+    shift_creator.llm_cache = previous_cache
+    gemini_client.set_llm(previous_llm)
+
+
+@pytest.fixture
+def future_shift():
+    """Builds a shift of the request format days after today (insert_shift_request only keeps future days)."""
+    def make(user_id, company_id=1, days=1, start_time="09:00:00", finish_time="17:00:00"):
+        return {
+            "user_id": user_id,
+            "company_id": company_id,
+            "day": (date.today() + timedelta(days=days)).isoformat(),
+            "start_time": start_time,
+            "finish_time": finish_time
+        }
+    return make
+
+
+@pytest.fixture
+def count_rows(engine):
+    def count(model, *conditions):
+        with engine.connect() as connection:
+            return connection.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(model).where(*conditions)).scalar()
+    return count
+
+
+@pytest.fixture
+def edit_shift_times(engine):
+    def times(edit_shift_id) -> tuple[time, time]:
+        with engine.connect() as connection:
+            return tuple(connection.execute(
+                sqlalchemy.select(EditShift.start_time, EditShift.finish_time).where(EditShift.edit_shift_id == edit_shift_id)
+            ).one())
+    return times
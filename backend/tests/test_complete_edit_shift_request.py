@@ -0,0 +1,47 @@
+import importlib
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.db.models import DecisionShift, EditShift
+
+complete_edit_shift_request_module = importlib.import_module("backend.app.repository.crud.edit_shift.complete_edit_shift_request")
+
+
+def _insert_edit_shifts(engine, shifts):
+    with engine.begin() as connection:
+        connection.execute(insert(EditShift), [
+            dict(
+                s,
+                day=date.fromisoformat(s["day"]),
+                start_time=time.fromisoformat(s["start_time"]),
+                finish_time=time.fromisoformat(s["finish_time"])
+            )
+            for s in shifts
+        ])
+
+
+@pytest.mark.parametrize("dialect_insert", ["on_conflict", "select_then_insert"])
+def test_finalize_inserts_each_future_shift_once(engine, monkeypatch, future_shift, count_rows, dialect_insert):
+    if dialect_insert == "select_then_insert":
+        # RETURNINGもON CONFLICTも無い方言の経路
+        monkeypatch.setattr(complete_edit_shift_request_module, "_insert", lambda dialect_name: None)
+    shifts = [future_shift(1), future_shift(1), future_shift(2, days=3), future_shift(3, company_id=2)]
+    _insert_edit_shifts(engine, shifts + [future_shift(1, days=-1)])
+
+    finalized = edit_shift_repository['complete_edit_shift_request'](1)
+    assert sorted((s["user_id"], s["day"]) for s in finalized["decision_shift"]) == [(1, shifts[0]["day"]), (2, shifts[2]["day"])]
+    assert (finalized["first_day"], finalized["last_day"]) == (shifts[0]["day"], shifts[2]["day"])
+    assert count_rows(DecisionShift) == 2
+
+    # 確定済みの行は再び確定しないが，期間は返す
+    again = edit_shift_repository['complete_edit_shift_request'](1)
+    assert again["decision_shift"] == []
+    assert (again["first_day"], again["last_day"]) == (shifts[0]["day"], shifts[2]["day"])
+    assert count_rows(DecisionShift) == 2
+
+
+def test_finalize_without_future_shifts(engine):
+    assert edit_shift_repository['complete_edit_shift_request'](1) == {"decision_shift": [], "first_day": None, "last_day": None}
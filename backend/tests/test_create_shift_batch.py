@@ -0,0 +1,69 @@
+import json
+
+from backend.app.service.agent.module.shift_feasibility import ShiftInfeasibleError
+from backend.app.service.agent.module.shift_models import ShiftFeasibilityReport
+from backend.batch import create_shift_batch
+from backend.batch.create_shift_batch import _load_checkpoint, _run_company, _summarize
+
+OPTIONS = {
+    "comment": "",
+    "engine": "local",
+    "prompt_format": "json",
+    "window_days": None,
+    "num_candidates": 1,
+    "warm_start": False
+}
+
+
+def test_checkpoint_keeps_completed_companies_of_the_period(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    records = [
+        {"company_id": 1, "first_day": "2030-07-01", "last_day": "2030-07-31", "status": "completed"},
+        {"company_id": 2, "first_day": "2030-07-01", "last_day": "2030-07-31", "status": "failed"},
+        {"company_id": 3, "first_day": "2030-08-01", "last_day": "2030-08-31", "status": "completed"}
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n", encoding="utf-8")
+
+    assert list(_load_checkpoint(str(path), "2030-07-01", "2030-07-31")) == [1]
+    assert _load_checkpoint(str(tmp_path / "missing.jsonl"), "2030-07-01", "2030-07-31") == {}
+
+
+def test_summary_counts_statuses_and_averages_scores():
+    summary = _summarize([
+        {"company_id": 2, "status": "completed", "score": 80, "seconds": 1.0},
+        {"company_id": 1, "status": "completed", "score": 90, "seconds": 2.0},
+        {"company_id": 3, "status": "failed", "seconds": 0.5}
+    ], 2.5)
+    assert summary["by_status"] == {"completed": 2, "failed": 1}
+    assert summary["average_score"] == 85.0
+    assert summary["company_seconds_total"] == 3.5
+    assert [r["company_id"] for r in summary["results"]] == [1, 2, 3]
+
+
+def test_run_company_never_raises(monkeypatch):
+    class Failing:
+        def __init__(self, *args):
+            pass
+
+        def execute(self):
+            raise RuntimeError("db down")
+
+    monkeypatch.setitem(create_shift_batch.gemini_usecase, "GeminiCreateShiftUseCase", Failing)
+    result = _run_company(1, "2030-07-01", "2030-07-31", OPTIONS)
+    assert (result["status"], result["error"]) == ("failed", "RuntimeError: db down")
+
+    class Infeasible(Failing):
+        def execute(self):
+            raise ShiftInfeasibleError(ShiftFeasibilityReport(
+                feasible=False,
+                reasons=["人手が足りません"],
+                submitted_shift_count=0,
+                uncovered_slot_count=4,
+                uncovered_ratio=1.0,
+                min_labor_cost=0
+            ))
+
+    monkeypatch.setitem(create_shift_batch.gemini_usecase, "GeminiCreateShiftUseCase", Infeasible)
+    result = _run_company(1, "2030-07-01", "2030-07-31", OPTIONS)
+    assert result["status"] == "infeasible"
+    assert result["report"]["reasons"] == ["人手が足りません"]
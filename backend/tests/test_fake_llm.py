@@ -0,0 +1,43 @@
+import json
+
+from langchain_core.messages import AIMessage
+
+from backend.app.service.agent.module import shift_creator
+from backend.app.service.agent.module.fake_llm import FakeChatModel, RecordingChatModel
+from backend.app.service.agent.module.gemini_client import GEMINI_MODEL
+from backend.app.service.agent.module.shift_evaluator import evaluate_shift_schedule
+
+
+def _messages(system_instruction, user_content):
+    return [("system", system_instruction), ("human", user_content)]
+
+
+def test_draft_and_evaluation_are_synthesized_locally(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=8, days=7, seed=1)
+    fake = FakeChatModel()
+
+    draft = fake.invoke(_messages(shift_creator.CREATE_SHIFT_DRAFT_INSTRUCTION, json.dumps(rules))).content
+    edit_shift = json.loads(draft)["edit_shift"]
+    assert edit_shift
+
+    evaluation = fake.invoke(_messages(
+        shift_creator.EVAL_SHIFT_INSTRUCTION,
+        shift_creator._eval_user_content(json.dumps({"employee_preferences": json.dumps(rules), "shift_draft": draft}))
+    )).content
+    assert json.loads(evaluation)["quantitative_score"] == evaluate_shift_schedule(rules, edit_shift, first_day, last_day).quantitative_score
+    assert fake.calls == 2
+
+
+def test_recorded_responses_are_replayed(tmp_path):
+    record_path = str(tmp_path / "gemini.jsonl")
+
+    class Answer:
+        def invoke(self, messages):
+            return AIMessage(content="recorded answer")
+
+    recorder = RecordingChatModel(Answer(), record_path, GEMINI_MODEL)
+    assert recorder.invoke(_messages("system", "user")).content == "recorded answer"
+
+    replay = FakeChatModel(replay_path=record_path)
+    assert replay.invoke(_messages("system", "user")).content == "recorded answer"
+    assert replay.invoke(_messages("system", "other")).content == ""
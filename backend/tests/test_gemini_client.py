@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from backend.app.service.agent.module import gemini_client
+from backend.app.service.agent.module.fake_llm import FakeChatModel
+
+
+def test_set_llm_returns_the_previous_model(fake_llm):
+    other = FakeChatModel()
+    assert gemini_client.set_llm(other) is fake_llm
+    assert gemini_client.get_llm() is other
+    assert asyncio.run(gemini_client.aget_llm()) is other
+
+
+def test_llm_is_built_once_on_first_use(fake_llm, monkeypatch):
+    builds = []
+
+    def build_llm():
+        builds.append(1)
+        return FakeChatModel()
+
+    monkeypatch.setattr(gemini_client, "_build_llm", build_llm)
+    gemini_client.set_llm(None)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(gemini_client.get_llm())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_fake_backend_is_selected_by_the_environment(fake_llm, monkeypatch):
+    monkeypatch.setattr(gemini_client, "GEMINI_BACKEND", "fake")
+    gemini_client.set_llm(None)
+    assert isinstance(gemini_client.get_llm(), FakeChatModel)
@@ -0,0 +1,69 @@
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend.app.repository.db.models import Company, EditShift, SubmittedShift, UserProfile
+from backend.app.service.auth import auth_services
+from backend.app.service.job import job_services
+from backend.routes.gemini import app as gemini_router
+
+DAY = date(2030, 7, 1)
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setitem(auth_services, 'verify_and_refresh_token', lambda request, response, required_role=None: None)
+    with engine.begin() as connection:
+        connection.execute(insert(Company), [{
+            "company_id": 1, "company_name": "company-1", "open_time": time(9), "close_time": time(17), "labor_cost": 100_000
+        }])
+        connection.execute(insert(UserProfile), [{"user_id": 1, "company_id": 1, "position": "hall", "experience": "veteran", "hour_pay": 1000}])
+    app = FastAPI()
+    app.include_router(gemini_router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def submitted_jobs(monkeypatch):
+    jobs = []
+
+    def submit_job(kind, company_id, task, dedupe_key=None):
+        jobs.append(task)
+        return f"job-{len(jobs)}"
+
+    monkeypatch.setitem(job_services, 'submit_job', submit_job)
+    return jobs
+
+
+def _body(**fields):
+    return dict({"company_id": 1, "first_day": DAY.isoformat(), "last_day": DAY.isoformat(), "comment": "", "engine": "solver"}, **fields)
+
+
+def test_invalid_request_is_refused_before_it_is_queued(client, submitted_jobs):
+    response = client.post('/gemini-create-shift-job', json=_body(window_days=3))
+    assert response.status_code == 400
+    assert client.post('/gemini-create-shift-job', json=_body(first_day="2030-13-01")).status_code == 400
+    assert submitted_jobs == []
+
+
+def test_infeasible_period_is_refused_like_the_synchronous_route(client, submitted_jobs):
+    response = client.post('/gemini-create-shift-job', json=_body())
+    assert response.status_code == 422
+    assert response.json()["detail"]["reasons"] == client.post('/gemini-create-shift', json=_body()).json()["detail"]["reasons"]
+    assert submitted_jobs == []
+
+
+def test_queued_job_starts_from_the_prepared_rules(client, submitted_jobs, engine, count_rows):
+    with engine.begin() as connection:
+        connection.execute(insert(SubmittedShift), [{"user_id": 1, "company_id": 1, "day": DAY, "start_time": time(9), "finish_time": time(17)}])
+
+    response = client.post('/gemini-create-shift-job', json=_body())
+    assert response.json() == {"job_id": "job-1"}
+
+    stages = []
+    assert submitted_jobs[0](lambda stage, **detail: stages.append(stage)) == {"shift_count": 1}
+    assert stages[0] == 'loaded' and 'infeasible' not in stages
+    assert count_rows(EditShift) == 1
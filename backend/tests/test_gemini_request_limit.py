@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from backend.app.service.agent.module import gemini_client, shift_creator
+from backend.app.service.agent.module.gemini_request_limit import GeminiRequestLimit
+
+
+def test_limit_is_shared_by_threads_and_coroutines():
+    limit = GeminiRequestLimit(2)
+    assert limit.acquire() and limit.acquire()
+    assert not limit.acquire(blocking=False)
+    assert not limit.acquire(timeout=0.01)
+
+    async def wait_for_slot():
+        waiter = asyncio.create_task(limit.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        threading.Thread(target=limit.release).start()
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(wait_for_slot())
+    limit.release()
+    limit.release()
+    with pytest.raises(ValueError):
+        limit.release()
+
+
+class _SlowChatModel:
+    """Counts the requests in flight at once."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return AIMessage(content=messages[1][1])
+
+
+def test_async_calls_respect_the_request_limit(fake_llm):
+    llm = _SlowChatModel()
+    gemini_client.set_llm(llm)
+    shift_creator.set_gemini_request_limit(GeminiRequestLimit(2))
+    try:
+        async def fan_out():
+            return await asyncio.gather(*(shift_creator.acall_gemini_model("system", f"request {i}") for i in range(6)))
+
+        assert asyncio.run(fan_out()) == [f"request {i}" for i in range(6)]
+    finally:
+        shift_creator.set_gemini_request_limit(None)
+    assert llm.max_in_flight == 2
@@ -0,0 +1,33 @@
+from datetime import time
+
+from sqlalchemy import select
+
+from backend.app.repository.crud.crew_submitted_shift import crew_submitted_shift_repository
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.db.models import EditShift, SubmittedShift
+
+
+def test_insert_returns_the_ids_in_input_order_and_skips_past_days(engine, future_shift):
+    shifts = [future_shift(user_id, days=user_id) for user_id in (3, 1, 2)]
+    inserted = edit_shift_repository['insert_shift_request'](shifts + [future_shift(4, days=-1)])
+
+    assert [s["user_id"] for s in inserted] == [3, 1, 2]
+    with engine.connect() as connection:
+        stored = dict(connection.execute(select(EditShift.edit_shift_id, EditShift.user_id)).all())
+    assert {s["edit_shift_id"]: s["user_id"] for s in inserted} == stored
+    assert edit_shift_repository['insert_shift_request']([future_shift(4, days=-1)]) == []
+
+
+def test_submitted_shifts_are_inserted_into_both_tables(engine, future_shift, count_rows):
+    result = crew_submitted_shift_repository['submitted_shift_request']([future_shift(1), future_shift(2, days=2)])
+    assert len(result["submitted_shift_ids"]) == len(result["edit_shift_ids"]) == 2
+    assert count_rows(SubmittedShift) == count_rows(EditShift) == 2
+    assert crew_submitted_shift_repository['submitted_shift_request']([]) == {"submitted_shift_ids": [], "edit_shift_ids": []}
+
+
+def test_single_digit_hours_are_accepted(engine, future_shift, edit_shift_times):
+    inserted = edit_shift_repository['insert_shift_request']([future_shift(1, start_time="9:00:00", finish_time="17:00:00")])
+    assert edit_shift_times(inserted[0]["edit_shift_id"]) == (time(9), time(17))
+
+    result = crew_submitted_shift_repository['submitted_shift_request']([future_shift(2, start_time="9:30:00", finish_time="13:00:00")])
+    assert edit_shift_times(result["edit_shift_ids"][0]) == (time(9, 30), time(13))
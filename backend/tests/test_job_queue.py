@@ -0,0 +1,58 @@
+import threading
+import time
+
+from backend.app.service.job.job_queue import get_job, submit_job
+
+
+def _wait(job_id, company_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id, company_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_reports_progress_and_result():
+    def task(report_progress):
+        report_progress("draft", round=0)
+        return {"shift_count": 3}
+
+    job_id = submit_job("test", 1, task)
+    job = _wait(job_id, 1)
+    assert job["status"] == "completed"
+    assert job["result"] == {"shift_count": 3}
+    assert [(p["stage"], p["round"]) for p in job["progress"]] == [("draft", 0)]
+    assert job["stage"] == "draft"
+
+
+def test_failed_job_keeps_the_error():
+    def task(report_progress):
+        raise ValueError("入力が不正です")
+
+    job = _wait(submit_job("test", 1, task), 1)
+    assert (job["status"], job["error"]) == ("failed", "入力が不正です")
+
+
+def test_job_is_only_visible_to_its_company():
+    job_id = submit_job("test", 1, lambda report_progress: None)
+    _wait(job_id, 1)
+    assert get_job(job_id, 2) is None
+    assert get_job("unknown", 1) is None
+
+
+def test_running_job_is_deduplicated():
+    release = threading.Event()
+
+    def task(report_progress):
+        release.wait(5)
+
+    key = ("test", 1, "2030-07-01", "2030-07-31")
+    job_id = submit_job("test", 1, task, dedupe_key=key)
+    assert submit_job("test", 1, task, dedupe_key=key) == job_id
+    release.set()
+    _wait(job_id, 1)
+    second = submit_job("test", 1, lambda report_progress: None, dedupe_key=key)
+    assert second != job_id
+    _wait(second, 1)
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from backend.app.service.agent.module import shift_creator
+from backend.app.service.agent.module.llm_cache import LLMResponseCache
+
+
+def test_key_depends_on_model_instruction_and_content():
+    key = LLMResponseCache.make_key("model", "system", "user")
+    assert key == LLMResponseCache.make_key("model", "system", "user")
+    assert len({
+        key,
+        LLMResponseCache.make_key("other", "system", "user"),
+        LLMResponseCache.make_key("model", "other", "user"),
+        LLMResponseCache.make_key("model", "system", "other"),
+    }) == 4
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LLMResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.stats() == {"hits": 3, "disk_hits": 0, "misses": 1, "memory_entries": 2}
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.app.service.agent.module.llm_cache.time.time", lambda: now[0])
+    cache = LLMResponseCache(ttl_seconds=10)
+    cache.set("a", "1")
+    now[0] += 10
+    assert cache.get("a") == "1"
+    now[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_sqlite_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    LLMResponseCache(sqlite_path=path).set("a", "1")
+
+    cache = LLMResponseCache(max_entries=0, sqlite_path=path)
+    assert cache.get("a") == "1"
+    assert cache.stats()["disk_hits"] == 1
+    cache.clear()
+    assert LLMResponseCache(sqlite_path=path).get("a") is None
+
+
+def test_repeated_prompts_are_served_from_the_cache(fake_llm, make_shift_rules):
+    shift_creator.llm_cache = LLMResponseCache()
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    system_instruction = shift_creator.CREATE_SHIFT_DRAFT_INSTRUCTION
+    payload = json.dumps(rules)
+
+    first = shift_creator.call_gemini_model(system_instruction, payload)
+    assert fake_llm.calls == 1
+    assert shift_creator.call_gemini_model(system_instruction, payload) == first
+    assert asyncio.run(shift_creator.acall_gemini_model(system_instruction, payload)) == first
+    assert fake_llm.calls == 1
+    shift_creator.call_gemini_model(system_instruction, payload + " ")
+    assert fake_llm.calls == 2
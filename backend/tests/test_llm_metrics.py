@@ -0,0 +1,59 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from backend.app.service.agent.module import gemini_client, shift_creator
+from backend.app.service.agent.module.llm_cache import LLMResponseCache
+from backend.app.service.agent.module.llm_metrics import (
+    collect_request_spans,
+    llm_call_context,
+    llm_metrics,
+    summarize_spans
+)
+
+
+@pytest.fixture
+def metrics(fake_llm):
+    llm_metrics.reset()
+    yield llm_metrics
+    llm_metrics.reset()
+
+
+def test_spans_are_tagged_with_the_company(metrics, monkeypatch):
+    monkeypatch.setattr(shift_creator, "llm_cache", LLMResponseCache(max_entries=8))
+    with llm_call_context(company_id=7), collect_request_spans() as spans:
+        shift_creator.call_gemini_model("system", "user", "eval_shift_tool")
+        shift_creator.call_gemini_model("system", "user", "eval_shift_tool")
+
+    assert [s["company_id"] for s in spans] == [7, 7]
+    assert [s["cached"] for s in spans] == [False, True]
+    summary = summarize_spans(spans)
+    assert (summary["calls"], summary["cache_hits"], summary["errors"]) == (2, 1, 0)
+    assert spans[1]["input_tokens"] == 0
+
+    tools = metrics.snapshot()["tools"]
+    assert (tools["eval_shift_tool"]["calls"], tools["eval_shift_tool"]["cache_hits"]) == (2, 1)
+    assert 'gemini_calls_total{tool="eval_shift_tool"} 2' in metrics.to_prometheus()
+
+
+def test_retries_and_errors_are_counted(metrics, monkeypatch):
+    class FlakyChatModel:
+        def __init__(self, failures):
+            self.failures = failures
+
+        def invoke(self, messages):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("unavailable")
+            return AIMessage(content="ok")
+
+    monkeypatch.setattr(shift_creator, "GEMINI_RETRY_BACKOFF_SECONDS", 0)
+    gemini_client.set_llm(FlakyChatModel(failures=1))
+    with collect_request_spans() as spans:
+        assert shift_creator.call_gemini_model("system", "user") == "ok"
+    assert (spans[0]["retries"], spans[0]["error"]) == (1, None)
+
+    gemini_client.set_llm(FlakyChatModel(failures=shift_creator.GEMINI_MAX_RETRIES + 1))
+    with collect_request_spans() as spans, pytest.raises(ConnectionError):
+        shift_creator.call_gemini_model("system", "other")
+    assert spans[0]["retries"] == shift_creator.GEMINI_MAX_RETRIES
+    assert spans[0]["error"]
@@ -0,0 +1,151 @@
+import contextlib
+import io
+from datetime import date, time
+
+import pytest
+import sqlalchemy
+from sqlalchemy import func, inspect, insert, select
+
+from backend.app.repository.db.migrations import LATEST_VERSION, current_version, downgrade, stamp, upgrade
+from backend.app.repository.db.migrations import m0002_shift_indexes, m0003_decision_shift_unique
+from backend.app.repository.db.models import Company, DecisionShift, EvaluateDecisionShift, ShiftHistoryFeature, ShiftHistoryPeriod, UserProfile
+
+
+@pytest.fixture
+def blank_engine():
+    engine = sqlalchemy.create_engine("sqlite://", poolclass=sqlalchemy.pool.StaticPool)
+    yield engine
+    engine.dispose()
+
+
+def _quiet(migrate, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return migrate(*args, **kwargs)
+
+
+def _index_names(engine):
+    inspector = inspect(engine)
+    return {index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)}
+
+
+def _decision_shift(user_id, company_id, day, start=9, finish=17):
+    return {"user_id": user_id, "company_id": company_id, "day": day, "start_time": time(start), "finish_time": time(finish)}
+
+
+def test_upgrade_applies_every_migration_once(blank_engine):
+    assert current_version(blank_engine) == 0
+    assert _quiet(upgrade, blank_engine) == list(range(1, LATEST_VERSION + 1))
+    assert current_version(blank_engine) == LATEST_VERSION
+    assert _quiet(upgrade, blank_engine) == []
+
+    indexes = _index_names(blank_engine)
+    assert {name for name, _, _ in m0002_shift_indexes.INDEXES} <= indexes
+    assert m0003_decision_shift_unique.INDEX_NAME in indexes
+
+
+def test_downgrade_and_upgrade_again(blank_engine):
+    _quiet(upgrade, blank_engine)
+    assert _quiet(downgrade, blank_engine, 1) == list(range(LATEST_VERSION, 1, -1))
+    assert current_version(blank_engine) == 1
+    indexes = _index_names(blank_engine)
+    assert not {name for name, _, _ in m0002_shift_indexes.INDEXES} & indexes
+    assert m0003_decision_shift_unique.INDEX_NAME not in indexes
+
+    assert _quiet(upgrade, blank_engine, 2) == [2]
+    assert _quiet(upgrade, blank_engine) == list(range(3, LATEST_VERSION + 1))
+    assert m0003_decision_shift_unique.INDEX_NAME in _index_names(blank_engine)
+
+    # 基準版は戻せない
+    with pytest.raises(ValueError):
+        _quiet(downgrade, blank_engine, 0)
+    assert current_version(blank_engine) == 1
+
+
+def test_stamp_records_versions_without_running_them(blank_engine):
+    _quiet(upgrade, blank_engine, 1)
+    stamp(blank_engine, 3)
+    assert current_version(blank_engine) == 3
+    assert _quiet(upgrade, blank_engine) == list(range(4, LATEST_VERSION + 1))
+
+
+def test_unique_index_migration_removes_duplicate_decision_shifts(blank_engine):
+    _quiet(upgrade, blank_engine)
+    _quiet(downgrade, blank_engine, 2)
+    with blank_engine.begin() as connection:
+        connection.execute(insert(DecisionShift), [_decision_shift(1, 1, date(2030, 7, 1))] * 3 + [_decision_shift(2, 1, date(2030, 7, 1))])
+
+    _quiet(upgrade, blank_engine, 3)
+    with blank_engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(DecisionShift)).scalar() == 2
+    with pytest.raises(sqlalchemy.exc.IntegrityError), blank_engine.begin() as connection:
+        connection.execute(insert(DecisionShift), [_decision_shift(2, 1, date(2030, 7, 1))])
+
+
+def test_history_backfill_aggregates_existing_decision_shifts(blank_engine):
+    _quiet(upgrade, blank_engine, 3)
+    with blank_engine.begin() as connection:
+        connection.execute(insert(Company), [{"company_id": c, "company_name": f"company-{c}"} for c in (1, 2)])
+        connection.execute(insert(UserProfile), [
+            {"user_id": 1, "company_id": 1, "experience": "veteran"},
+            {"user_id": 2, "company_id": 1, "experience": "new"},
+            {"user_id": 3, "company_id": 2, "experience": "veteran"},
+        ])
+        connection.execute(insert(DecisionShift), [
+            # オーナーが評価した期間
+            _decision_shift(1, 1, date(2030, 7, 1)),
+            _decision_shift(2, 1, date(2030, 7, 2)),
+            # 評価のない月
+            _decision_shift(1, 1, date(2030, 8, 5)),
+            # 確定時に特徴量を更新済みの会社
+            _decision_shift(3, 2, date(2030, 7, 1)),
+        ])
+        connection.execute(insert(EvaluateDecisionShift), [
+            {"company_id": 1, "start_day": date(2030, 7, 1), "finish_day": date(2030, 7, 7), "evaluate": "85点。よくできています"},
+        ])
+        connection.execute(insert(ShiftHistoryFeature), [{
+            "company_id": 2, "feature_type": "company", "feature_key": "all", "periods": 1, "shift_days": 1,
+            "scored_periods": 0, "score_sum": 0, "high_score_periods": 0, "low_score_periods": 0
+        }])
+
+    _quiet(upgrade, blank_engine, 4)
+    with blank_engine.connect() as connection:
+        rows = {
+            (r.company_id, r.feature_type, r.feature_key): r
+            for r in connection.execute(select(ShiftHistoryFeature)).all()
+        }
+
+    company = rows[(1, "company", "all")]
+    assert (company.periods, company.shift_days, company.scored_periods, company.score_sum) == (2, 3, 1, 85)
+    assert (company.high_score_periods, company.last_day) == (1, date(2030, 8, 31))
+    member = rows[(1, "member", "2")]
+    assert (member.periods, member.shift_days, member.scored_periods, member.score_sum) == (1, 1, 1, 85)
+    assert rows[(1, "member", "1")].periods == 2
+    assert [key for key in rows if key[0] == 2] == [(2, "company", "all")]
+    assert rows[(2, "company", "all")].periods == 1
+
+
+
+def test_history_periods_rebuild_double_counted_features(blank_engine):
+    _quiet(upgrade, blank_engine, 4)
+    with blank_engine.begin() as connection:
+        connection.execute(insert(Company), [{"company_id": 1, "company_name": "company-1"}])
+        connection.execute(insert(UserProfile), [{"user_id": 1, "company_id": 1, "experience": "veteran"}])
+        connection.execute(insert(DecisionShift), [_decision_shift(1, 1, date(2030, 7, 1)), _decision_shift(1, 1, date(2030, 7, 2))])
+        # 同じ期間を2回確定して2期間と数えてしまった行
+        connection.execute(insert(ShiftHistoryFeature), [{
+            "company_id": 1, "feature_type": "company", "feature_key": "all", "periods": 2, "shift_days": 3,
+            "scored_periods": 2, "score_sum": 150, "high_score_periods": 0, "low_score_periods": 0
+        }])
+
+    assert _quiet(upgrade, blank_engine) == [5]
+    with blank_engine.connect() as connection:
+        rows = {(r.feature_type, r.feature_key): r for r in connection.execute(select(ShiftHistoryFeature)).all()}
+        periods = connection.execute(select(ShiftHistoryPeriod)).all()
+
+    assert [(p.first_day, p.last_day, p.score) for p in periods] == [(date(2030, 7, 1), date(2030, 7, 31), None)]
+    company = rows[("company", "all")]
+    assert (company.periods, company.shift_days, company.scored_periods, company.score_sum) == (1, 2, 0, 0)
+    assert rows[("member", "1")].periods == 1
+
+    assert _quiet(downgrade, blank_engine, 4) == [5]
+    assert "shift_history_period" not in inspect(blank_engine).get_table_names()
@@ -0,0 +1,55 @@
+from backend.app.service.agent.module.prompt_codec import (
+    decode_edit_shift,
+    decode_shift_rules,
+    encode_edit_shift,
+    encode_shift_rules,
+    resolve_first_day,
+)
+from backend.app.service.agent.module.shift_evaluator import evaluate_shift_schedule
+from backend.app.service.agent.module.shift_solver import solve_shift_schedule
+
+
+MEMBER_KEYS = ("user_id", "evaluate", "position", "experience", "hour_pay")
+SHIFT_KEYS = ("day", "start_time", "finish_time")
+
+
+def test_shift_rules_round_trip(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=10, days=14, seed=4)
+    rules["company_member"][0]["name"] = "山田|太郎"
+    decoded = decode_shift_rules(encode_shift_rules(rules))
+
+    company_info = decoded["company_info"]
+    for key in ("company_id", "first_day", "open_time", "close_time", "rest_day", "labor_cost"):
+        assert company_info[key] == rules["company_info"][key]
+    assert decoded["company_member"][0]["name"] == "山田 太郎"
+    for original, member in zip(rules["company_member"], decoded["company_member"], strict=True):
+        assert [member[k] for k in MEMBER_KEYS] == [original[k] for k in MEMBER_KEYS]
+        assert [[s[k] for k in SHIFT_KEYS] for s in member["submitted_shift"]] == [[s[k] for k in SHIFT_KEYS] for s in original["submitted_shift"]]
+
+    # 評価に使う情報は失われない
+    schedule = solve_shift_schedule(rules, first_day, last_day).model_dump()["edit_shift"]
+    assert evaluate_shift_schedule(decoded, schedule, first_day, last_day) == evaluate_shift_schedule(rules, schedule, first_day, last_day)
+
+
+def test_compact_encoding_is_smaller_than_json(make_shift_rules):
+    import json
+
+    rules, _, _ = make_shift_rules(members=30, days=31, seed=5)
+    assert len(encode_shift_rules(rules)) < len(json.dumps(rules, ensure_ascii=False)) / 2
+
+
+def test_edit_shift_round_trip(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=10, days=14, seed=6)
+    schedule = solve_shift_schedule(rules, first_day, last_day).model_dump()["edit_shift"]
+    text = encode_edit_shift(schedule, first_day)
+    assert decode_edit_shift(text, first_day, rules["company_info"]["company_id"]) == schedule
+    assert resolve_first_day(rules) == first_day
+
+
+def test_decode_edit_shift_skips_fences_headers_and_malformed_rows():
+    text = "```\n# edit_shift: user_id|day|start|finish\n1|0|540|1020\n2, 1, 600, 900\nbroken row\n3|x|540|600\n4|2|540\n```"
+    assert decode_edit_shift(text, "2030-07-01", 7) == [
+        {"user_id": 1, "company_id": 7, "day": "2030-07-01", "start_time": "09:00:00", "finish_time": "17:00:00"},
+        {"user_id": 2, "company_id": 7, "day": "2030-07-02", "start_time": "10:00:00", "finish_time": "15:00:00"},
+    ]
+    assert decode_edit_shift(text, None, 7) == []
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from backend.app.service.agent.module import gemini_client, shift_creator
+from backend.domain.validation.objects.gemini import gemini_validation
+from backend.domain.validation.models.rules.max_num_candidates import MAX_NUM_CANDIDATES
+
+
+@pytest.mark.parametrize("value", [0, MAX_NUM_CANDIDATES + 1])
+def test_num_candidates_is_bounded(value):
+    with pytest.raises(ValueError):
+        gemini_validation['NumCandidatesValidation'](value).execute()
+    assert gemini_validation['NumCandidatesValidation'](MAX_NUM_CANDIDATES).execute() == MAX_NUM_CANDIDATES
+
+
+class _CountingChatModel:
+    """Wraps the fake model and counts the draft requests in flight at once."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def invoke(self, messages):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        return self.llm.invoke(messages)
+
+
+def test_candidates_are_generated_with_the_default_parallelism(fake_llm, monkeypatch, make_shift_rules):
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    llm = _CountingChatModel(fake_llm)
+    gemini_client.set_llm(llm)
+    monkeypatch.setattr(shift_creator, "SHIFT_CANDIDATE_PARALLELISM", 2)
+
+    _, report = shift_creator.shift_creator_run(json.dumps(rules), numb_rate_revisions=0, num_candidates=6, return_report=True)
+    assert [c["source"] for c in report["candidates"]] == ["solver"] + ["gemini"] * 5
+    assert sum(1 for c in report["candidates"] if c.get("selected")) == 1
+    assert llm.max_in_flight <= 2
+
+
+def test_async_candidates_run_the_solver_off_the_event_loop(fake_llm, monkeypatch, make_shift_rules):
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    solver_threads = []
+    solver_candidate = shift_creator._solver_candidate
+
+    def record_thread(*args):
+        solver_threads.append(threading.current_thread())
+        return solver_candidate(*args)
+
+    monkeypatch.setattr(shift_creator, "_solver_candidate", record_thread)
+    _, report = asyncio.run(shift_creator.ashift_creator_run(json.dumps(rules), numb_rate_revisions=0, num_candidates=3, return_report=True))
+    assert len(report["candidates"]) == 3
+    assert solver_threads and solver_threads[0] is not threading.main_thread()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app.service.agent.module import shift_creator
+from backend.app.service.agent.module.shift_creator import _RevisionTracker
+from backend.app.service.agent.module.shift_models import ShiftEvaluation, ShiftEvaluationBreakdown
+
+
+def _run(mode, rules, **kwargs):
+    if mode == "sync":
+        return shift_creator.shift_creator_run(json.dumps(rules), return_report=True, **kwargs)
+    return asyncio.run(shift_creator.ashift_creator_run(json.dumps(rules), return_report=True, **kwargs))
+
+
+def _evaluation(raw_score):
+    breakdown = ShiftEvaluationBreakdown(
+        uncovered_slot_count=0,
+        labor_cost_total=0,
+        ignored_preference_count=0,
+        raw_score=raw_score
+    )
+    return ShiftEvaluation(quantitative_score=max(0, round(raw_score)), feedback_japanese="", breakdown=breakdown)
+
+
+def test_tracker_keeps_the_best_draft():
+    tracker = _RevisionTracker(target_score=100, patience=0)
+    for round_num, (shift, score) in enumerate([("a", 60), ("b", 80), ("c", 70)]):
+        assert tracker.observe(round_num, shift, _evaluation(score)) is None
+    assert (tracker.best_round, tracker.best_score) == (1, 80)
+    assert tracker.result("c") == "b"
+
+
+def test_tracker_ranks_drafts_below_zero():
+    tracker = _RevisionTracker(target_score=100, patience=1)
+    tracker.observe(0, "a", _evaluation(-40))
+    assert tracker.observe(1, "b", _evaluation(-12.5)) is None
+    assert (tracker.best_round, tracker.best_score, tracker.best_raw_score) == (1, 0, -12.5)
+    assert tracker.observe(2, "c", _evaluation(-30)) == "plateau"
+    assert tracker.result("c") == "b"
+
+
+def test_tracker_stops_at_target_score_and_on_plateau():
+    tracker = _RevisionTracker(target_score=90, patience=2)
+    assert tracker.observe(0, "a", _evaluation(95)) == "target_score"
+
+    tracker = _RevisionTracker(target_score=90, patience=2)
+    assert tracker.observe_repaired(0, "a", _evaluation(95)) == "repaired"
+
+    tracker = _RevisionTracker(target_score=90, patience=2)
+    tracker.observe(0, "a", _evaluation(50))
+    tracker.record_feedback('{"quantitative_score": 97}', 0.5)
+    assert tracker.observe(1, "b", _evaluation(50)) is None
+    assert tracker.observe(2, "c", None) == "plateau"
+    assert tracker.result("c") == "a"
+    # Geminiの点数は報告するだけで，比較には使わない
+    assert (tracker.rounds[0]["gemini_score"], tracker.best_score) == (97, 50)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_loop_stops_once_the_target_score_is_reached(fake_llm, mode, make_shift_rules):
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    _, report = _run(mode, rules, target_score=-10_000)
+    assert report["stop_reason"] == "target_score"
+    assert len(report["rounds"]) == 1
+    assert fake_llm.calls == 1  # 初稿のみ（採点はローカル）
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_loop_stops_on_a_plateau(fake_llm, mode, make_shift_rules):
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    _, report = _run(mode, rules, target_score=101, patience=1)
+    assert report["stop_reason"] == "plateau"
+    assert [r["round"] for r in report["rounds"]] == [0, 1]
+    assert report["rounds"][0]["gemini_score"] is not None
+    assert fake_llm.calls == 3  # 初稿，修正のための評価，修正
+
+
+@pytest.mark.parametrize("prompt_format", ["json", "compact"])
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_loop_makes_at_most_one_plus_two_calls_per_revision(fake_llm, mode, prompt_format, make_shift_rules):
+    rules, _, _ = make_shift_rules(members=8, days=7, seed=1)
+    output, report = _run(mode, rules, numb_rate_revisions=3, target_score=101, patience=0, prompt_format=prompt_format)
+    assert report["stop_reason"] == "max_revisions"
+    assert [r["round"] for r in report["rounds"]] == [0, 1, 2, 3]
+    # Geminiの評価は修正の前にだけ行うので，呼び出しは 1 + 2 * numb_rate_revisions 回
+    assert fake_llm.calls == 1 + 2 * 3
+    assert json.loads(output)["edit_shift"]
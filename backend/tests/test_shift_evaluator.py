@@ -0,0 +1,60 @@
+from backend.app.service.agent.module.shift_evaluator import (
+    DRAFT_LABOR_COST_PENALTY,
+    FINAL_LABOR_COST_PENALTY,
+    IGNORED_PREFERENCE_PENALTY,
+    UNCOVERED_SLOT_PENALTY,
+    collect_member_shifts,
+    evaluate_shift_schedule,
+)
+
+
+def test_full_schedule_scores_100(day_shift_rules, make_shift):
+    evaluation = evaluate_shift_schedule(day_shift_rules, [make_shift(1), make_shift(2)])
+    assert evaluation.quantitative_score == 100
+    assert evaluation.breakdown.uncovered_slot_count == 0
+    assert evaluation.breakdown.labor_cost_total == 4 * 1000 + 4 * 1200
+    assert evaluation.breakdown.ignored_preference_count == 0
+
+
+def test_deductions_for_uncovered_slots_and_ignored_preferences(day_shift_rules, make_shift):
+    evaluation = evaluate_shift_schedule(day_shift_rules, [make_shift(1), make_shift(2, start_time="12:00:00")])
+    breakdown = evaluation.breakdown
+    assert breakdown.uncovered_slot_count == 2
+    assert {(s.start_time, s.position) for s in breakdown.uncovered_slots} == {("10:00:00", "kitchen"), ("11:00:00", "kitchen")}
+    assert breakdown.deductions["uncovered_slot"] == 2 * UNCOVERED_SLOT_PENALTY
+
+    evaluation = evaluate_shift_schedule(day_shift_rules, [make_shift(1)])
+    assert evaluation.breakdown.ignored_preference_count == 1
+    expected = 100 - 4 * UNCOVERED_SLOT_PENALTY - IGNORED_PREFERENCE_PENALTY
+    assert evaluation.quantitative_score == round(expected)
+    assert evaluation.breakdown.raw_score == round(expected, 1)
+
+
+def test_raw_score_keeps_ranking_below_zero(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=8, days=7, seed=1)
+    members = rules["company_member"]
+    half = [dict(s, user_id=m["user_id"]) for m in members[:4] for s in m["submitted_shift"]]
+    empty = evaluate_shift_schedule(rules, [], first_day, last_day)
+    partial = evaluate_shift_schedule(rules, half, first_day, last_day)
+    assert empty.quantitative_score == partial.quantitative_score == 0
+    assert empty.breakdown.raw_score < partial.breakdown.raw_score < 0
+
+
+def test_labor_cost_penalty_depends_on_the_stage(day_shift_rules, make_shift):
+    day_shift_rules["company_info"]["labor_cost"] = 1000
+    draft = evaluate_shift_schedule(day_shift_rules, [make_shift(1), make_shift(2)])
+    final = evaluate_shift_schedule(day_shift_rules, [make_shift(1), make_shift(2)], labor_cost_penalty=FINAL_LABOR_COST_PENALTY)
+    assert draft.quantitative_score == 100 - DRAFT_LABOR_COST_PENALTY
+    assert final.quantitative_score == 100 - FINAL_LABOR_COST_PENALTY
+
+
+def test_collect_member_shifts_reads_the_embedded_shifts(day_shift_rules, make_shift):
+    day_shift_rules["company_member"][0]["edit_shift"] = [make_shift(1, finish_time="12:00:00")]
+    assert collect_member_shifts(day_shift_rules) == [make_shift(1, finish_time="12:00:00")]
+    assert len(collect_member_shifts(day_shift_rules, "submitted_shift")) == 2
+
+
+def test_empty_period_scores_100(day_shift_rules):
+    for member in day_shift_rules["company_member"]:
+        member["submitted_shift"] = []
+    assert evaluate_shift_schedule(day_shift_rules, []).quantitative_score == 100
@@ -0,0 +1,37 @@
+from backend.app.service.agent.module.shift_feasibility import ShiftInfeasibleError, check_shift_feasibility
+
+
+def test_well_staffed_request_is_feasible(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=50, days=14, seed=0, labor_cost=10_000_000)
+    report = check_shift_feasibility(rules, first_day, last_day, max_uncovered_ratio=0.5)
+    assert report.feasible
+    assert report.reasons == []
+    assert 0 < report.min_labor_cost <= report.labor_cost_budget
+
+
+def test_understaffed_request_reports_the_reasons(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=4, days=7, seed=0, labor_cost=3_000)
+    report = check_shift_feasibility(rules, first_day, last_day)
+    assert not report.feasible
+    assert len(report.reasons) == 2
+    assert report.uncovered_slot_count > 0
+    assert sum(report.uncovered_by_position.values()) == report.uncovered_slot_count
+    assert report.min_labor_cost > report.labor_cost_budget
+
+
+def test_request_without_submitted_shifts_is_infeasible(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=4, days=7)
+    for member in rules["company_member"]:
+        member["submitted_shift"] = []
+    report = check_shift_feasibility(rules, first_day, last_day)
+    assert not report.feasible
+    assert report.submitted_shift_count == 0
+
+
+def test_infeasible_error_carries_the_report(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=4, days=7, seed=0, labor_cost=3_000)
+    report = check_shift_feasibility(rules, first_day, last_day)
+    error = ShiftInfeasibleError(report)
+    assert isinstance(error, ValueError)
+    assert error.report is report
+    assert str(error) == " ".join(report.reasons)
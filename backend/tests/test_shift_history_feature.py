@@ -0,0 +1,106 @@
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+from backend.app.repository.crud.shift_history import shift_history_repository
+from backend.app.repository.crud.shift_history.shift_history_feature import owner_evaluation_score
+from backend.app.repository.db.models import (
+    Company,
+    DecisionShift,
+    EditShift,
+    EvaluateDecisionShift,
+    ShiftHistoryPeriod,
+    UserProfile
+)
+from backend.app.usecase.owner_shift import owner_shift_usecase
+
+MEMBERS = [{"user_id": 1, "experience": "veteran"}, {"user_id": 2, "experience": "new"}]
+
+
+def _decision_shift(user_id, day):
+    return {"user_id": user_id, "company_id": 1, "day": day, "start_time": time(9), "finish_time": time(17)}
+
+
+@pytest.mark.parametrize("evaluate, score", [
+    ("85点です", 85),
+    ("総合 72.5 / 100", 72.5),
+    (" 90 ", 90),
+    ("150点", None),
+    ("とても良い", None),
+    (None, None),
+])
+def test_owner_evaluation_score(evaluate, score):
+    assert owner_evaluation_score(evaluate) == score
+
+
+def test_periods_accumulate_into_the_summary(engine):
+    with engine.begin() as connection:
+        connection.execute(insert(DecisionShift), [
+            _decision_shift(1, date(2030, 7, 1)),
+            _decision_shift(2, date(2030, 7, 1)),
+            _decision_shift(1, date(2030, 7, 2)),
+            _decision_shift(1, date(2030, 8, 1)),
+        ])
+    shift_history_repository['update_shift_history_features'](1, "2030-07-01", "2030-07-07", MEMBERS, 84.6)
+    shift_history_repository['update_shift_history_features'](1, "2030-08-01", "2030-08-31", MEMBERS, None)
+    shift_history_repository['update_shift_history_features'](1, "2030-09-01", "2030-09-30", MEMBERS, 10)
+
+    summary = shift_history_repository['get_shift_history_summary'](1)
+    assert (summary["periods"], summary["average_score"]) == (2, 85.0)
+    assert [(m["user_id"], m["periods"], m["shift_days"], m["high_score_periods"]) for m in summary["members"]] == [(1, 2, 3, 1), (2, 1, 1, 1)]
+    assert shift_history_repository['get_shift_history_summary'](2)["periods"] == 0
+
+
+def test_overlapping_period_replaces_the_recorded_one(engine):
+    with engine.begin() as connection:
+        connection.execute(insert(DecisionShift), [_decision_shift(1, date(2030, 7, 1)), _decision_shift(2, date(2030, 7, 5))])
+    shift_history_repository['update_shift_history_features'](1, "2030-07-01", "2030-07-07", MEMBERS, 50)
+    assert shift_history_repository['get_shift_history_period'](1, "2030-07-03", "2030-07-10") == ("2030-07-01", "2030-07-10")
+    assert shift_history_repository['get_shift_history_period'](1, "2030-07-08", "2030-07-10") == ("2030-07-08", "2030-07-10")
+
+    with engine.begin() as connection:
+        connection.execute(insert(DecisionShift), [_decision_shift(1, date(2030, 7, 9))])
+    shift_history_repository['update_shift_history_features'](1, "2030-07-01", "2030-07-10", MEMBERS[:1], 90)
+
+    summary = shift_history_repository['get_shift_history_summary'](1)
+    assert (summary["periods"], summary["average_score"]) == (1, 90.0)
+    assert [(m["user_id"], m["periods"], m["shift_days"]) for m in summary["members"]] == [(1, 1, 2), (2, 1, 1)]
+    assert [m["feature"] for m in summary["staffing_mix"]] == ["daily_staff:1-3", "veteran_share:high"]
+
+
+def test_finalizing_the_same_window_twice_counts_one_period(engine, count_rows):
+    first_day = date.today() + timedelta(days=1)
+    with engine.begin() as connection:
+        connection.execute(insert(Company), [{
+            "company_id": 1, "company_name": "company-1", "open_time": time(9), "close_time": time(17), "labor_cost": 100_000
+        }])
+        connection.execute(insert(UserProfile), [
+            {"user_id": m["user_id"], "company_id": 1, "position": "hall", "experience": m["experience"], "hour_pay": 1000}
+            for m in MEMBERS
+        ])
+        connection.execute(insert(EditShift), [
+            {"user_id": user_id, "company_id": 1, "day": first_day + timedelta(days=d), "start_time": time(9), "finish_time": time(17)}
+            for user_id in (1, 2) for d in range(3)
+        ])
+
+    assert owner_shift_usecase['CompleteShiftUseCase'](1).execute() == {'inserted_count': 6}
+    with engine.begin() as connection:
+        connection.execute(update(EditShift).where(EditShift.user_id == 2, EditShift.day == first_day).values(start_time=time(10)))
+    assert owner_shift_usecase['CompleteShiftUseCase'](1).execute() == {'inserted_count': 1}
+
+    summary = shift_history_repository['get_shift_history_summary'](1)
+    assert summary["periods"] == 1
+    assert [(m["user_id"], m["periods"], m["shift_days"]) for m in summary["members"]] == [(1, 1, 3), (2, 1, 3)]
+    assert count_rows(ShiftHistoryPeriod) == 1
+
+
+def test_owner_score_is_the_latest_readable_overlapping_evaluation(engine):
+    with engine.begin() as connection:
+        connection.execute(insert(EvaluateDecisionShift), [
+            {"company_id": 1, "start_day": date(2030, 7, 1), "finish_day": date(2030, 7, 7), "evaluate": "70点"},
+            {"company_id": 1, "start_day": date(2030, 7, 1), "finish_day": date(2030, 7, 14), "evaluate": "よくできました"},
+            {"company_id": 2, "start_day": date(2030, 7, 1), "finish_day": date(2030, 7, 31), "evaluate": "95点"},
+        ])
+    assert shift_history_repository['get_owner_score'](1, "2030-07-01", "2030-07-31") == 70
+    assert shift_history_repository['get_owner_score'](1, "2030-08-01", "2030-08-31") is None
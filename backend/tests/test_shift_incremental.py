@@ -0,0 +1,104 @@
+import random
+
+from backend.app.service.agent.module.shift_evaluator import FINAL_LABOR_COST_PENALTY, collect_member_shifts, evaluate_shift_schedule
+from backend.app.service.agent.module.shift_incremental import IncrementalShiftScorer, ShiftScoreCache
+
+
+def _full_score(rules, entries, first_day, last_day):
+    evaluation = evaluate_shift_schedule(rules, entries, first_day, last_day, labor_cost_penalty=FINAL_LABOR_COST_PENALTY)
+    breakdown = evaluation.breakdown
+    return (evaluation.quantitative_score, breakdown.uncovered_slot_count, breakdown.labor_cost_total, breakdown.ignored_preference_count)
+
+
+def _snapshot(snapshot):
+    return (snapshot.quantitative_score, snapshot.uncovered_slot_count, snapshot.labor_cost_total, snapshot.ignored_preference_count)
+
+
+def test_incremental_score_matches_a_full_rescore_after_every_edit(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=20, days=14, seed=3, labor_cost=500_000)
+    submitted = collect_member_shifts(rules, "submitted_shift")
+    rng = random.Random(0)
+    entries = {i: dict(e, edit_shift_id=i) for i, e in enumerate(submitted) if rng.random() < 0.6}
+    scorer = IncrementalShiftScorer(rules, list(entries.values()), first_day, last_day)
+    assert _snapshot(scorer.score()) == _full_score(rules, list(entries.values()), first_day, last_day)
+
+    next_id = 10_000
+    for _ in range(200):
+        operation = rng.choice("aud")
+        if operation == "a" or not entries:
+            entry = dict(rng.choice(submitted), edit_shift_id=next_id)
+            next_id += 1
+            entries[entry["edit_shift_id"]] = entry
+            scorer.add(entry)
+        elif operation == "u":
+            edit_shift_id = rng.choice(list(entries))
+            hour = rng.randint(6, 14)
+            start_time, finish_time = f"{hour:02d}:30:00", f"{hour + rng.randint(1, 8):02d}:00:00"
+            entries[edit_shift_id] = dict(entries[edit_shift_id], start_time=start_time, finish_time=finish_time)
+            assert scorer.update(edit_shift_id, start_time, finish_time)
+        else:
+            edit_shift_id = rng.choice(list(entries))
+            del entries[edit_shift_id]
+            assert scorer.remove(edit_shift_id)
+        assert _snapshot(scorer.score()) == _full_score(rules, list(entries.values()), first_day, last_day)
+        assert scorer.score().shift_count == len(entries)
+
+    assert not scorer.remove(-1)
+    assert not scorer.update(-1, "10:00:00", "11:00:00")
+
+
+def test_cache_applies_edits_to_the_cached_periods_of_the_company(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=10, days=7, seed=1)
+    entries = [dict(e, edit_shift_id=i) for i, e in enumerate(collect_member_shifts(rules, "submitted_shift"))]
+    cache = ShiftScoreCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return rules, entries
+
+    before = cache.score(1, first_day, last_day, load)
+    assert cache.score(1, first_day, last_day, load) == before
+    assert len(loads) == 1
+
+    assert cache.apply_edits(2, [], [], [0]) == []
+    touched = cache.apply_edits(1, [], [], [0])
+    assert [(t["first_day"], t["last_day"]) for t in touched] == [(first_day, last_day)]
+    after = cache.score(1, first_day, last_day, load)
+    assert _snapshot(after) == _full_score(rules, entries[1:], first_day, last_day)
+    assert len(loads) == 1
+
+    cache.invalidate(1)
+    cache.score(1, first_day, last_day, load)
+    assert len(loads) == 2
+
+
+def test_cache_does_not_store_a_period_edited_while_it_was_loading(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=5, days=7, seed=2)
+    cache = ShiftScoreCache()
+    loads = []
+
+    def stale_load():
+        # 読み込み中に別のリクエストが編集を反映した
+        loads.append(1)
+        cache.apply_edits(1, [], [], [123])
+        return rules, []
+
+    cache.score(1, first_day, last_day, stale_load)
+    cache.score(1, first_day, last_day, lambda: (loads.append(1), (rules, []))[1])
+    assert len(loads) == 2
+
+
+def test_cache_evicts_the_least_recently_used_period(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=5, days=7, seed=2)
+    cache = ShiftScoreCache(max_periods=1)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return rules, []
+
+    cache.score(1, first_day, last_day, load)
+    cache.score(2, first_day, last_day, load)
+    cache.score(1, first_day, last_day, load)
+    assert len(loads) == 3
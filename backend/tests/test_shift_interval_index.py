@@ -0,0 +1,57 @@
+import random
+
+from backend.app.service.agent.module.shift_evaluator import collect_member_shifts
+from backend.app.service.agent.module.shift_interval_index import ShiftIntervalIndex
+from backend.app.service.agent.module.shift_timeline import format_minutes, to_minutes
+
+
+def _key(entry):
+    return entry["user_id"], entry["day"], entry["start_time"], entry["finish_time"]
+
+
+def test_queries_match_a_linear_scan(make_shift_rules):
+    rules, _, _ = make_shift_rules(members=30, days=14, seed=5)
+    shifts = collect_member_shifts(rules, "submitted_shift")
+    position = {m["user_id"]: m["position"] for m in rules["company_member"]}
+    index = ShiftIntervalIndex.from_shift_rules(rules, "submitted_shift")
+    rng = random.Random(1)
+
+    shifts_by_day = {}
+    for s in shifts:
+        shifts_by_day.setdefault(s["day"], []).append(s)
+
+    def scan(day, start, finish, p):
+        return [
+            s for s in shifts_by_day[day]
+            if to_minutes(s["start_time"]) < finish and to_minutes(s["finish_time"]) > start
+            and (p is None or position[s["user_id"]] == p)
+        ]
+
+    for _ in range(500):
+        day = rng.choice(shifts)["day"]
+        start = rng.randint(0, 1400)
+        finish = rng.randint(start + 1, 1439)
+        p = rng.choice([None, "hall", "kitchen", "cashier"])
+
+        working = scan(day, start, start + 1, p)
+        assert sorted(map(_key, index.working_at(day, format_minutes(start), p))) == sorted(map(_key, working))
+        assert index.staff_count(day, format_minutes(start), p) == len(working)
+        assert sorted(map(_key, index.working_between(day, format_minutes(start), format_minutes(finish), p))) == sorted(map(_key, scan(day, start, finish, p)))
+        # 人数は各シフトの開始・終了でしか変わらない
+        changes = {start} | {to_minutes(s[k]) for s in shifts_by_day[day] for k in ("start_time", "finish_time")}
+        expected_min = min(len(scan(day, t, t + 1, p)) for t in changes if start <= t < finish)
+        assert index.min_staff(day, format_minutes(start), format_minutes(finish), p) == expected_min
+
+
+def test_conflicts_are_overlapping_shifts_of_the_same_worker():
+    shifts = [
+        {"edit_shift_id": 1, "user_id": 1, "day": "2030-07-01", "start_time": "09:00:00", "finish_time": "13:00:00"},
+        {"edit_shift_id": 2, "user_id": 1, "day": "2030-07-01", "start_time": "12:00:00", "finish_time": "18:00:00"},
+        {"edit_shift_id": 3, "user_id": 1, "day": "2030-07-01", "start_time": "18:00:00", "finish_time": "20:00:00"},
+        {"edit_shift_id": 4, "user_id": 2, "day": "2030-07-01", "start_time": "09:00:00", "finish_time": "20:00:00"},
+    ]
+    index = ShiftIntervalIndex(shifts)
+    assert [s["edit_shift_id"] for s in index.conflicts(shifts[0])] == [2]
+    assert [s["edit_shift_id"] for s in index.conflicts(shifts[1])] == [1]
+    assert index.conflicts(shifts[2]) == []
+    assert index.working_at("2030-07-02", "10:00:00") == []
@@ -0,0 +1,45 @@
+from backend.app.service.agent.module.shift_repair import repair_shift_schedule
+
+
+def test_valid_schedule_is_unchanged(day_shift_rules, make_shift, shift_day):
+    schedule = [make_shift(1), make_shift(2, start_time="12:00:00")]
+    repaired, report = repair_shift_schedule(day_shift_rules, schedule, shift_day, shift_day)
+    assert repaired == schedule
+    assert not report.changed
+    assert (report.input_count, report.output_count) == (2, 2)
+
+
+def test_hard_constraint_violations_are_dropped(day_shift_rules, make_shift, shift_day):
+    day_shift_rules["company_info"]["rest_day"] = ["2030-07-03"]
+    schedule = [
+        make_shift(1),
+        make_shift(99),
+        make_shift(2, day="2030-07-10"),
+        make_shift(2, day="2030-07-03"),
+        make_shift(2, start_time="13:00:00", finish_time="11:00:00"),
+        make_shift(2, start_time="06:00:00", finish_time="08:00:00"),
+        {"foo": 1},
+    ]
+    repaired, report = repair_shift_schedule(day_shift_rules, schedule, shift_day, "2030-07-05")
+    assert repaired == [make_shift(1)]
+    assert report.counts == {
+        "dropped_unknown_user": 1,
+        "dropped_out_of_period": 1,
+        "dropped_rest_day": 1,
+        "dropped_finish_before_start": 1,
+        "dropped_outside_business_hours": 1,
+        "dropped_invalid": 1,
+    }
+    assert report.output_count == 1
+
+
+def test_entries_are_clipped_normalized_and_deduplicated(day_shift_rules, make_shift, shift_day):
+    schedule = [
+        {"user_id": "1", "company_id": 5, "day": shift_day + "T00:00:00", "start_time": "07:00", "finish_time": "12:00"},
+        make_shift(2, finish_time="12:00:00"),
+        make_shift(2, start_time="11:00:00"),
+    ]
+    repaired, report = repair_shift_schedule(day_shift_rules, schedule, shift_day, shift_day)
+    assert repaired == [make_shift(1, finish_time="12:00:00"), make_shift(2, start_time="11:00:00")]
+    assert report.counts["clipped"] == 1
+    assert report.counts["dropped_duplicate"] == 1
@@ -0,0 +1,48 @@
+import copy
+
+import pytest
+
+from backend.app.service.agent.module.shift_evaluator import FINAL_LABOR_COST_PENALTY, evaluate_shift_schedule
+from backend.app.service.agent.module.shift_simulation import apply_shift_edits, simulate_shift_edits
+
+
+@pytest.fixture
+def edit_shift(make_shift):
+    return [make_shift(1, edit_shift_id=10), make_shift(2, edit_shift_id=11)]
+
+
+def test_apply_shift_edits_deletes_updates_and_adds(edit_shift, make_shift):
+    added = make_shift(2, day="2030-07-03", finish_time="12:00:00")
+    edited, unknown_ids = apply_shift_edits(
+        edit_shift,
+        [added],
+        [{"edit_shift_id": 11, "start_time": "12:00:00", "finish_time": "14:00:00"}, {"edit_shift_id": 99, "start_time": "10:00:00", "finish_time": "11:00:00"}],
+        [10, 98]
+    )
+    assert edited == [dict(edit_shift[1], start_time="12:00:00"), dict(added, edit_shift_id=None)]
+    assert unknown_ids == [98, 99]
+
+
+def test_simulation_scores_both_schedules_without_touching_them(day_shift_rules, edit_shift, shift_day):
+    stored = copy.deepcopy(edit_shift)
+    update = [{"edit_shift_id": 11, "start_time": "12:00:00", "finish_time": "14:00:00"}]
+    result = simulate_shift_edits(day_shift_rules, stored, [], update, [], shift_day, shift_day)
+    assert stored == edit_shift
+
+    edited, _ = apply_shift_edits(edit_shift, [], update, [])
+    after = evaluate_shift_schedule(day_shift_rules, edited, shift_day, shift_day, labor_cost_penalty=FINAL_LABOR_COST_PENALTY)
+    assert result.before.quantitative_score == 100
+    assert result.after.quantitative_score == after.quantitative_score
+    assert result.score_delta == after.quantitative_score - 100
+    assert result.labor_cost_delta == -2 * 1200
+    assert result.uncovered_slot_delta == 2
+    assert [(s.start_time, s.position) for s in result.newly_uncovered_slots] == [("10:00:00", "kitchen"), ("11:00:00", "kitchen")]
+    assert result.newly_covered_slots == []
+
+
+def test_simulation_reports_double_bookings_and_unknown_ids(day_shift_rules, edit_shift, make_shift, shift_day):
+    added = make_shift(1, start_time="13:00:00")
+    result = simulate_shift_edits(day_shift_rules, edit_shift, [added], [], [77], shift_day, shift_day)
+    assert [(c.user_id, c.start_time, c.conflicting_start_time) for c in result.conflicting_shifts] == [(1, "13:00:00", "10:00:00")]
+    assert result.unknown_edit_shift_ids == [77]
+    assert result.score_delta == 0
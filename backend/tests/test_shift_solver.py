@@ -0,0 +1,50 @@
+from backend.app.service.agent.module.shift_evaluator import evaluate_shift_schedule
+from backend.app.service.agent.module.shift_feasibility import check_shift_feasibility
+from backend.app.service.agent.module.shift_repair import repair_shift_schedule
+from backend.app.service.agent.module.shift_solver import solve_shift_schedule
+from backend.app.service.agent.module.shift_timeline import to_minutes
+
+
+def test_solver_assigns_only_submitted_shifts_within_business_hours(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=15, days=14, seed=1)
+    schedule = solve_shift_schedule(rules, first_day, last_day).model_dump()["edit_shift"]
+
+    submitted = {
+        (m["user_id"], s["day"]): (to_minutes(s["start_time"]), to_minutes(s["finish_time"]))
+        for m in rules["company_member"] for s in m["submitted_shift"]
+    }
+    rest_days = set(rules["company_info"]["rest_day"])
+    assert schedule
+    for entry in schedule:
+        start, finish = submitted[(entry["user_id"], entry["day"])]
+        assert entry["day"] not in rest_days
+        assert max(start, 9 * 60) <= to_minutes(entry["start_time"]) < to_minutes(entry["finish_time"]) <= min(finish, 22 * 60)
+
+
+def test_solver_output_needs_no_repair(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=15, days=14, seed=2)
+    schedule = solve_shift_schedule(rules, first_day, last_day).model_dump()["edit_shift"]
+
+    _, report = repair_shift_schedule(rules, schedule, first_day, last_day)
+    assert set(report.counts) <= {"normalized"}
+    assert report.output_count == len(schedule)
+
+
+def test_solver_covers_every_coverable_slot_and_is_deterministic(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=15, days=14, seed=3, labor_cost=10_000_000)
+    first = solve_shift_schedule(rules, first_day, last_day)
+    second = solve_shift_schedule(rules, first_day, last_day)
+    assert first == second
+
+    solved = evaluate_shift_schedule(rules, first.model_dump()["edit_shift"], first_day, last_day)
+    empty = evaluate_shift_schedule(rules, [], first_day, last_day)
+    # 誰も希望を出していない枠以外はすべて埋まる
+    assert solved.breakdown.uncovered_slot_count == check_shift_feasibility(rules, first_day, last_day).uncovered_slot_count
+    assert solved.breakdown.uncovered_slot_count < empty.breakdown.uncovered_slot_count
+
+
+def test_solver_returns_an_empty_schedule_without_submitted_shifts(make_shift_rules):
+    rules, _, _ = make_shift_rules(members=3, days=7)
+    for member in rules["company_member"]:
+        member["submitted_shift"] = []
+    assert solve_shift_schedule(rules).edit_shift == []
@@ -0,0 +1,66 @@
+import json
+from datetime import date, timedelta
+
+from backend.app.service.agent.module import shift_creator
+from backend.app.service.agent.module.shift_solver import solve_shift_schedule
+from backend.app.service.agent.module.shift_warm_start import project_decision_shifts
+
+
+def test_latest_weekday_pattern_is_projected_onto_the_submissions(make_shift):
+    rules = {
+        "company_info": {"company_id": 1, "open_time": "09:00:00", "close_time": "22:00:00", "rest_day": ["2030-07-03"]},
+        "company_member": [
+            {"user_id": 1, "submitted_shift": [make_shift(1, "2030-07-01", "12:00:00", "20:00:00"), make_shift(1, "2030-07-03", "10:00:00", "18:00:00")]},
+            {"user_id": 2, "submitted_shift": [make_shift(2, "2030-07-04", "10:00:00", "18:00:00")]},
+            {"user_id": 3, "submitted_shift": [make_shift(3, "2030-07-01", "09:00:00", "18:00:00")]},
+        ]
+    }
+    decision_shifts = [
+        make_shift(3, date(2030, 6, 17), "09:00:00", "18:00:00"),  # 古い月曜日は使わない
+        make_shift(1, date(2030, 6, 24), "10:00:00", "18:00:00"),  # 月曜日: 希望に合わせて12:00からに縮める
+        make_shift(2, date(2030, 6, 25), "10:00:00", "18:00:00"),  # 火曜日: 希望がない
+        make_shift(1, date(2030, 6, 26), "10:00:00", "18:00:00"),  # 水曜日: 休業日
+        make_shift(9, date(2030, 6, 27), "10:00:00", "18:00:00"),  # 木曜日: 在籍していない
+    ]
+
+    draft, counts = project_decision_shifts(rules, decision_shifts, "2030-07-01", "2030-07-07")
+    assert draft == [make_shift(1, "2030-07-01", "12:00:00", "18:00:00")]
+    assert counts == {
+        "adjusted": 1,
+        "dropped_no_submission": 1,
+        "dropped_rest_day": 1,
+        "dropped_unknown_user": 1,
+        "projected": 1,
+    }
+
+
+def test_no_history_gives_no_draft(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=5, days=7)
+    assert project_decision_shifts(rules, [], first_day, last_day) == ([], {})
+
+
+def _previous_period(rules, first_day, last_day, days):
+    previous = solve_shift_schedule(rules, first_day, last_day).model_dump()["edit_shift"]
+    for entry in previous:
+        entry["day"] = date.fromisoformat(entry["day"]) - timedelta(days=days)
+    return previous
+
+
+def test_solver_keeps_the_warm_start_draft(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=15, days=14, seed=3)
+    draft, _ = project_decision_shifts(rules, _previous_period(rules, first_day, last_day, 14), first_day, last_day)
+    assert draft
+
+    schedule = solve_shift_schedule(rules, first_day, last_day, initial_draft=draft).model_dump()["edit_shift"]
+    for entry in draft:
+        assert entry in schedule
+
+
+def test_warm_start_skips_the_draft_call(fake_llm, make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=15, days=14, seed=3)
+    draft, _ = project_decision_shifts(rules, _previous_period(rules, first_day, last_day, 14), first_day, last_day)
+
+    output, report = shift_creator.shift_creator_run(json.dumps(rules), target_score=-10_000, return_report=True, initial_draft=draft)
+    assert report["stop_reason"] == "target_score"
+    assert fake_llm.calls == 0  # 初稿も採点もローカル
+    assert json.loads(output)["edit_shift"]
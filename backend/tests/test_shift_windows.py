@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from backend.app.service.agent.module import shift_windows
+from backend.app.service.agent.module.shift_solver import solve_shift_schedule
+from backend.app.service.agent.module.shift_windows import (
+    EMPTY_SCHEDULE,
+    arun_windowed,
+    run_windowed,
+    split_period,
+    window_shift_rules,
+)
+from backend.domain.validation.objects.gemini import gemini_validation
+
+
+def _solve_window(request: str) -> str:
+    rules = json.loads(request)
+    company_info = rules["company_info"]
+    return solve_shift_schedule(rules, company_info["first_day"], company_info["last_day"]).model_dump_json()
+
+
+def test_split_period_covers_the_period_and_cuts_on_rest_days():
+    company_info = {"rest_day": ["2030-07-05", "2030-07-17"]}
+    windows = split_period(company_info, "2030-07-01", "2030-07-31", window_days=7)
+
+    assert windows[0] == (date(2030, 7, 1), date(2030, 7, 5))
+    assert windows[0][0] == date(2030, 7, 1) and windows[-1][1] == date(2030, 7, 31)
+    for (_, last_day), (first_day, _) in zip(windows, windows[1:]):
+        assert first_day == last_day + timedelta(days=1)
+    assert all((last_day - first_day).days < 7 for first_day, last_day in windows)
+    assert (date(2030, 7, 13), date(2030, 7, 17)) in windows
+
+
+def test_window_shift_rules_prorates_labor_cost(make_shift_rules):
+    rules, _, _ = make_shift_rules(members=5, days=14, seed=1, labor_cost=1_200_000)
+    window = window_shift_rules(rules, "2030-07-01", "2030-07-07", total_working_days=12)
+
+    assert window["company_info"]["labor_cost"] == 600_000
+    assert window["company_info"]["rest_day"] == ["2030-07-01"]
+    days = {s["day"] for m in window["company_member"] for s in m["submitted_shift"]}
+    assert days and max(days) <= "2030-07-07"
+
+
+def test_windowed_run_stitches_the_windows_in_order(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=12, days=28, seed=2)
+    requests = []
+
+    def run_window(request: str) -> str:
+        requests.append(request)
+        return _solve_window(request)
+
+    stitched = json.loads(run_windowed(rules, first_day, last_day, run_window, window_days=7))["edit_shift"]
+    assert len(requests) == 4
+    assert stitched
+    days = [e["day"] for e in stitched]
+    assert days == sorted(days)
+    assert first_day <= days[0] and days[-1] <= last_day
+    assert json.loads(asyncio.run(arun_windowed(rules, first_day, last_day, _async_solve_window, window_days=7)))["edit_shift"] == stitched
+
+
+async def _async_solve_window(request: str) -> str:
+    return _solve_window(request)
+
+
+def test_windowed_run_drops_days_outside_the_window_and_skips_empty_windows(make_shift_rules):
+    rules, first_day, last_day = make_shift_rules(members=5, days=14, seed=3)
+    for member in rules["company_member"]:
+        member["submitted_shift"] = [s for s in member["submitted_shift"] if s["day"] <= "2030-07-07"]
+    calls = []
+
+    def run_window(request: str) -> str:
+        calls.append(request)
+        outside = {"user_id": 1, "company_id": 1, "day": "2030-07-10", "start_time": "09:00:00", "finish_time": "12:00:00"}
+        return json.dumps({"edit_shift": json.loads(_solve_window(request))["edit_shift"] + [outside]})
+
+    stitched = json.loads(run_windowed(rules, first_day, last_day, run_window, window_days=7))["edit_shift"]
+    assert len(calls) == 1
+    assert all(e["day"] <= "2030-07-07" for e in stitched)
+
+
+@pytest.mark.parametrize("value, valid", [(0, True), (7, True), (14, True), (1, False), (6, False), (-7, False)])
+def test_window_days_is_zero_or_at_least_a_week(value, valid):
+    validation = gemini_validation['WindowDaysValidation'](value)
+    if valid:
+        assert validation.execute() == value
+    else:
+        with pytest.raises(ValueError):
+            validation.execute()
+
+
+def test_windows_run_with_a_bounded_concurrency(make_shift_rules, monkeypatch):
+    rules, first_day, last_day = make_shift_rules(members=8, days=56, seed=4)
+    monkeypatch.setattr(shift_windows, "WINDOW_MAX_WORKERS", 2)
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def enter():
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+
+    def leave():
+        with lock:
+            running["now"] -= 1
+
+    def run_window(request: str) -> str:
+        enter()
+        time.sleep(0.01)
+        leave()
+        return EMPTY_SCHEDULE
+
+    async def arun_window(request: str) -> str:
+        enter()
+        await asyncio.sleep(0.01)
+        leave()
+        return EMPTY_SCHEDULE
+
+    run_windowed(rules, first_day, last_day, run_window, window_days=7)
+    assert running["max"] == 2
+    running["max"] = 0
+    asyncio.run(arun_windowed(rules, first_day, last_day, arun_window, window_days=7))
+    assert running["max"] == 2
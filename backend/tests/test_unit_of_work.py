@@ -0,0 +1,30 @@
+from datetime import time
+
+import pytest
+
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.db.db_init import unit_of_work
+from backend.app.repository.db.models import EditShift
+
+
+def test_unit_of_work_rolls_back_every_repository_call(engine, future_shift, count_rows):
+    mine = [s["edit_shift_id"] for s in edit_shift_repository['insert_shift_request']([future_shift(1), future_shift(2)])]
+
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            edit_shift_repository['delete_shift_request'](1, mine[:1])
+            edit_shift_repository['insert_shift_request']([future_shift(5)])
+            edit_shift_repository['update_shift_request'](1, [{"edit_shift_id": 99999, "start_time": "10:00:00", "finish_time": "11:00:00"}])
+    assert count_rows(EditShift) == 2
+
+
+def test_nested_unit_of_work_joins_the_outer_transaction(engine, future_shift, count_rows, edit_shift_times):
+    mine = [s["edit_shift_id"] for s in edit_shift_repository['insert_shift_request']([future_shift(1), future_shift(2)])]
+
+    with unit_of_work():
+        edit_shift_repository['delete_shift_request'](1, mine[:1])
+        with unit_of_work():
+            inserted = edit_shift_repository['insert_shift_request']([future_shift(5)])
+        edit_shift_repository['update_shift_request'](1, [{"edit_shift_id": inserted[0]["edit_shift_id"], "start_time": "10:00:00", "finish_time": "11:00:00"}])
+    assert count_rows(EditShift) == 2
+    assert edit_shift_times(inserted[0]["edit_shift_id"]) == (time(10), time(11))
@@ -0,0 +1,40 @@
+from datetime import time
+
+import pytest
+
+from backend.app.repository.crud.edit_shift import edit_shift_repository
+from backend.app.repository.db.models import EditShift
+
+
+def test_bulk_update_checks_the_company(engine, future_shift, edit_shift_times):
+    mine = edit_shift_repository['insert_shift_request']([future_shift(1), future_shift(2)])
+    other = edit_shift_repository['insert_shift_request']([future_shift(3, company_id=2)])
+    updates = [
+        {"edit_shift_id": mine[0]["edit_shift_id"], "start_time": "10:00:00", "finish_time": "12:00:00"},
+        {"edit_shift_id": mine[1]["edit_shift_id"], "start_time": "11:00:00", "finish_time": "13:00:00"},
+        {"edit_shift_id": mine[1]["edit_shift_id"], "start_time": "12:00:00", "finish_time": "14:00:00"},
+    ]
+
+    with pytest.raises(ValueError, match=str(other[0]["edit_shift_id"])):
+        edit_shift_repository['update_shift_request'](1, updates + [{"edit_shift_id": other[0]["edit_shift_id"], "start_time": "10:00:00", "finish_time": "11:00:00"}])
+    assert edit_shift_times(mine[0]["edit_shift_id"]) == (time(9), time(17))
+
+    assert edit_shift_repository['update_shift_request'](1, updates) == 2
+    assert edit_shift_times(mine[0]["edit_shift_id"]) == (time(10), time(12))
+    assert edit_shift_times(mine[1]["edit_shift_id"]) == (time(12), time(14))
+    assert edit_shift_repository['update_shift_request'](1, []) == 0
+
+
+@pytest.mark.parametrize("delete_returning", [True, False])
+def test_bulk_delete_checks_the_company(engine, monkeypatch, future_shift, count_rows, delete_returning):
+    monkeypatch.setattr(engine.dialect, "delete_returning", delete_returning)
+    mine = [s["edit_shift_id"] for s in edit_shift_repository['insert_shift_request']([future_shift(1), future_shift(2)])]
+    other = edit_shift_repository['insert_shift_request']([future_shift(3, company_id=2)])[0]["edit_shift_id"]
+
+    with pytest.raises(ValueError, match=f"{other}, 99999"):
+        edit_shift_repository['delete_shift_request'](1, mine + [other, 99999])
+    assert count_rows(EditShift) == 3
+
+    assert edit_shift_repository['delete_shift_request'](1, mine) == 2
+    assert count_rows(EditShift) == 1
+    assert edit_shift_repository['delete_shift_request'](1, []) == 0